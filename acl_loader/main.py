@@ -4,14 +4,14 @@ import click
 import ipaddress
 import json
 import syslog
-import operator
+from concurrent.futures import ThreadPoolExecutor
 
 import openconfig_acl
 import tabulate
 import pyangbind.lib.pybindJSON as pybindJSON
 from natsort import natsorted
 from sonic_py_common import multi_asic
-from swsscommon.swsscommon import SonicV2Connector, ConfigDBConnector
+from swsscommon.swsscommon import SonicV2Connector, ConfigDBPipeConnector
 from utilities_common.general import load_db_config
 
 def info(msg):
@@ -39,6 +39,54 @@ def deep_update(dst, src):
     return dst
 
 
+def rule_to_raw(rule):
+    """ Convert the fields of a rule to the strings stored in Config DB, to compare the rules of a file and of the DB """
+    return {field: ",".join(map(str, value)) if isinstance(value, list) else str(value)
+            for field, value in rule.items()}
+
+
+class AclRuleWriter(object):
+    """
+    Write the changes of the ACL rules to the Config DB of the host and of each front ASIC namespace.
+    The rules are written with the ConfigDBPipeConnector of each namespace, in pipelines of RULE_BATCH_SIZE rules,
+    to all the namespaces concurrently.
+    """
+    RULE_BATCH_SIZE = 1000
+
+    def __init__(self, table_name, connectors):
+        """
+        :param connectors: Dict of the ConfigDBPipeConnector of each namespace
+        """
+        self.table_name = table_name
+        self.connectors = connectors
+
+    def write_namespace(self, namespace, removed, updated):
+        configdb = self.connectors[namespace]
+        removed = list(removed)
+        updated = list(updated.items())
+        for i in range(0, len(removed), self.RULE_BATCH_SIZE):
+            configdb.mod_config({self.table_name: dict.fromkeys(removed[i:i + self.RULE_BATCH_SIZE])})
+        for i in range(0, len(updated), self.RULE_BATCH_SIZE):
+            configdb.mod_config({self.table_name: dict(updated[i:i + self.RULE_BATCH_SIZE])})
+
+    def write(self, changes):
+        """
+        Remove then update rules in every namespace. An updated rule is merged with its fields in the DB,
+        so a rule losing fields should be removed first.
+        :param changes: Dict of the changes of each namespace, the list of the keys of the rules to remove
+                        and the dict of the rules to add or update
+        """
+        changes = {namespace: (removed, updated) for namespace, (removed, updated) in changes.items()
+                   if removed or updated}
+        if not changes:
+            return
+        with ThreadPoolExecutor(max_workers=len(changes)) as executor:
+            futures = [executor.submit(self.write_namespace, namespace, removed, updated)
+                       for namespace, (removed, updated) in changes.items()]
+            for future in futures:
+                future.result()
+
+
 class AclAction:
     """ namespace for ACL action keys """
 
@@ -131,7 +179,7 @@ class AclLoader(object):
         self.acl_table_status = {}
         self.acl_rule_status = {}
 
-        self.configdb = ConfigDBConnector()
+        self.configdb = ConfigDBPipeConnector()
         self.configdb.connect()
         self.statedb = SonicV2Connector(host="127.0.0.1")
         self.statedb.connect(self.statedb.STATE_DB)
@@ -156,7 +204,7 @@ class AclLoader(object):
 
         namespaces = multi_asic.get_all_namespaces()
         for front_asic_namespaces in namespaces['front_ns']:
-            self.per_npu_configdb[front_asic_namespaces] = ConfigDBConnector(namespace=front_asic_namespaces)
+            self.per_npu_configdb[front_asic_namespaces] = ConfigDBPipeConnector(namespace=front_asic_namespaces)
             self.per_npu_configdb[front_asic_namespaces].connect()
             self.per_npu_statedb[front_asic_namespaces] = SonicV2Connector(namespace=front_asic_namespaces)
             self.per_npu_statedb[front_asic_namespaces].connect(self.per_npu_statedb[front_asic_namespaces].STATE_DB)
@@ -793,101 +841,92 @@ class AclLoader(object):
             if not self.is_table_egress(table_name):
                 deep_update(self.rules_info, self.deny_rule(table_name))
 
+    def get_configdbs(self):
+        """
+        Get the Config DB of the host and, if present, of every front asic namespace
+        :return: Dict of the ConfigDBPipeConnector of each namespace
+        """
+        configdbs = {multi_asic.DEFAULT_NAMESPACE: self.configdb}
+        configdbs.update(self.per_npu_configdb or {})
+        return configdbs
+
+    def get_rule_writer(self):
+        """
+        Get the writer of the ACL rules to the Config DB of the host and, if present, of every front asic namespace
+        :return: AclRuleWriter
+        """
+        return AclRuleWriter(self.ACL_RULE, self.get_configdbs())
+
+    def read_namespaces_rules_info(self):
+        """
+        Read the ACL rules of every namespace, so that the rules of a front asic namespace which drifted from
+        the host ones are written too. The rules of the host are those read from its Config DB at init, the rules
+        of each front asic namespace are read with a pipeline.
+        :return: Dict of the rules of each namespace
+        """
+        namespaces_rules_info = {multi_asic.DEFAULT_NAMESPACE: self.rules_db_info}
+        for namespace, configdb in (self.per_npu_configdb or {}).items():
+            namespaces_rules_info[namespace] = configdb.get_table(self.ACL_RULE)
+        return namespaces_rules_info
+
+    def get_rules_diff(self, current_rules, rules_db_info=None):
+        """
+        Compute the rule level diff between the rules in Config DB and the rules loaded from file.
+        :param current_rules: Keys of the rules in Config DB replaced by the rules loaded from file.
+                              Those missing from the file are removed, the others are merged with the file.
+        :param rules_db_info: The rules in the Config DB of a namespace, those of the host if None
+        :return: List of the keys of the rules to remove, dict of the rules to write
+        """
+        if rules_db_info is None:
+            rules_db_info = self.rules_db_info
+        removed = [key for key in current_rules if key not in self.rules_info]
+        updated = {}
+        for key, rule in self.rules_info.items():
+            db_rule = rules_db_info.get(key)
+            if db_rule is None:
+                updated[key] = rule
+                continue
+
+            raw_rule = rule_to_raw(rule)
+            raw_db_rule = rule_to_raw(db_rule)
+            if key in current_rules and raw_db_rule.keys() - raw_rule.keys():
+                # The rule lost some fields, rewrite it entirely
+                removed.append(key)
+                updated[key] = rule
+            elif any(raw_db_rule.get(field) != value for field, value in raw_rule.items()):
+                updated[key] = rule
+        return removed, updated
+
     def full_update(self):
         """
         Perform full update of ACL rules configuration. All existing rules
         will be removed. New rules loaded from file will be installed. If
         the current_table is not empty, only rules within that table will
         be removed and new rules in that table will be installed.
+        Only the rules which differ between the Config DB of each namespace
+        and file are written.
         :return:
         """
-        for key in self.rules_db_info:
-            if self.current_table is None or self.current_table == key[0]:
-                self.configdb.mod_entry(self.ACL_RULE, key, None)
-                # Program for per front asic namespace also if present
-                for namespace_configdb in self.per_npu_configdb.values():
-                    namespace_configdb.mod_entry(self.ACL_RULE, key, None)
-
-
-        self.configdb.mod_config({self.ACL_RULE: self.rules_info})
-        # Program for per front asic namespace also if present
-        for namespace_configdb in self.per_npu_configdb.values():
-            namespace_configdb.mod_config({self.ACL_RULE: self.rules_info})
+        changes = {}
+        for namespace, rules_db_info in self.read_namespaces_rules_info().items():
+            current_rules = {key for key in rules_db_info
+                             if self.current_table is None or self.current_table == key[0]}
+            changes[namespace] = self.get_rules_diff(current_rules, rules_db_info)
+        self.get_rule_writer().write(changes)
 
     def incremental_update(self):
         """
         Perform incremental ACL rules configuration update. Get existing rules from
         Config DB. Compare with rules specified in file and perform corresponding
         modifications.
+        Control plane and dataplane rules are both updated in place: rules whose
+        content did not change are not touched, so orchagent does not remove and
+        re-create them.
         :return:
         """
-
-        # TODO: Until we test ASIC behavior, we cannot assume that we can insert
-        # dataplane ACLs and shift existing ACLs. Therefore, we perform a full
-        # update on dataplane ACLs, and only perform an incremental update on
-        # control plane ACLs.
-
-        new_rules = set(self.rules_info.keys())
-        new_dataplane_rules = set()
-        new_controlplane_rules = set()
-        current_rules = set(self.rules_db_info.keys())
-        current_dataplane_rules = set()
-        current_controlplane_rules = set()
-
-        for key in new_rules:
-            table_name = key[0]
-            if self.tables_db_info[table_name]['type'].upper() == self.ACL_TABLE_TYPE_CTRLPLANE:
-                new_controlplane_rules.add(key)
-            else:
-                new_dataplane_rules.add(key)
-
-        for key in current_rules:
-            table_name = key[0]
-            if self.tables_db_info[table_name]['type'].upper() == self.ACL_TABLE_TYPE_CTRLPLANE:
-                current_controlplane_rules.add(key)
-            else:
-                current_dataplane_rules.add(key)
-
-        # Remove all existing dataplane rules
-        for key in current_dataplane_rules:
-            self.configdb.mod_entry(self.ACL_RULE, key, None)
-            # Program for per-asic namespace also if present
-            for namespace_configdb in self.per_npu_configdb.values():
-                namespace_configdb.mod_entry(self.ACL_RULE, key, None)
-
-
-        # Add all new dataplane rules
-        for key in new_dataplane_rules:
-            self.configdb.mod_entry(self.ACL_RULE, key, self.rules_info[key])
-            # Program for per-asic namespace corresponding to front asic also if present.
-            for namespace_configdb in self.per_npu_configdb.values():
-                namespace_configdb.mod_entry(self.ACL_RULE, key, self.rules_info[key])
-
-        added_controlplane_rules = new_controlplane_rules.difference(current_controlplane_rules)
-        removed_controlplane_rules = current_controlplane_rules.difference(new_controlplane_rules)
-        existing_controlplane_rules = new_rules.intersection(current_controlplane_rules)
-
-        for key in added_controlplane_rules:
-            self.configdb.mod_entry(self.ACL_RULE, key, self.rules_info[key])
-            # Program for per-asic namespace corresponding to front asic also if present.
-            # For control plane ACL it's not needed but to keep all db in sync program everywhere
-            for namespace_configdb in self.per_npu_configdb.values():
-                namespace_configdb.mod_entry(self.ACL_RULE, key, self.rules_info[key])
-
-        for key in removed_controlplane_rules:
-            self.configdb.mod_entry(self.ACL_RULE, key, None)
-            # Program for per-asic namespace corresponding to front asic also if present.
-            # For control plane ACL it's not needed but to keep all db in sync program everywhere
-            for namespace_configdb in self.per_npu_configdb.values():
-                namespace_configdb.mod_entry(self.ACL_RULE, key, None)
-
-        for key in existing_controlplane_rules:
-            if not operator.eq(self.rules_info[key], self.rules_db_info[key]):
-                self.configdb.set_entry(self.ACL_RULE, key, self.rules_info[key])
-                # Program for per-asic namespace corresponding to front asic also if present.
-                # For control plane ACL it's not needed but to keep all db in sync program everywhere
-                for namespace_configdb in self.per_npu_configdb.values():
-                    namespace_configdb.set_entry(self.ACL_RULE, key, self.rules_info[key])
+        changes = {namespace: self.get_rules_diff(set(rules_db_info), rules_db_info)
+                   for namespace, rules_db_info in self.read_namespaces_rules_info().items()}
+        self.get_rule_writer().write(changes)
 
     def delete(self, table=None, rule=None):
         """
@@ -895,13 +934,9 @@ class AclLoader(object):
         :param rule:
         :return:
         """
-        for key in self.rules_db_info:
-            if not table or table == key[0]:
-                if not rule or rule == key[1]:
-                    self.configdb.set_entry(self.ACL_RULE, key, None)
-                    # Program for per-asic namespace corresponding to front asic also if present.
-                    for namespace_configdb in self.per_npu_configdb.values():
-                        namespace_configdb.set_entry(self.ACL_RULE, key, None)
+        removed = [key for key in self.rules_db_info
+                   if (not table or table == key[0]) and (not rule or rule == key[1])]
+        self.get_rule_writer().write(dict.fromkeys(self.get_configdbs(), (removed, {})))
 
     def show_table(self, table_name):
         """
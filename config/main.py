@@ -23,7 +23,9 @@ from jsonpatch import JsonPatchConflict
 from jsonpointer import JsonPointerException
 from collections import OrderedDict
 from generic_config_updater.generic_updater import GenericUpdater, ConfigFormat, extract_scope
-from generic_config_updater.gu_common import HOST_NAMESPACE, GenericConfigUpdaterError
+from generic_config_updater.patch_sorter import Algorithm, AStarSorter
+from generic_config_updater.gu_common import HOST_NAMESPACE, GenericConfigUpdaterError, get_config_db_snapshot, \
+    SharedYangModels
 from minigraph import parse_device_desc_xml, minigraph_encoder
 from natsort import natsorted
 from portconfig import get_child_ports
@@ -1228,7 +1230,30 @@ def apply_patch_wrapper(args):
 
 
 # Function to apply patch for a single ASIC.
-def apply_patch_for_scope(scope_changes, results, config_format, verbose, dry_run, ignore_non_yang_tables, ignore_path):
+def apply_patch_for_scope(scope_changes, results, config_format, verbose, dry_run, ignore_non_yang_tables, ignore_path,
+                          sort_algorithm=Algorithm.DFS, search_budget=AStarSorter.DEFAULT_SEARCH_BUDGET):
+    scope_for_log, result = get_apply_patch_result_for_scope(scope_changes,
+                                                             config_format,
+                                                             verbose,
+                                                             dry_run,
+                                                             ignore_non_yang_tables,
+                                                             ignore_path,
+                                                             sort_algorithm,
+                                                             search_budget)
+    results[scope_for_log] = result
+
+
+# Initializer of the apply-patch worker processes, the YANG models are loaded
+# once per worker instead of once per scope.
+def init_apply_patch_worker():
+    SharedYangModels.get(YANG_DIR)
+
+
+# Function to apply patch for a single ASIC, returning the result instead of
+# storing it in a shared dict so that it can run in a worker process.
+def get_apply_patch_result_for_scope(scope_changes, config_format, verbose, dry_run, ignore_non_yang_tables,
+                                     ignore_path, sort_algorithm=Algorithm.DFS,
+                                     search_budget=AStarSorter.DEFAULT_SEARCH_BUDGET):
     scope, changes = scope_changes
     # Replace localhost to DEFAULT_NAMESPACE which is db definition of Host
     if scope.lower() == HOST_NAMESPACE or scope == "":
@@ -1240,30 +1265,54 @@ def apply_patch_for_scope(scope_changes, results, config_format, verbose, dry_ru
 
     try:
         # Call apply_patch with the ASIC-specific changes and predefined parameters
-        GenericUpdater(scope=scope).apply_patch(jsonpatch.JsonPatch(changes),
-                                                config_format,
-                                                verbose,
-                                                dry_run,
-                                                ignore_non_yang_tables,
-                                                ignore_path)
-        results[scope_for_log] = {"success": True, "message": "Success"}
+        generic_updater = GenericUpdater(scope=scope, sort_algorithm=sort_algorithm, search_budget=search_budget)
+        generic_updater.apply_patch(jsonpatch.JsonPatch(changes),
+                                    config_format,
+                                    verbose,
+                                    dry_run,
+                                    ignore_non_yang_tables,
+                                    ignore_path)
         log.log_notice(f"'apply-patch' executed successfully for {scope_for_log} by {changes} in thread:{thread_id}")
+        return scope_for_log, {"success": True, "message": "Success"}
     except Exception as e:
-        results[scope_for_log] = {"success": False, "message": str(e)}
         log.log_error(f"'apply-patch' executed failed for {scope_for_log} by {changes} due to {str(e)}")
+        return scope_for_log, {"success": False, "message": str(e)}
+
+
+def apply_patch_in_processes(changes_by_scope, results, config_format, verbose, dry_run, ignore_non_yang_tables,
+                             ignore_path, sort_algorithm=Algorithm.DFS, search_budget=AStarSorter.DEFAULT_SEARCH_BUDGET):
+    with concurrent.futures.ProcessPoolExecutor(max_workers=len(changes_by_scope),
+                                                initializer=init_apply_patch_worker) as executor:
+        futures = {executor.submit(get_apply_patch_result_for_scope, scope_changes, config_format, verbose,
+                                   dry_run, ignore_non_yang_tables, ignore_path, sort_algorithm,
+                                   search_budget): scope_changes[0]
+                   for scope_changes in changes_by_scope.items()}
+
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                scope_for_log, result = future.result()
+            except Exception as e:
+                # The worker itself failed, e.g. it was killed or the arguments could not be passed to it
+                scope_for_log = futures[future] if futures[future] else HOST_NAMESPACE
+                result = {"success": False, "message": str(e)}
+            results[scope_for_log] = result
 
 
 def validate_patch(patch):
     try:
-        command = ["show", "runningconfiguration", "all"]
-        proc = subprocess.Popen(command, text=True, stdout=subprocess.PIPE)
-        all_running_config, returncode = proc.communicate()
-        if returncode:
-            log.log_notice(f"Fetch all runningconfiguration failed as output:{all_running_config}")
+        try:
+            if multi_asic.is_multi_asic():
+                all_running_config = {HOST_NAMESPACE: get_config_db_snapshot(multi_asic.DEFAULT_NAMESPACE)}
+                for asic in multi_asic.get_namespace_list():
+                    all_running_config[asic] = get_config_db_snapshot(asic)
+            else:
+                all_running_config = get_config_db_snapshot()
+        except GenericConfigUpdaterError as e:
+            log.log_notice(f"Fetch all runningconfiguration failed as output:{e}")
             return False
 
         # Structure validation and simulate apply patch.
-        all_target_config = patch.apply(json.loads(all_running_config))
+        all_target_config = patch.apply(all_running_config)
 
         # Verify target config by YANG models
         target_config = all_target_config.pop(HOST_NAMESPACE) if multi_asic.is_multi_asic() else all_target_config
@@ -1584,11 +1633,18 @@ def print_dry_run_message(dry_run):
                show_default=True)
 @click.option('-d', '--dry-run', is_flag=True, default=False, help='test out the command without affecting config state')
 @click.option('-p', '--parallel', is_flag=True, default=False, help='applying the change to all ASICs parallelly')
+@click.option('--parallel-mode', type=click.Choice(['thread', 'process']), default='thread',
+              help='run the parallel ASIC updates in threads or in worker processes', show_default=True)
 @click.option('-n', '--ignore-non-yang-tables', is_flag=True, default=False, help='ignore validation for tables without YANG models', hidden=True)
 @click.option('-i', '--ignore-path', multiple=True, help='ignore validation for config specified by given path which is a JsonPointer', hidden=True)
 @click.option('-v', '--verbose', is_flag=True, default=False, help='print additional details of what the operation is doing')
+@click.option('--sort-algorithm', type=click.Choice([e.name for e in Algorithm]), default=Algorithm.DFS.name,
+              help='algorithm ordering the patch updates', show_default=True)
+@click.option('--search-budget', type=click.IntRange(min=1), default=AStarSorter.DEFAULT_SEARCH_BUDGET,
+              help='number of configs the ASTAR sort algorithm explores before giving up', show_default=True)
 @click.pass_context
-def apply_patch(ctx, patch_file_path, format, dry_run, parallel, ignore_non_yang_tables, ignore_path, verbose):
+def apply_patch(ctx, patch_file_path, format, dry_run, parallel, parallel_mode, ignore_non_yang_tables, ignore_path,
+                verbose, sort_algorithm, search_budget):
     """Apply given patch of updates to Config. A patch is a JsonPatch which follows rfc6902.
        This command can be used do partial updates to the config with minimum disruption to running processes.
        It allows addition as well as deletion of configs. The patch file represents a diff of ConfigDb(ABNF)
@@ -1608,6 +1664,7 @@ def apply_patch(ctx, patch_file_path, format, dry_run, parallel, ignore_non_yang
 
         results = {}
         config_format = ConfigFormat[format.upper()]
+        sort_algorithm = Algorithm[sort_algorithm]
         # Initialize a dictionary to hold changes categorized by scope
         changes_by_scope = {}
 
@@ -1634,11 +1691,21 @@ def apply_patch(ctx, patch_file_path, format, dry_run, parallel, ignore_non_yang
                 changes_by_scope[asic] = []
 
         # Apply changes for each scope
-        if parallel:
+        if parallel and parallel_mode == 'process':
+            apply_patch_in_processes(changes_by_scope,
+                                     results,
+                                     config_format,
+                                     verbose, dry_run,
+                                     ignore_non_yang_tables,
+                                     ignore_path,
+                                     sort_algorithm,
+                                     search_budget)
+        elif parallel:
             with concurrent.futures.ThreadPoolExecutor() as executor:
                 # Prepare the argument tuples
                 arguments = [(scope_changes, results, config_format,
-                              verbose, dry_run, ignore_non_yang_tables, ignore_path)
+                              verbose, dry_run, ignore_non_yang_tables, ignore_path,
+                              sort_algorithm, search_budget)
                              for scope_changes in changes_by_scope.items()]
 
                 # Submit all tasks and wait for them to complete
@@ -1653,7 +1720,9 @@ def apply_patch(ctx, patch_file_path, format, dry_run, parallel, ignore_non_yang
                                       config_format,
                                       verbose, dry_run,
                                       ignore_non_yang_tables,
-                                      ignore_path)
+                                      ignore_path,
+                                      sort_algorithm,
+                                      search_budget)
 
         # Check if any updates failed
         failures = [scope for scope, result in results.items() if not result['success']]
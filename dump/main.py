@@ -2,11 +2,13 @@ import os
 import sys
 import json
 import re
+import threading
 import click
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from tabulate import tabulate
 from sonic_py_common import multi_asic
 from utilities_common.constants import DEFAULT_NAMESPACE
-from dump.match_infra import RedisSource, JsonSource, MatchEngine, CONN
+from dump.match_infra import RedisSource, JsonSource, MatchEngine, ConnectionPool, CONN
 from swsscommon.swsscommon import ConfigDBConnector
 from dump import plugins
 
@@ -49,7 +51,13 @@ def dump(ctx):
               help="Prints any intermediate output to stdout useful for dev & troubleshooting")
 @click.option('--namespace', '-n', default=DEFAULT_NAMESPACE, type=str,
               show_default=True, help='Dump the redis-state for this namespace.')
-def state(ctx, module, identifier, db, table, key_map, verbose, namespace):
+@click.option('--jobs', '-j', default=1, type=click.IntRange(min=1), show_default=True,
+              help='Number of identifiers dumped in parallel, each worker with its own redis connections')
+@click.option('--stream', is_flag=True, default=False, show_default=True,
+              help="Print the dump of each identifier as soon as it completes")
+@click.option('--snapshot', is_flag=True, default=False, show_default=True,
+              help="Load each table touched once and dump the identifiers from memory, always done for all")
+def state(ctx, module, identifier, db, table, key_map, verbose, namespace, jobs, stream, snapshot):
     """
     Dump the current state of the identifier for the specified module from Redis DB or CONFIG_FILE
     """
@@ -70,6 +78,11 @@ def state(ctx, module, identifier, db, table, key_map, verbose, namespace):
     else:
         os.environ["VERBOSE"] = "0"
 
+    if identifier == "all" or snapshot:
+        # Load each table touched once and answer the requests of every identifier from memory,
+        # a list of a few identifiers is faster to dump with lookups of their own keys
+        ctx.obj.enable_snapshot()
+
     obj = plugins.dump_modules[module](ctx.obj)
 
     if identifier == "all":
@@ -77,6 +90,17 @@ def state(ctx, module, identifier, db, table, key_map, verbose, namespace):
     else:
         ids = identifier.split(",")
 
+    if jobs > 1 or stream:
+        results = dump_identifiers(ctx, obj, module, ids, db, key_map, namespace, jobs, stream)
+        try:
+            if stream:
+                print_dump_stream(results, table, module, key_map)
+            else:
+                print_dump(dict(results), table, module, identifier, key_map)
+        except ValueError as err:
+            ctx.fail(f"Failed to execute plugin: {err}")
+        return
+
     params = {}
     collected_info = {}
     params['namespace'] = namespace
@@ -103,11 +127,63 @@ def state(ctx, module, identifier, db, table, key_map, verbose, namespace):
     return
 
 
+def dump_identifier(obj, module, arg, db, key_map, namespace):
+    """ Dump a single identifier with the plugin obj, Returns its collected info """
+    params = {'namespace': namespace, plugins.dump_modules[module].ARG_NAME: arg}
+    conn_pool = obj.match_engine.conn_pool
+    collected_info = {arg: obj.execute(params)}
+
+    if len(db) > 0:
+        collected_info = filter_out_dbs(db, collected_info)
+
+    vidtorid = extract_rid(collected_info, namespace, conn_pool)
+
+    if not key_map:
+        collected_info = populate_fv(collected_info, module, namespace, conn_pool, obj.return_pb2_obj())
+
+    for id in vidtorid.keys():
+        collected_info[id]["ASIC_DB"]["vidtorid"] = vidtorid[id]
+    return collected_info[arg]
+
+
+def dump_identifiers(ctx, obj, module, ids, db, key_map, namespace, jobs, stream):
+    """
+    Dump the identifiers over a pool of jobs worker threads. The plugins keep the state of the identifier they
+    execute and the redis connections can't be shared between threads, so each worker has its own plugin
+    and MatchEngine, with a ConnectionPool of its own. The MatchEngines share the snapshots of the tables
+    of ctx.obj, so that each table is loaded once, and those already loaded are reused.
+    Yields (identifier, collected info) in the order of ids, or as they complete when streaming
+    """
+    if jobs == 1:
+        for arg in ids:
+            yield arg, dump_identifier(obj, module, arg, db, key_map, namespace)
+        return
+
+    worker = threading.local()
+    snapshots = ctx.obj.snapshots
+
+    def run(arg):
+        if not hasattr(worker, "obj"):
+            worker.obj = plugins.dump_modules[module](MatchEngine(ConnectionPool(), snapshots=snapshots))
+        return arg, dump_identifier(worker.obj, module, arg, db, key_map, namespace)
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        if stream:
+            futures = [executor.submit(run, arg) for arg in ids]
+            for future in as_completed(futures):
+                yield future.result()
+        else:
+            yield from executor.map(run, ids)
+
+
 def extract_rid(info, ns, conn_pool):
     r = RedisSource(conn_pool)
     r.connect("ASIC_DB", ns)
     vidtorid = {}
     vid_cache = {}  # Cache Entries to reduce number of Redis Calls
+    # Resolve the vids of every arg with a single HMGET of VIDTORID
+    all_vids = [vid for arg in info.keys() for vid in get_vids(info[arg])]
+    fill_vid_cache(r, all_vids, vid_cache)
     for arg in info.keys():
         mp = get_v_r_map(r, info[arg], vid_cache)
         if mp:
@@ -115,8 +191,8 @@ def extract_rid(info, ns, conn_pool):
     return vidtorid
 
 
-def get_v_r_map(r, single_dict, vid_cache):
-    v_r_map = {}
+def get_vids(single_dict):
+    vids = []
     asic_obj_ptrn = "ASIC_STATE:.*:oid:0x\w{1,14}"
 
     if "ASIC_DB" in single_dict and "keys" in single_dict["ASIC_DB"]:
@@ -124,13 +200,23 @@ def get_v_r_map(r, single_dict, vid_cache):
             if re.match(asic_obj_ptrn, redis_key):
                 matches = re.findall(r"oid:0x\w{1,14}", redis_key)
                 if matches:
-                    vid = matches[0]
-                    if vid in vid_cache:
-                        rid = vid_cache[vid]
-                    else:
-                        rid = r.hget("ASIC_DB", "VIDTORID", vid)
-                        vid_cache[vid] = rid
-                    v_r_map[vid] = rid if rid else "Real ID Not Found"
+                    vids.append(matches[0])
+    return vids
+
+
+def fill_vid_cache(r, vids, vid_cache):
+    missing = [vid for vid in dict.fromkeys(vids) if vid not in vid_cache]
+    if missing:
+        vid_cache.update(zip(missing, r.hmget("ASIC_DB", "VIDTORID", missing)))
+
+
+def get_v_r_map(r, single_dict, vid_cache):
+    v_r_map = {}
+    vids = get_vids(single_dict)
+    fill_vid_cache(r, vids, vid_cache)
+    for vid in vids:
+        rid = vid_cache[vid]
+        v_r_map[vid] = rid if rid else "Real ID Not Found"
     return v_r_map
 
 
@@ -160,7 +246,17 @@ def populate_fv(info, module, namespace, conn_pool, dash_object):
     if dash_object:
         conn_pool.get_dash_conn(namespace)
         redis_conn = conn_pool.cache.get(namespace, {}).get("DASH_"+CONN, None)
-    db_conn = conn_pool.cache.get(namespace, {}).get(CONN, None)
+
+    # Fetch the fv-pairs of all the keys of a db in batches, rather than a call per key
+    redis_fvs = {}
+    for db_name in all_dbs:
+        if db_name == "CONFIG_FILE" or (dash_object and db_name == "APPL_DB"):
+            continue
+        keys = list(dict.fromkeys(key for id in info.keys() if db_name in info[id]
+                                  for key in info[id][db_name]["keys"]))
+        r = RedisSource(conn_pool)
+        r.connect(db_name, namespace)
+        redis_fvs[db_name] = dict(zip(keys, r.get_many(db_name, keys)))
 
     final_info = {}
     for id in info.keys():
@@ -181,7 +277,7 @@ def populate_fv(info, module, namespace, conn_pool, dash_object):
                         print("Issue in importing dash module!")
                         return final_info
                 else:
-                    fv = db_conn.get_all(db_name, key)
+                    fv = redis_fvs[db_name][key]
                 final_info[id][db_name]["keys"].append({key: fv})
     return final_info
 
@@ -204,6 +300,29 @@ def print_dump(collected_info, table, module, identifier, key_map):
         return
 
     top_header = [plugins.dump_modules[module].ARG_NAME, "DB_NAME", "DUMP"]
+    final_collection = get_dump_rows(collected_info, key_map)
+    click.echo(tabulate(final_collection, top_header, tablefmt="grid"))
+    return
+
+
+# print the dump of each identifier as it is collected
+def print_dump_stream(results, table, module, key_map):
+    if not table:
+        # The output is the same json object as print_dump, with the identifiers in the order they completed
+        click.echo("{")
+        sep = ""
+        for arg, info in results:
+            click.echo(sep + json.dumps({arg: info}, indent=4)[2:-2], nl=False)
+            sep = ",\n"
+        click.echo("\n}")
+        return
+
+    top_header = [plugins.dump_modules[module].ARG_NAME, "DB_NAME", "DUMP"]
+    for arg, info in results:
+        click.echo(tabulate(get_dump_rows({arg: info}, key_map), top_header, tablefmt="grid"))
+
+
+def get_dump_rows(collected_info, key_map):
     final_collection = []
     for ids in collected_info.keys():
         for db in collected_info[ids].keys():
@@ -237,9 +356,7 @@ def print_dump(collected_info, table, module, identifier, key_map):
                     temp.append(list(pair))
                 total_info += str(tabulate(temp, headers=["vid", "rid"], tablefmt="grid"))
             final_collection.append([ids, db, total_info])
-
-    click.echo(tabulate(final_collection, top_header, tablefmt="grid"))
-    return
+    return final_collection
 
 
 if __name__ == '__main__':
@@ -1,17 +1,23 @@
 import json
+import bisect
 import fnmatch
 import copy
+import re
+import threading
 from abc import ABC, abstractmethod
 from dump.helper import verbose_print
 from swsscommon.swsscommon import SonicV2Connector, SonicDBConfig
 from sonic_py_common import multi_asic
 from utilities_common.constants import DEFAULT_NAMESPACE
+from utilities_common.redis_pipeline import get_pipeline_client
 import redis
 
 
 # Constants
 CONN = "conn"
 CONN_TO = "connected_to"
+PIPE_CONN = "pipe_conn"
+PIPELINE_BATCH_SIZE = 1000  # Commands sent to redis per round trip by the batched fetches
 
 EXCEP_DICT = {
     "INV_REQ": "Argument should be of type MatchRequest",
@@ -137,6 +143,8 @@ class MatchRequest:
 class SourceAdapter(ABC):
     """ Source Adaptor offers unified interface to Data Sources """
 
+    MISSING_FIELD = None  # Value returned by hget for a field missing from the key
+
     def __init__(self):
         pass
 
@@ -165,17 +173,35 @@ class SourceAdapter(ABC):
     def hgetall(self, db, key):
         raise NotImplementedError
 
+    def get_many(self, db, keys):
+        """ Return the fv-pairs of each key, in the order of keys """
+        return [self.get(db, key) for key in keys]
+
+    def hget_many(self, db, keys, field):
+        """ Return the value of the field for each key, in the order of keys """
+        return [self.hget(db, key, field) for key in keys]
+
+    def hmget(self, db, key, fields):
+        """ Return the values of the fields of a key, in the order of fields """
+        return [self.hget(db, key, field) for field in fields]
+
+    def hmget_many(self, db, keys, fields):
+        """ Return the values of the fields for each key, as a list per key """
+        return [self.hmget(db, key, fields) for key in keys]
+
 
 class RedisSource(SourceAdapter):
     """ Concrete Adaptor Class for connecting to Redis Data Sources """
 
     def __init__(self, conn_pool):
         self.conn = None
+        self.ns = DEFAULT_NAMESPACE
         self.pool = conn_pool
 
     def connect(self, db, ns):
         try:
             self.conn = self.pool.get(db, ns)
+            self.ns = ns
         except Exception as e:
             verbose_print("RedisSource: Connection Failed\n" + str(e))
             return False
@@ -196,6 +222,56 @@ class RedisSource(SourceAdapter):
     def hgetall(self, db, key):
         return self.conn.get_all(db, key)
 
+    def __run_pipelined(self, db, keys, queue):
+        """
+        Queue a command per key with queue(pipe, key) and run them in batches of PIPELINE_BATCH_SIZE,
+        Returns None when the db can't be pipelined
+        """
+        client = self.pool.get_pipeline_conn(db, self.ns)
+        if client is None:
+            return None
+        results = []
+        try:
+            for start in range(0, len(keys), PIPELINE_BATCH_SIZE):
+                pipe = client.pipeline(transaction=False)
+                for key in keys[start:start + PIPELINE_BATCH_SIZE]:
+                    queue(pipe, key)
+                results.extend(pipe.execute())
+        except redis.RedisError as e:
+            verbose_print("RedisSource: Pipelined fetch failed, Falling back to a call per key\n" + str(e))
+            return None
+        return results
+
+    def get_many(self, db, keys):
+        keys = list(keys)
+        fvs = self.__run_pipelined(db, keys, lambda pipe, key: pipe.hgetall(key))
+        if fvs is None:
+            return super().get_many(db, keys)
+        return [fv or {} for fv in fvs]
+
+    def hget_many(self, db, keys, field):
+        keys = list(keys)
+        values = self.__run_pipelined(db, keys, lambda pipe, key: pipe.hget(key, field))
+        if values is None:
+            return super().hget_many(db, keys, field)
+        return values
+
+    def hmget(self, db, key, fields):
+        fields = list(fields)
+        values = self.__run_pipelined(db, [fields[start:start + PIPELINE_BATCH_SIZE]
+                                           for start in range(0, len(fields), PIPELINE_BATCH_SIZE)],
+                                      lambda pipe, batch: pipe.hmget(key, batch))
+        if values is None:
+            return super().hmget(db, key, fields)
+        return [value for batch in values for value in batch]
+
+    def hmget_many(self, db, keys, fields):
+        keys = list(keys)
+        values = self.__run_pipelined(db, keys, lambda pipe, key: pipe.hmget(key, fields))
+        if values is None:
+            return super().hmget_many(db, keys, fields)
+        return values
+
 
 class RedisPySource(SourceAdapter):
     """ Concrete Adaptor Class for connecting to APPL_DB using Redis library"""
@@ -242,9 +318,15 @@ class RedisPySource(SourceAdapter):
         key_val = self.conn.hgetall(key)
         return self.get_decoded_value(self.pb_obj, key_val)
 
+    def hmget_many(self, db, keys, fields):
+        # Decode each key once, rather than once per field
+        return [[decoded_dict.get(field) for field in fields] for decoded_dict in self.get_many(db, keys)]
+
 class JsonSource(SourceAdapter):
     """ Concrete Adaptor Class for connecting to JSON Data Sources """
 
+    MISSING_FIELD = ""
+
     def __init__(self):
         self.json_data = None
 
@@ -329,6 +411,21 @@ class ConnectionPool:
             self.cache[ns]["DASH_"+CONN] = self.initialize_redis_conn(ns)
         return self.cache[ns]["DASH_"+CONN]
 
+    def get_pipeline_conn(self, db_name, ns):
+        """
+        Returns a redis client of the db which supports pipelines, and caches it for further requests.
+        The client of the SonicV2Connector is used when it supports them, else a redis connection is made
+        over the unix socket of the db. Returns None when neither is available
+        """
+        conn = self.get(db_name, ns)
+        pipe_conns = self.cache[ns].setdefault(PIPE_CONN, {})
+        if db_name not in pipe_conns:
+            client = get_pipeline_client(conn, db_name, ns)
+            if client is None:
+                verbose_print("ConnectionPool: Redis connection for pipelines failed for " + db_name)
+            pipe_conns[db_name] = client
+        return pipe_conns[db_name]
+
     def clear(self, namespace=None):
         if not namespace:
             self.cache.clear()
@@ -346,18 +443,173 @@ class ConnectionPool:
         self.cache[ns][CONN_TO] = set(connected_to)
 
 
+class TableSnapshot:
+    """
+    All the fv-pairs of a table, loaded with a single batched fetch, which answers the MatchRequests on
+    the table from memory. Secondary indexes on the fields matched by the requests are built on their first use,
+    under a lock, so that a snapshot can be read by several threads.
+    A glob pattern of the keys is only matched against the keys which can match it: the keys starting with its
+    literal prefix, Eg: Vlan1000|*, or for a pattern like *"dest":"X"* the keys made of a json object having the
+    value of the field, Eg: the ASIC route entries
+    """
+    GLOB_CHARS = re.compile(r"[*?\[]")
+    JSON_FIELD_PATTERN = re.compile(r'^\*"([^"\\*?\[\]]+)":"([^"\\*?\[\]]*)"\*$')
+
+    def __init__(self, src, req):
+        self.prefix = req.table + src.get_separator(req.db)
+        self.missing_field = src.MISSING_FIELD
+        keys = src.getKeys(req.db, req.table, "*")
+        self.fvs = dict(zip(keys, src.get_many(req.db, keys)))
+        self.indexes = {}
+        self.patterns = {}
+        self.positions = None
+        self.sorted_keys = None
+        self.json_indexes = {}
+        self.lock = threading.Lock()
+
+    def __get_index(self, field, match_entire_list):
+        """ Map each value of the field to the keys having it, a list field is split on "," unless matched entirely """
+        with self.lock:
+            if (field, match_entire_list) not in self.indexes:
+                index = {}
+                for key, fv in self.fvs.items():
+                    f_values = fv.get(field)
+                    if not f_values:
+                        continue
+                    if "," in f_values and not match_entire_list:
+                        f_value = f_values.split(",")
+                    else:
+                        f_value = [f_values]
+                    for value in dict.fromkeys(f_value):
+                        index.setdefault(value, []).append(key)
+                self.indexes[(field, match_entire_list)] = index
+        return self.indexes[(field, match_entire_list)]
+
+    def __get_json_index(self, field):
+        """
+        Map each value of the field of the keys made of a flat json object to the keys having it,
+        The keys which are not are mapped to None, as they could match any value
+        """
+        with self.lock:
+            if field not in self.json_indexes:
+                index = {}
+                for key in self.fvs:
+                    try:
+                        obj = json.loads(key[len(self.prefix):])
+                    except ValueError:
+                        obj = None
+                    if isinstance(obj, dict) and all(isinstance(value, str) for value in obj.values()):
+                        if field in obj:
+                            index.setdefault(obj[field], []).append(key)
+                    else:
+                        index.setdefault(None, []).append(key)
+                self.json_indexes[field] = index
+        return self.json_indexes[field]
+
+    def __get_prefixed_keys(self, literal):
+        """ Return the keys starting with the literal, found by a binary search of the sorted keys """
+        with self.lock:
+            if self.sorted_keys is None:
+                self.sorted_keys = sorted(self.fvs)
+        keys = []
+        for i in range(bisect.bisect_left(self.sorted_keys, literal), len(self.sorted_keys)):
+            if not self.sorted_keys[i].startswith(literal):
+                break
+            keys.append(self.sorted_keys[i])
+        return keys
+
+    def __get_candidates(self, key_pattern):
+        """ Return the keys which can match the glob pattern, in the order of the table """
+        json_field = self.JSON_FIELD_PATTERN.match(key_pattern)
+        if json_field:
+            index = self.__get_json_index(json_field.group(1))
+            keys = index.get(json_field.group(2), []) + index.get(None, [])
+        else:
+            literal = key_pattern[:self.GLOB_CHARS.search(key_pattern).start()]
+            if not literal:
+                return self.fvs
+            keys = self.__get_prefixed_keys(self.prefix + literal)
+        with self.lock:
+            if self.positions is None:
+                self.positions = {key: position for position, key in enumerate(self.fvs)}
+        return sorted(keys, key=self.positions.__getitem__)
+
+    def __get_pattern(self, key_pattern):
+        """ Translate a redis glob-style pattern of the keys of the table into a regex """
+        with self.lock:
+            if key_pattern not in self.patterns:
+                pattern = fnmatch.translate(self.prefix + key_pattern.replace("[^", "[!"))
+                self.patterns[key_pattern] = re.compile(pattern)
+        return self.patterns[key_pattern]
+
+    def get_keys(self, key_pattern, keys=None):
+        """ Return the keys matching the pattern, among the given keys or else all the keys of the table """
+        if not self.GLOB_CHARS.search(key_pattern):
+            key = self.prefix + key_pattern
+            return [key] if key in (self.fvs if keys is None else keys) else []
+        pattern = self.__get_pattern(key_pattern)
+        return [key for key in (self.__get_candidates(key_pattern) if keys is None else keys) if pattern.match(key)]
+
+    def get_keys_with_value(self, field, value, match_entire_list):
+        return self.__get_index(field, match_entire_list).get(value, [])
+
+    def get(self, key):
+        return dict(self.fvs[key])
+
+    def get_fields(self, key, fields):
+        fv = self.fvs[key]
+        return {field: fv.get(field, self.missing_field) for field in fields}
+
+
+class SnapshotStore(dict):
+    """
+    The TableSnapshots of the MatchEngines, by (namespace, data source, table). A store can be shared by the
+    MatchEngines of several threads: each table is loaded once, by the first of them requesting it, and the
+    loaded snapshot is then only read by all of them
+    """
+    def __init__(self):
+        super().__init__()
+        self.lock = threading.Lock()
+
+    def load(self, snapshot_key, loader):
+        """ Return the snapshot of the key, loaded with loader() when it isn't yet """
+        with self.lock:
+            if snapshot_key not in self:
+                self[snapshot_key] = loader()
+            return self[snapshot_key]
+
+
 class MatchEngine:
     """
     Provide a MatchRequest to fetch the relevant keys/fv's from the data source
     Usage Guidelines:
     1) Instantiate the class once for the entire execution,
                 to effectively use the caching of redis connection objects
+    2) Enable the snapshot mode when many requests are made on the same tables, Eg: dump state <module> all.
+                Each table touched is then loaded once per namespace and the requests are answered from memory,
+                The changes made to the tables afterwards are not seen until the snapshots are cleared
+    3) The MatchEngines of several threads, each with a ConnectionPool of its own, can share the snapshots
+                of the tables by passing them the same SnapshotStore
     """
-    def __init__(self, pool=None):
+    def __init__(self, pool=None, snapshot=False, snapshots=None):
         if not isinstance(pool, ConnectionPool):
             self.conn_pool = ConnectionPool()
         else:
             self.conn_pool = pool
+        if snapshots is None and snapshot:
+            snapshots = SnapshotStore()
+        self.snapshots = snapshots
+
+    def enable_snapshot(self):
+        if self.snapshots is None:
+            self.snapshots = SnapshotStore()
+
+    def clear_snapshot(self, ns=None):
+        if self.snapshots:
+            with self.snapshots.lock:
+                for snapshot_key in list(self.snapshots.keys()):
+                    if ns is None or snapshot_key[0] == ns:
+                        del self.snapshots[snapshot_key]
 
     def clear_cache(self, ns):
         self.conn_pool(ns)
@@ -400,8 +652,8 @@ class MatchEngine:
             return all_matched_keys
 
         filtered_keys = []
-        for key in all_matched_keys:
-            f_values = src.hget(req.db, key, req.field)
+        all_f_values = src.hget_many(req.db, all_matched_keys, req.field)
+        for key, f_values in zip(all_matched_keys, all_f_values):
             if not f_values:
                 continue
             if "," in f_values and not req.match_entire_list:
@@ -413,18 +665,16 @@ class MatchEngine:
         return filtered_keys
 
     def __fill_template(self, src, req, filtered_keys, template):
-        for key in filtered_keys:
-            temp = {}
-            if not req.just_keys:
-                temp[key] = src.get(req.db, key)
-                template["keys"].append(temp)
-            elif len(req.return_fields) > 0:
-                template["keys"].append(key)
-                template["return_values"][key] = {}
-                for field in req.return_fields:
-                    template["return_values"][key][field] = src.hget(req.db, key, field)
-            else:
+        if not req.just_keys:
+            for key, fv in zip(filtered_keys, src.get_many(req.db, filtered_keys)):
+                template["keys"].append({key: fv})
+        elif len(req.return_fields) > 0:
+            all_values = src.hmget_many(req.db, filtered_keys, req.return_fields)
+            for key, values in zip(filtered_keys, all_values):
                 template["keys"].append(key)
+                template["return_values"][key] = dict(zip(req.return_fields, values))
+        else:
+            template["keys"].extend(filtered_keys)
         verbose_print("Return Values:" + str(template["return_values"]))
         return template
 
@@ -442,6 +692,10 @@ class MatchEngine:
         if not src.connect(d_src, req.ns):
             return self.__display_error(EXCEP_DICT["CONN_ERR"])
 
+        # The protobuf values of the dash objects are always read from the source
+        if self.snapshots is not None and not req.PbObj:
+            return self.__fetch_from_snapshot(src, d_src, req)
+
         template = self.__create_template()
         all_matched_keys = src.getKeys(req.db, req.table, req.key_pattern)
         if not all_matched_keys:
@@ -453,6 +707,36 @@ class MatchEngine:
             return self.__display_error(EXCEP_DICT["NO_ENTRIES"])
         return self.__fill_template(src, req, filtered_keys, template)
 
+    def __fetch_from_snapshot(self, src, d_src, req):
+        def load():
+            verbose_print("Loading the snapshot of the table: {}".format(req.table))
+            return TableSnapshot(src, req)
+        snapshot = self.snapshots.load((req.ns, d_src, req.table), load)
+
+        if req.field:
+            matched_keys = snapshot.get_keys_with_value(req.field, req.value, req.match_entire_list)
+            filtered_keys = snapshot.get_keys(req.key_pattern, matched_keys)
+            if not filtered_keys and not snapshot.get_keys(req.key_pattern):
+                return self.__display_error(EXCEP_DICT["NO_MATCHES"])
+        else:
+            filtered_keys = snapshot.get_keys(req.key_pattern)
+            if not filtered_keys:
+                return self.__display_error(EXCEP_DICT["NO_MATCHES"])
+        verbose_print("Filtered Keys:" + str(filtered_keys))
+        if not filtered_keys:
+            return self.__display_error(EXCEP_DICT["NO_ENTRIES"])
+
+        template = self.__create_template()
+        for key in filtered_keys:
+            if not req.just_keys:
+                template["keys"].append({key: snapshot.get(key)})
+            else:
+                template["keys"].append(key)
+                if len(req.return_fields) > 0:
+                    template["return_values"][key] = snapshot.get_fields(key, req.return_fields)
+        verbose_print("Return Values:" + str(template["return_values"]))
+        return template
+
 
 class MatchRequestOptimizer():
     """
@@ -6,7 +6,7 @@ import importlib
 import os
 import tempfile
 from collections import defaultdict
-from swsscommon.swsscommon import ConfigDBConnector
+from swsscommon.swsscommon import ConfigDBConnector, ConfigDBPipeConnector
 from sonic_py_common import multi_asic
 from .gu_common import GenericConfigUpdaterError, genericUpdaterLogging
 from .gu_common import get_config_db_as_json
@@ -42,10 +42,33 @@ def get_config_db(scope=multi_asic.DEFAULT_NAMESPACE):
     return config_db
 
 
+def get_config_db_pipe(scope=multi_asic.DEFAULT_NAMESPACE):
+    config_db = ConfigDBPipeConnector(use_unix_socket_path=True, namespace=scope)
+    config_db.connect()
+    return config_db
+
+
 def set_config(config_db, tbl, key, data):
     config_db.set_entry(tbl, key, data)
 
 
+def mod_config(config_db, data):
+    config_db.mod_config(data)
+
+
+def get_tables(config_db, tables):
+    # Returns the given tables in the same format as get_config_db_as_json,
+    # i.e. multi-part keys joined with the key separator, and without
+    # the tables that are not present in ConfigDB.
+    #
+    data = {}
+    for tbl in tables:
+        entries = config_db.get_table(tbl)
+        if entries:
+            data[tbl] = {config_db.serialize_key(key): value for key, value in entries.items()}
+    return data
+
+
 def prune_empty_table(data):
     # For JSON Patch empty entries are valid
     # With redis, when last key is removed, the table gets removed too.
@@ -75,9 +98,17 @@ class ChangeApplier:
 
     updater_conf = None
 
-    def __init__(self, scope=multi_asic.DEFAULT_NAMESPACE):
+    def __init__(self, scope=multi_asic.DEFAULT_NAMESPACE, batch_writes=False):
         self.scope = scope
         self.config_db = get_config_db(self.scope)
+        # With batch_writes, the running config is kept in an in-memory mirror
+        # instead of being dumped via sonic-cfggen before and after every change.
+        # The keys of a change are written in a single pipelined mod_config and
+        # only the tables touched by the change are re-read from ConfigDB.
+        #
+        self.batch_writes = batch_writes
+        self.config_db_pipe = get_config_db_pipe(self.scope) if batch_writes else None
+        self.running_config = None
         self.backend_tables = [
             "BUFFER_PG",
             "BUFFER_PROFILE",
@@ -133,11 +164,89 @@ class ChangeApplier:
                 upd_keys[tbl][key] = {}
                 log_debug("Patch affected tbl={} key={}".format(tbl, key))
 
+    def _get_changed_keys(self, run_data, upd_data):
+        changed_keys = defaultdict(dict)
+        for tbl in set(run_data.keys()).union(set(upd_data.keys())):
+            run_tbl = run_data.get(tbl, {})
+            upd_tbl = upd_data.get(tbl, {})
+            for key in set(run_tbl.keys()).union(set(upd_tbl.keys())):
+                if run_tbl.get(key, None) != upd_tbl.get(key, None):
+                    changed_keys[tbl][key] = upd_tbl.get(key, None)
+        return changed_keys
+
+    def _refresh_running_config(self, tables):
+        # Re-read the given tables only, the rest of the mirror is assumed
+        # to be unchanged by anything but this applier.
+        #
+        refreshed = get_tables(self.config_db, tables)
+        changed = False
+        for tbl in tables:
+            if refreshed.get(tbl, {}) != self.running_config.get(tbl, {}):
+                changed = True
+            if tbl in refreshed:
+                self.running_config[tbl] = refreshed[tbl]
+            else:
+                self.running_config.pop(tbl, None)
+        return changed
+
+    def _write_keys(self, run_data, changed_keys, upd_keys):
+        batch = defaultdict(dict)
+        for tbl in sorted(changed_keys):
+            run_tbl = run_data.get(tbl, {})
+            for key, upd_data in changed_keys[tbl].items():
+                run_entry = run_tbl.get(key, None)
+                if upd_data is not None and run_entry is not None and \
+                        not set(run_entry.keys()).issubset(set(upd_data.keys())):
+                    # mod_config merges the fields, removing fields needs set_entry
+                    set_config(self.config_db, tbl, key, upd_data)
+                else:
+                    batch[tbl][key] = upd_data
+                upd_keys[tbl][key] = {}
+                log_debug("Patch affected tbl={} key={}".format(tbl, key))
+        if batch:
+            mod_config(self.config_db_pipe, dict(batch))
+
+    def _apply_batched(self, change):
+        if self.running_config is None:
+            self.running_config = get_config_db_as_json(self.scope)
+
+        upd_data = prune_empty_table(change.apply(copy.deepcopy(self.running_config)))
+        changed_keys = self._get_changed_keys(self.running_config, upd_data)
+
+        # The change is computed against the latest content of the tables it touches
+        if self._refresh_running_config(list(changed_keys.keys())):
+            upd_data = prune_empty_table(change.apply(copy.deepcopy(self.running_config)))
+            changed_keys = self._get_changed_keys(self.running_config, upd_data)
+
+        run_data = self.running_config
+        upd_keys = defaultdict(dict)
+        self._write_keys(run_data, changed_keys, upd_keys)
+
+        ret = self._services_validate(run_data, upd_data, upd_keys)
+
+        # The mirror becomes whatever ConfigDB holds now for the touched tables
+        touched_tables = [tbl for tbl in upd_keys if tbl]
+        self._refresh_running_config(touched_tables)
+        if not ret:
+            run_tables = {tbl: self.running_config[tbl] for tbl in touched_tables if tbl in self.running_config}
+            upd_tables = {tbl: upd_data[tbl] for tbl in touched_tables if tbl in upd_data}
+            self.remove_backend_tables_from_config(upd_tables)
+            self.remove_backend_tables_from_config(run_tables)
+            if upd_tables != run_tables:
+                self._report_mismatch(run_tables, upd_tables)
+                ret = -1
+        if ret:
+            log_error("Failed to apply Json change")
+        return ret
+
     def _report_mismatch(self, run_data, upd_data):
         log_error("run_data vs expected_data: {}".format(
             str(jsondiff.diff(run_data, upd_data))[0:40]))
 
     def apply(self, change):
+        if self.batch_writes:
+            return self._apply_batched(change)
+
         run_data = get_config_db_as_json(self.scope)
         upd_data = prune_empty_table(change.apply(copy.deepcopy(run_data)))
         upd_keys = defaultdict(dict)
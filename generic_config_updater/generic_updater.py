@@ -7,7 +7,7 @@ from enum import Enum
 from .gu_common import HOST_NAMESPACE, GenericConfigUpdaterError, EmptyTableError, ConfigWrapper, \
                     DryRunConfigWrapper, PatchWrapper, genericUpdaterLogging
 from .patch_sorter import StrictPatchSorter, NonStrictPatchSorter, ConfigSplitter, \
-                        TablesWithoutYangConfigSplitter, IgnorePathsFromYangConfigSplitter
+                        TablesWithoutYangConfigSplitter, IgnorePathsFromYangConfigSplitter, Algorithm, AStarSorter
 from .change_applier import ChangeApplier, DryRunChangeApplier
 from sonic_py_common import multi_asic
 
@@ -98,7 +98,7 @@ class PatchApplier:
         self.config_wrapper = config_wrapper if config_wrapper is not None else ConfigWrapper(scope=self.scope)
         self.patch_wrapper = patch_wrapper if patch_wrapper is not None else PatchWrapper(scope=self.scope)
         self.patchsorter = patchsorter if patchsorter is not None else StrictPatchSorter(self.config_wrapper, self.patch_wrapper)
-        self.changeapplier = changeapplier if changeapplier is not None else ChangeApplier(scope=self.scope)
+        self.changeapplier = changeapplier if changeapplier is not None else ChangeApplier(scope=self.scope, batch_writes=True)
 
     def apply(self, patch, sort=True):
         scope = self.scope if self.scope else HOST_NAMESPACE
@@ -468,8 +468,11 @@ class ConfigLockDecorator(Decorator):
 
 
 class GenericUpdateFactory:
-    def __init__(self, scope=multi_asic.DEFAULT_NAMESPACE):
+    def __init__(self, scope=multi_asic.DEFAULT_NAMESPACE, sort_algorithm=Algorithm.DFS,
+                 search_budget=AStarSorter.DEFAULT_SEARCH_BUDGET):
         self.scope = scope
+        self.sort_algorithm = sort_algorithm
+        self.search_budget = search_budget
 
     def create_patch_applier(self, config_format, verbose, dry_run, ignore_non_yang_tables, ignore_paths):
         self.init_verbose_logging(verbose)
@@ -574,11 +577,12 @@ class GenericUpdateFactory:
         if dry_run:
             return DryRunChangeApplier(config_wrapper)
         else:
-            return ChangeApplier(scope=self.scope)
+            return ChangeApplier(scope=self.scope, batch_writes=True)
 
     def get_patch_sorter(self, ignore_non_yang_tables, ignore_paths, config_wrapper, patch_wrapper):
         if not ignore_non_yang_tables and not ignore_paths:
-            return StrictPatchSorter(config_wrapper, patch_wrapper)
+            return StrictPatchSorter(config_wrapper, patch_wrapper, algorithm=self.sort_algorithm,
+                                     search_budget=self.search_budget)
 
         inner_config_splitters = []
         if ignore_non_yang_tables:
@@ -589,13 +593,15 @@ class GenericUpdateFactory:
 
         config_splitter = ConfigSplitter(config_wrapper, inner_config_splitters)
 
-        return NonStrictPatchSorter(config_wrapper, patch_wrapper, config_splitter)
+        return NonStrictPatchSorter(config_wrapper, patch_wrapper, config_splitter, algorithm=self.sort_algorithm,
+                                    search_budget=self.search_budget)
 
 
 class GenericUpdater:
-    def __init__(self, generic_update_factory=None, scope=multi_asic.DEFAULT_NAMESPACE):
-        self.generic_update_factory = \
-            generic_update_factory if generic_update_factory is not None else GenericUpdateFactory(scope=scope)
+    def __init__(self, generic_update_factory=None, scope=multi_asic.DEFAULT_NAMESPACE, sort_algorithm=Algorithm.DFS,
+                 search_budget=AStarSorter.DEFAULT_SEARCH_BUDGET):
+        self.generic_update_factory = generic_update_factory if generic_update_factory is not None else \
+            GenericUpdateFactory(scope=scope, sort_algorithm=sort_algorithm, search_budget=search_budget)
 
     def apply_patch(self, patch, config_format, verbose, dry_run, ignore_non_yang_tables, ignore_paths, sort=True):
         patch_applier = self.generic_update_factory.create_patch_applier(config_format, verbose, dry_run, ignore_non_yang_tables, ignore_paths)
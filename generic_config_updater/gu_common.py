@@ -1,5 +1,6 @@
 import json
 import jsonpatch
+import hashlib
 import importlib
 from jsonpointer import JsonPointer
 import sonic_yang
@@ -9,10 +10,16 @@ import yang as ly
 import copy
 import re
 import os
+import tempfile
+import threading
 from sonic_py_common import logger, multi_asic
+from swsscommon.swsscommon import ConfigDBPipeConnector
+from utilities_common.cli import UserCache
+from collections import OrderedDict
 from enum import Enum
 
 YANG_DIR = "/usr/local/yang-models"
+YANG_MODELS_INDEX_FILE_NAME = "yang_models_index.json"
 SYSLOG_IDENTIFIER = "GenericConfigUpdater"
 SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
 GCU_FIELD_OP_CONF_FILE = f"{SCRIPT_DIR}/gcu_field_operation_validators.conf.json"
@@ -55,8 +62,27 @@ class JsonChange:
 
 
 def get_config_db_as_json(scope=None):
-    text = get_config_db_as_text(scope=scope)
-    config_db_json = json.loads(text)
+    return get_config_db_snapshot(scope=scope)
+
+
+def get_config_db_snapshot(scope=None):
+    """
+    Reads the whole ConfigDB of the given scope in-process, in the same JSON format as
+    'sonic-cfggen -d --print-data', i.e. with multi-part keys joined by the key separator.
+    The pipe connector fetches all the keys with pipelined HGETALLs, so this saves the
+    sonic-cfggen process startup on every read of the running config.
+    """
+    namespace = scope if scope is not None else multi_asic.DEFAULT_NAMESPACE
+    try:
+        config_db = ConfigDBPipeConnector(use_unix_socket_path=True, namespace=namespace)
+        config_db.connect()
+        data = config_db.get_config()
+    except Exception as ex:
+        raise GenericConfigUpdaterError(f"Failed to get running config for namespace: {scope}, Error: {ex}")
+
+    config_db_json = {}
+    for table, entries in data.items():
+        config_db_json[table] = {config_db.serialize_key(key): value for key, value in entries.items()}
     config_db_json.pop("bgpraw", None)
     return config_db_json
 
@@ -75,11 +101,123 @@ def get_config_db_as_text(scope=None):
     return text
 
 
+class SharedYangModels:
+    """
+    Keeps a SonicYang with loaded models per YANG directory for each thread, so that all the ConfigWrapper
+    and PathAddressing instances of a thread, including the ones created per scope while applying a
+    multi-ASIC patch, parse the YANG models only once. The libyang context of the models is not thread
+    safe, the threads applying a patch in parallel each load their own.
+    """
+    _local = threading.local()
+
+    @staticmethod
+    def get(yang_dir):
+        loaded_models = getattr(SharedYangModels._local, "loaded_models", None)
+        if loaded_models is None:
+            loaded_models = SharedYangModels._local.loaded_models = {}
+
+        if yang_dir not in loaded_models:
+            sonic_yang_print_log_enabled = genericUpdaterLogging.get_verbose()
+            loaded_models_sy = sonic_yang.SonicYang(yang_dir, print_log_enabled=sonic_yang_print_log_enabled)
+            loaded_models_sy.loadYangModel() # This call takes a long time (100s of ms) because it reads files from disk
+            loaded_models[yang_dir] = loaded_models_sy
+
+        return loaded_models[yang_dir]
+
+    @staticmethod
+    def clear():
+        SharedYangModels._local.loaded_models = {}
+
+
+class YangModelsIndex:
+    """
+    An on-disk index of the info derived from the YANG models which is needed without loading the models,
+    i.e. the tables having YANG models and the tables they reference. The index is tagged with a fingerprint
+    of the YANG models directory, and it is considered stale once any YANG file is added, removed or modified.
+    """
+    VERSION = 1
+
+    def __init__(self, yang_dir=YANG_DIR, index_file=None):
+        self.yang_dir = yang_dir
+        self.index_file = index_file
+
+    def get_index_file(self):
+        # The index is kept in the cache directory of the user, unless given
+        if self.index_file is None:
+            cache_directory = UserCache(app_name="generic_config_updater").get_directory()
+            self.index_file = os.path.join(cache_directory, YANG_MODELS_INDEX_FILE_NAME)
+        return self.index_file
+
+    def get_fingerprint(self):
+        try:
+            yang_files = sorted(name for name in os.listdir(self.yang_dir) if name.endswith(".yang"))
+            entries = []
+            for yang_file in yang_files:
+                stat = os.stat(os.path.join(self.yang_dir, yang_file))
+                entries.append(f"{yang_file}:{stat.st_size}:{stat.st_mtime_ns}")
+        except OSError:
+            return None
+
+        return hashlib.sha256("\n".join(entries).encode()).hexdigest()
+
+    def load(self):
+        """
+        Returns the tables references map stored in the index, or None if the index is missing or stale.
+        """
+        try:
+            # Only an index written by the current user is trusted
+            fd = os.open(self.get_index_file(), os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0))
+            with os.fdopen(fd) as fh:
+                if os.fstat(fh.fileno()).st_uid != os.getuid():
+                    return None
+                index = json.load(fh)
+        except (OSError, ValueError):
+            return None
+
+        fingerprint = self.get_fingerprint()
+        if fingerprint is None or index.get("version") != YangModelsIndex.VERSION or \
+           index.get("fingerprint") != fingerprint:
+            return None
+
+        return {table: set(references) for table, references in index.get("tables_references", {}).items()}
+
+    def save(self, tables_references):
+        fingerprint = self.get_fingerprint()
+        if fingerprint is None:
+            return
+
+        index = {
+            "version": YangModelsIndex.VERSION,
+            "fingerprint": fingerprint,
+            "tables_references": {table: sorted(references) for table, references in tables_references.items()}
+        }
+
+        # The index is only an optimization, failing to store it should not fail the operation
+        try:
+            index_file = self.get_index_file()
+            os.makedirs(os.path.dirname(index_file), exist_ok=True)
+            fd, tmp_index_file = tempfile.mkstemp(dir=os.path.dirname(index_file),
+                                                  prefix=f"{os.path.basename(index_file)}.", suffix=".tmp")
+        except OSError:
+            return
+
+        try:
+            with os.fdopen(fd, "w") as fh:
+                json.dump(index, fh)
+            os.replace(tmp_index_file, index_file)
+        except OSError:
+            try:
+                os.remove(tmp_index_file)
+            except OSError:
+                pass
+
+
 class ConfigWrapper:
     def __init__(self, yang_dir=YANG_DIR, scope=multi_asic.DEFAULT_NAMESPACE):
         self.scope = scope
         self.yang_dir = YANG_DIR
         self.sonic_yang_with_loaded_models = None
+        self.tables_references = None
 
     def get_config_db_as_json(self):
         return get_config_db_as_json(self.scope)
@@ -160,6 +298,45 @@ class ConfigWrapper:
 
         return True, None
 
+    def get_tables_references(self):
+        """
+        Returns a map of each table with YANG model to the tables it references through leafref, must or when
+        statements. References are found by looking up the names of the tables in the xpaths of the table YANG
+        container, and the groupings it might use, so the map can contain more references than the actual ones.
+        """
+        if self.tables_references is None:
+            yang_models_index = YangModelsIndex(self.yang_dir)
+            tables_references = yang_models_index.load()
+            if tables_references is None:
+                tables_references = self._create_tables_references()
+                yang_models_index.save(tables_references)
+            self.tables_references = tables_references
+
+        return self.tables_references
+
+    def _create_tables_references(self):
+        sy = self.create_sonic_yang_with_loaded_models()
+        tables = set(sy.confDbYangMap.keys())
+        modules = {module_json['module']['@name']: module_json['module'] for module_json in sy.yJson}
+
+        tables_references = {}
+        for table in tables:
+            cmap = sy.confDbYangMap[table]
+            yang_module = cmap['yangModule']
+            models = [cmap['container'], yang_module.get('grouping')]
+
+            imports = yang_module.get('import', [])
+            if not isinstance(imports, list):
+                imports = [imports]
+            for yang_import in imports:
+                imported_module = modules.get(yang_import.get('@module'), {})
+                models.append(imported_module.get('grouping'))
+
+            names = set(re.findall(r"(?<=[:/])([A-Za-z0-9_-]+)", json.dumps(models)))
+            tables_references[table] = (names & tables) - {table}
+
+        return tables_references
+
     def validate_field_operation(self, old_config, target_config):
         """
         Some fields in ConfigDB are restricted and may not allow third-party addition, replacement, or removal.
@@ -318,15 +495,11 @@ class ConfigWrapper:
         return True, None
 
     def crop_tables_without_yang(self, config_db_as_json):
-        sy = self.create_sonic_yang_with_loaded_models()
-
-        sy.jIn = copy.deepcopy(config_db_as_json)
+        # The tables with YANG models are read from the YANG models index, to avoid loading the models
+        tables_with_yang = self.get_tables_references()
 
-        sy.tablesWithOutYang = dict()
-
-        sy._cropConfigDB()
-
-        return sy.jIn
+        return {table: copy.deepcopy(config_db_as_json[table])
+                for table in config_db_as_json if table in tables_with_yang}
 
     def get_empty_tables(self, config):
         empty_tables = []
@@ -344,12 +517,9 @@ class ConfigWrapper:
 
     # TODO: move creating copies of sonic_yang with loaded models to sonic-yang-mgmt directly
     def create_sonic_yang_with_loaded_models(self):
-        # sonic_yang_with_loaded_models will only be initialized once the first time this method is called
-        if self.sonic_yang_with_loaded_models is None:
-            sonic_yang_print_log_enabled = genericUpdaterLogging.get_verbose()
-            loaded_models_sy = sonic_yang.SonicYang(self.yang_dir, print_log_enabled=sonic_yang_print_log_enabled)
-            loaded_models_sy.loadYangModel() # This call takes a long time (100s of ms) because it reads files from disk
-            self.sonic_yang_with_loaded_models = loaded_models_sy
+        # The models are loaded once per thread and shared by all the ConfigWrapper instances of the thread,
+        # they are looked up on each call as the instance might be used from another thread
+        self.sonic_yang_with_loaded_models = SharedYangModels.get(self.yang_dir)
 
         return copy.copy(self.sonic_yang_with_loaded_models)
 
@@ -460,8 +630,12 @@ class PathAddressing:
     PATH_SEPARATOR = "/"
     XPATH_SEPARATOR = "/"
 
+    REF_INDEXES_CACHE_SIZE = 8
+
     def __init__(self, config_wrapper=None):
         self.config_wrapper = config_wrapper
+        # Reference indexes of the recently queried configs, keyed by the config object identity
+        self.ref_indexes = OrderedDict()
 
     def get_path_tokens(self, path):
         return JsonPointer(path).parts
@@ -607,30 +781,76 @@ class PathAddressing:
         return self._find_leafref_paths(path, config)
 
     def _find_leafref_paths(self, path, config):
-        sy = self._create_sonic_yang_with_loaded_models()
+        return self._get_ref_index(config).find_leafref_paths(path)
 
-        tmp_config = copy.deepcopy(config)
+    def _get_ref_index(self, config):
+        """
+        Returns the reference index of the given config. Configs are expected not to be modified in place after
+        being queried, as the indexes are cached by the config object identity.
 
-        sy.loadData(tmp_config)
+        If the config is a recently indexed config with only some tables or keys removed, which is the case of
+        the configs simulated by the patch sorter for remove moves, the index is derived from the indexed config
+        instead of loading the config again.
+        """
+        config_id = id(config)
+        ref_index = self.ref_indexes.get(config_id)
+        if ref_index is not None and ref_index.config is config:
+            self.ref_indexes.move_to_end(config_id)
+            return ref_index
+
+        ref_index = None
+        for indexed_ref_index in reversed(self.ref_indexes.values()):
+            removed_paths = self._get_removed_paths(indexed_ref_index.config, config)
+            if removed_paths is not None:
+                ref_index = ConfigRefIndex(self, config, indexed_ref_index, removed_paths)
+                break
 
-        xpath = self.convert_path_to_xpath(path, config, sy)
+        if ref_index is None:
+            ref_index = ConfigRefIndex(self, config)
 
-        leaf_xpaths = self._get_inner_leaf_xpaths(xpath, sy)
+        self.ref_indexes[config_id] = ref_index
+        self.ref_indexes.move_to_end(config_id)
+        if len(self.ref_indexes) > PathAddressing.REF_INDEXES_CACHE_SIZE:
+            self.ref_indexes.popitem(last=False)
 
-        ref_xpaths = []
-        for xpath in leaf_xpaths:
-            ref_xpaths.extend(sy.find_data_dependencies(xpath))
+        return ref_index
 
-        ref_paths = []
-        ref_paths_set = set()
-        for ref_xpath in ref_xpaths:
-            ref_path = self.convert_xpath_to_path(ref_xpath, config, sy)
-            if ref_path not in ref_paths_set:
-                ref_paths.append(ref_path)
-                ref_paths_set.add(ref_path)
+    def _get_removed_paths(self, config, derived_config):
+        """
+        Returns the paths of the tables and keys removed from 'config' to get 'derived_config', or None if
+        'derived_config' has any other change. Unchanged tables and keys are detected by object identity, since
+        configs simulated by the patch sorter share all the unchanged containers with the original config.
+        """
+        if not isinstance(config, dict) or not isinstance(derived_config, dict):
+            return None
 
-        ref_paths.sort()
-        return ref_paths
+        removed_paths = []
+        for table in derived_config:
+            if table not in config:
+                return None
+
+        for table in config:
+            if table not in derived_config:
+                removed_paths.append(self.create_path([table]))
+                continue
+
+            table_config = config[table]
+            derived_table_config = derived_config[table]
+            if table_config is derived_table_config:
+                continue
+
+            if not isinstance(table_config, dict) or not isinstance(derived_table_config, dict):
+                return None
+
+            for key in derived_table_config:
+                if key not in table_config or table_config[key] is not derived_table_config[key]:
+                    return None
+
+            for key in table_config:
+                if key not in derived_table_config:
+                    removed_paths.append(self.create_path([table, key]))
+
+        return removed_paths
 
     def _get_inner_leaf_xpaths(self, xpath, sy):
         if xpath == "/": # Point to Root element which contains all xpaths
@@ -1100,6 +1320,84 @@ class PathAddressing:
 
         return None
 
+class ConfigRefIndex:
+    """
+    Index of the references between the nodes of a config snapshot.
+
+    The config is loaded into SonicYang once, and the references of each leaf are looked up once and then
+    memoized, so repeated lookups for the same snapshot are dictionary hits instead of reloading the config.
+
+    An index can be derived from the index of a config that has some more tables or keys. The derived index
+    reuses the loaded data tree and the memoized references of the original index, and filters out any
+    leaf or reference under the removed paths.
+    """
+    def __init__(self, path_addressing, config, base_ref_index=None, removed_paths=None):
+        self.path_addressing = path_addressing
+        self.config = config
+
+        if base_ref_index is None:
+            self.sy = path_addressing._create_sonic_yang_with_loaded_models()
+            self.sy.loadData(copy.deepcopy(config))
+            self.loaded_config = config
+            self.leaf_refs = {}
+            self.removed_paths = set()
+        else:
+            self.sy = base_ref_index.sy
+            self.loaded_config = base_ref_index.loaded_config
+            self.leaf_refs = base_ref_index.leaf_refs
+            self.removed_paths = base_ref_index.removed_paths.union(removed_paths)
+
+        self.removed_xpaths = [self._get_removed_xpath(path) for path in self.removed_paths]
+        self.removed_xpaths = [xpath for xpath in self.removed_xpaths if xpath is not None]
+
+    def find_leafref_paths(self, path):
+        xpath = self.path_addressing.convert_path_to_xpath(path, self.loaded_config, self.sy)
+
+        ref_paths = []
+        ref_paths_set = set()
+        for leaf_xpath in self.path_addressing._get_inner_leaf_xpaths(xpath, self.sy):
+            if self._is_removed_xpath(leaf_xpath):
+                continue
+
+            for ref_path in self._get_leaf_refs(leaf_xpath):
+                if ref_path in ref_paths_set or self._is_removed_path(ref_path):
+                    continue
+                ref_paths.append(ref_path)
+                ref_paths_set.add(ref_path)
+
+        ref_paths.sort()
+        return ref_paths
+
+    def _get_leaf_refs(self, leaf_xpath):
+        if leaf_xpath not in self.leaf_refs:
+            self.leaf_refs[leaf_xpath] = [
+                self.path_addressing.convert_xpath_to_path(ref_xpath, self.loaded_config, self.sy)
+                for ref_xpath in self.sy.find_data_dependencies(leaf_xpath)]
+
+        return self.leaf_refs[leaf_xpath]
+
+    def _get_removed_xpath(self, path):
+        table = self.path_addressing.get_path_tokens(path)[0]
+        if table not in self.sy.confDbYangMap: # tables without YANG models are not loaded
+            return None
+        return self.path_addressing.convert_path_to_xpath(path, self.loaded_config, self.sy)
+
+    def _is_removed_path(self, path):
+        if not self.removed_paths:
+            return False
+
+        # Only tables and keys are removed, i.e. the first 2 tokens. Splitting by the separator is safe because
+        # it is escaped within the tokens of JsonPointer paths.
+        tokens = path.split(PathAddressing.PATH_SEPARATOR)
+        return PathAddressing.PATH_SEPARATOR.join(tokens[:2]) in self.removed_paths or \
+               PathAddressing.PATH_SEPARATOR.join(tokens[:3]) in self.removed_paths
+
+    def _is_removed_xpath(self, xpath):
+        for removed_xpath in self.removed_xpaths:
+            if xpath == removed_xpath or xpath.startswith(removed_xpath + PathAddressing.XPATH_SEPARATOR):
+                return True
+        return False
+
 class TitledLogger(logger.Logger):
     def __init__(self, syslog_identifier, title, verbose, print_all_to_console):
         super().__init__(syslog_identifier)
@@ -1,41 +1,153 @@
 import copy
+import heapq
 import json
 import jsonpatch
 from collections import deque, OrderedDict
 from enum import Enum
+from jsonpointer import JsonPointer
 from .gu_common import OperationWrapper, OperationType, GenericConfigUpdaterError, \
                        JsonChange, PathAddressing, genericUpdaterLogging
 
 class Diff:
     """
     A class that contains the diff info between current and target configs.
+
+    The configs held by a Diff are never modified in place. Applying a move produces a new Diff whose
+    current config shares all the untouched sub-trees with the original one, so exploring a move and
+    backtracking from it does not require copying the whole config. A structural hash of each config
+    is maintained incrementally, so hashing a Diff only costs the size of the sub-tree touched by the
+    last move instead of re-serializing both configs.
     """
-    def __init__(self, current_config, target_config):
+    HASH_MASK = (1 << 64) - 1
+
+    def __init__(self, current_config, target_config, current_config_hash=None, target_config_hash=None):
         self.current_config = current_config
         self.target_config = target_config
+        self._current_config_hash = current_config_hash
+        self._target_config_hash = target_config_hash
 
     def __hash__(self):
-        cc = json.dumps(self.current_config, sort_keys=True)
-        tc = json.dumps(self.target_config, sort_keys=True)
-        return hash((cc,tc))
+        return hash((self.get_current_config_hash(), self.get_target_config_hash()))
 
     def __eq__(self, other):
         """Overrides the default implementation"""
         if isinstance(other, Diff):
+            if self._have_different_hashes(self._current_config_hash, other._current_config_hash) or \
+               self._have_different_hashes(self._target_config_hash, other._target_config_hash):
+                return False
             return self.current_config == other.current_config and self.target_config == other.target_config
 
         return False
 
-    # TODO: Can be optimized to apply the move in place. JsonPatch supports that using the option 'in_place=True'
-    # Check: https://python-json-patch.readthedocs.io/en/latest/tutorial.html#applying-a-patch
-    # NOTE: in case move is applied in place, we will need to support `undo_move` as well.
+    def get_current_config_hash(self):
+        if self._current_config_hash is None:
+            self._current_config_hash = Diff.get_structural_hash(self.current_config)
+        return self._current_config_hash
+
+    def get_target_config_hash(self):
+        if self._target_config_hash is None:
+            self._target_config_hash = Diff.get_structural_hash(self.target_config)
+        return self._target_config_hash
+
     def apply_move(self, move):
         new_current_config = move.apply(self.current_config)
-        return Diff(new_current_config, self.target_config)
+
+        new_current_config_hash = None
+        if self._current_config_hash is not None:
+            new_current_config_hash = self._get_updated_hash(move, new_current_config)
+
+        return Diff(new_current_config, self.target_config, new_current_config_hash, self._target_config_hash)
 
     def has_no_diff(self):
+        if self._have_different_hashes(self._current_config_hash, self._target_config_hash):
+            return False
         return self.current_config == self.target_config
 
+    def _have_different_hashes(self, hash1, hash2):
+        # Hashes are only compared if both are already computed, otherwise comparing the configs directly is cheaper
+        return hash1 is not None and hash2 is not None and hash1 != hash2
+
+    def _get_updated_hash(self, move, new_current_config):
+        """
+        Updates the hash of the current config by replacing the hash contribution of the sub-tree affected
+        by the move. If the move modifies a list, the whole list is the affected sub-tree because the
+        indexes of the list items following the modified item are shifted.
+        """
+        tokens = JsonPointer(move.path).parts
+        if not tokens:
+            return Diff.get_structural_hash(new_current_config)
+
+        affected_tokens = Diff._get_hash_tokens(self.current_config, tokens)
+        if affected_tokens is None:
+            # The move path does not exist in the current config, fallback to hashing the whole config
+            return Diff.get_structural_hash(new_current_config)
+
+        old_hash = Diff._get_sub_tree_hash(self.current_config, affected_tokens)
+        new_hash = Diff._get_sub_tree_hash(new_current_config, affected_tokens)
+
+        return (self._current_config_hash - old_hash + new_hash) & Diff.HASH_MASK
+
+    @staticmethod
+    def _get_hash_tokens(config, tokens):
+        """
+        Returns the tokens of the affected sub-tree, converting list indexes to int as used by the hash.
+        Returns None if the parent of the path does not exist in the config.
+        """
+        hash_tokens = []
+        ptr = config
+        for token in tokens[:-1]:
+            if isinstance(ptr, list):
+                if not token.isdigit() or int(token) >= len(ptr):
+                    return None
+                token = int(token)
+            elif not isinstance(ptr, dict) or token not in ptr:
+                return None
+            hash_tokens.append(token)
+            ptr = ptr[token]
+
+        if isinstance(ptr, list):
+            return hash_tokens
+        if not isinstance(ptr, dict):
+            return None
+
+        hash_tokens.append(tokens[-1])
+        return hash_tokens
+
+    @staticmethod
+    def _get_sub_tree_hash(config, tokens):
+        ptr = config
+        for token in tokens:
+            if isinstance(ptr, list):
+                if token >= len(ptr):
+                    return 0
+            elif token not in ptr:
+                return 0
+            ptr = ptr[token]
+
+        return Diff.get_structural_hash(ptr, tokens)
+
+    @staticmethod
+    def get_structural_hash(config, tokens=()):
+        """
+        Returns an order-independent hash of the given config, computed as the sum of the hashes of every node
+        paired with its path. Since the contribution of each sub-tree is additive, the hash can be updated
+        by subtracting the hash of the old sub-tree and adding the hash of the new one.
+        """
+        config_hash = 0
+        nodes = [(tuple(tokens), config)]
+        while nodes:
+            path, node = nodes.pop()
+            if isinstance(node, dict):
+                config_hash += hash((path, dict))
+                nodes.extend((path + (key,), value) for key, value in node.items())
+            elif isinstance(node, list):
+                config_hash += hash((path, list))
+                nodes.extend((path + (index,), value) for index, value in enumerate(node))
+            else:
+                config_hash += hash((path, node))
+
+        return config_hash & Diff.HASH_MASK
+
     def __str__(self):
         return f"""current_config: {self.current_config}
 target_config: {self.target_config}"""
@@ -272,7 +384,33 @@ class JsonMove:
         return JsonMove(diff, op_type, current_config_tokens, target_config_tokens)
 
     def apply(self, config):
-        return self.patch.apply(config)
+        """
+        Returns a new config after applying the move to the given config. Only the containers along the move
+        path are copied, the rest of the returned config is shared with the given config. Neither config is
+        expected to be modified in place afterwards.
+        """
+        tokens = JsonPointer(self.path).parts
+        if not tokens:
+            return self.patch.apply(config)
+
+        new_config = JsonMove._copy_along_path(config, tokens[:-1])
+        return self.patch.apply(new_config, in_place=True)
+
+    @staticmethod
+    def _copy_along_path(config, tokens):
+        new_config = copy.copy(config)
+        ptr = new_config
+        for token in tokens:
+            if isinstance(ptr, list):
+                if not token.isdigit() or int(token) >= len(ptr):
+                    break
+                token = int(token)
+            elif not isinstance(ptr, dict) or token not in ptr:
+                break
+            ptr[token] = copy.copy(ptr[token])
+            ptr = ptr[token]
+
+        return new_config
 
     def __str__(self):
         return str(self.patch)
@@ -676,15 +814,72 @@ class DeleteWholeConfigMoveValidator:
 class FullConfigMoveValidator:
     """
     A class to validate that full config is valid according to YANG models after applying the move.
+
+    The validation result is cached by the structural hash of the simulated config, so a config reached
+    through different move sequences is only validated once.
+
+    If delta_validation is enabled and the config before the move is known to be valid, only the tables
+    affected by the move are validated. The affected tables are the table modified by the move, the tables
+    referring to it, and all the tables they transitively reference so that their references can be resolved.
     """
-    def __init__(self, config_wrapper):
+    ALWAYS_VALIDATED_TABLES = ["DEVICE_METADATA"]
+
+    def __init__(self, config_wrapper, delta_validation=False):
         self.config_wrapper = config_wrapper
+        self.delta_validation = delta_validation
+        self.validation_cache = {}
 
     def validate(self, move, diff):
-        simulated_config = move.apply(diff.current_config)
+        simulated_diff = diff.apply_move(move)
+        simulated_config_hash = simulated_diff.get_current_config_hash()
+        if simulated_config_hash not in self.validation_cache:
+            self.validation_cache[simulated_config_hash] = \
+                self._validate_simulated_config(move, diff, simulated_diff.current_config)
+
+        return self.validation_cache[simulated_config_hash]
+
+    def _validate_simulated_config(self, move, diff, simulated_config):
+        if self.delta_validation and self._is_current_config_valid(diff):
+            tables = self._get_tables_to_validate(move)
+            if tables is not None:
+                partial_config = {table: simulated_config[table] for table in tables if table in simulated_config}
+                is_valid, error = self.config_wrapper.validate_config_db_config(partial_config)
+                return is_valid
+
         is_valid, error = self.config_wrapper.validate_config_db_config(simulated_config)
         return is_valid
 
+    def _is_current_config_valid(self, diff):
+        current_config_hash = diff.get_current_config_hash()
+        if current_config_hash not in self.validation_cache:
+            is_valid, error = self.config_wrapper.validate_config_db_config(diff.current_config)
+            self.validation_cache[current_config_hash] = is_valid
+
+        return self.validation_cache[current_config_hash]
+
+    def _get_tables_to_validate(self, move):
+        tokens = JsonPointer(move.path).parts
+        if not tokens: # whole config is updated
+            return None
+
+        modified_table = tokens[0]
+        tables_references = self.config_wrapper.get_tables_references()
+        if modified_table not in tables_references:
+            return None
+
+        tables = set([modified_table] + self.ALWAYS_VALIDATED_TABLES)
+        tables.update(table for table, references in tables_references.items() if modified_table in references)
+
+        tables_to_check = deque(tables)
+        while tables_to_check:
+            table = tables_to_check.popleft()
+            for referenced_table in tables_references.get(table, []):
+                if referenced_table not in tables:
+                    tables.add(referenced_table)
+                    tables_to_check.append(referenced_table)
+
+        return tables
+
 class CreateOnlyMoveValidator:
     """
     A class to validate create-only fields are only created, but never modified/updated. In other words:
@@ -1470,13 +1665,26 @@ class UpperLevelMoveExtender:
       1) If parent was in current and target, then replace the parent
       2) If parent was in current but not target, then delete the parent
       3) If parent was in target but not current, then add the parent
+
+    Many moves of the same diff share the same parent, so the parent move is created only once per diff.
     """
+    def __init__(self):
+        self.extended_diff = None
+        self.extended_tokens = set()
+
     def extend(self, move, diff):
         # if no tokens i.e. whole config
         if not move.current_config_tokens:
             return
 
         upper_current_tokens = move.current_config_tokens[:-1]
+        if diff is not self.extended_diff:
+            self.extended_diff = diff
+            self.extended_tokens = set()
+        if tuple(upper_current_tokens) in self.extended_tokens:
+            return
+        self.extended_tokens.add(tuple(upper_current_tokens))
+
         operation_type = self._get_upper_operation(upper_current_tokens, diff)
 
         upper_target_tokens = None
@@ -1624,16 +1832,185 @@ class MemoizationSorter:
         self.mem[diff_hash] = bst_moves
         return bst_moves
 
+class AStarSorter:
+    """
+    A best-first sorter ordering the explored diffs by the cost of the moves applied so far plus a weighted
+    estimation of the cost left, with ties broken in favor of the diff closest to the target config.
+
+    The cost of a move is its disruption, i.e. the number of leaves it removes plus the number of leaves it
+    writes, so replacing a whole table or the whole config costs as much as rewriting each of its fields and
+    the search prefers the same fine-grained moves as DfsSorter. The estimation is the number of keys that
+    differ between the current and the target configs, each of them costing at least one leaf to fix. It is
+    maintained incrementally by only recounting the table touched by a move. A field-level replace costs two
+    for a single key, hence the default weight of two, which keeps the search diving towards the target while
+    bounding the cost of the sorting found to twice the least disruptive one.
+
+    Moves leading to an already reached diff are dropped before being validated. The search gives up after
+    expanding search_budget diffs, so it fails fast instead of exploring the whole state space.
+    """
+    DEFAULT_SEARCH_BUDGET = 10000
+    DEFAULT_HEURISTIC_WEIGHT = 2
+
+    def __init__(self, move_wrapper, search_budget=DEFAULT_SEARCH_BUDGET, heuristic_weight=DEFAULT_HEURISTIC_WEIGHT):
+        self.move_wrapper = move_wrapper
+        self.search_budget = search_budget
+        self.heuristic_weight = heuristic_weight
+        self.expanded_count = 0
+        self.leaves_counts = {}
+
+    def sort(self, diff):
+        # Each entry is (estimated total cost, estimated keys left, pending, insertion order, cost so far, diff,
+        # moves, last), where moves is a linked list (move, previous moves) to avoid copying the moves on every
+        # push. A pending entry stands for a move not simulated yet on its diff, with lower bounds of the
+        # estimations and last being (move, keys left before the move). A simulated entry is validated when it
+        # is popped, last being (move, diff before the move). So only the moves reaching the head of the queue
+        # are simulated and validated, and the coarse moves which never do are not.
+        reached = {}
+        remaining = self._count_remaining_keys(diff)
+        queue = [(self.heuristic_weight * remaining, remaining, False, 0, 0, diff, None, None)]
+        insertion_count = 1
+        self.expanded_count = 0
+        self.leaves_counts = {}
+
+        while queue:
+            _, remaining, pending, _, cost, diff, moves, last = heapq.heappop(queue)
+            if pending:
+                move, parent_remaining = last
+                new_diff = self.move_wrapper.simulate(move, diff)
+                if reached.get(hash(new_diff), cost + 1) <= cost:
+                    continue
+                new_remaining = self._update_remaining_keys(parent_remaining, move, diff, new_diff)
+                priority = cost + self.heuristic_weight * new_remaining
+                heapq.heappush(queue, (priority, new_remaining, False, insertion_count, cost, new_diff,
+                                       (move, moves), (move, diff)))
+                insertion_count += 1
+                continue
+
+            if reached.get(hash(diff), cost + 1) <= cost:
+                continue
+            if last is not None and not self.move_wrapper.validate(*last):
+                continue
+            reached[hash(diff)] = cost
+
+            if diff.has_no_diff():
+                return self._to_list(moves)
+
+            if self.expanded_count >= self.search_budget:
+                return None
+            self.expanded_count += 1
+
+            for move in self.move_wrapper.generate(diff):
+                new_cost = cost + self._get_move_cost(move, diff)
+                # A move below the table level changes a single key, an upper level move changes at most a key
+                # per leaf it costs
+                fixed_count = 1 if len(move.current_config_tokens) > 1 else new_cost - cost
+                new_remaining = max(remaining - fixed_count, 0)
+                priority = new_cost + self.heuristic_weight * new_remaining
+                heapq.heappush(queue, (priority, new_remaining, True, insertion_count, new_cost, diff, moves,
+                                       (move, remaining)))
+                insertion_count += 1
+
+        return None
+
+    def _get_move_cost(self, move, diff):
+        # The value an add or a replace writes is the target value, possibly nested in its missing parents
+        cost = 0
+        if move.op_type != OperationType.ADD:
+            cost += self._count_leaves(self._get_value(diff.current_config, move.current_config_tokens))
+        if move.op_type != OperationType.REMOVE:
+            cost += self._count_leaves(self._get_value(diff.target_config, move.target_config_tokens))
+        return max(cost, 1)
+
+    def _get_value(self, config, tokens):
+        for token in tokens:
+            config = config[token]
+        return config
+
+    def _count_leaves(self, value):
+        if not isinstance(value, (dict, list)):
+            return 1
+
+        # The configs of the explored diffs share their unchanged values, so the counts are cached by value
+        # identity, keeping a reference to each counted value so that its id is not reused
+        cached = self.leaves_counts.get(id(value))
+        if cached is not None and cached[0] is value:
+            return cached[1]
+
+        if isinstance(value, dict):
+            count = sum(self._count_leaves(child) for child in value.values()) or 1
+        else:
+            count = len(value) or 1
+        self.leaves_counts[id(value)] = (value, count)
+        return count
+
+    def _to_list(self, moves):
+        moves_list = []
+        while moves is not None:
+            move, moves = moves
+            moves_list.append(move)
+        moves_list.reverse()
+        return moves_list
+
+    def _count_remaining_keys(self, diff):
+        tables = set(diff.current_config.keys()) | set(diff.target_config.keys())
+        return sum(self._count_table_remaining_keys(diff, table) for table in tables)
+
+    def _update_remaining_keys(self, remaining, move, parent_diff, new_diff):
+        if new_diff.has_no_diff():
+            return 0
+
+        tokens = move.current_config_tokens
+        if not tokens:
+            return self._count_remaining_keys(new_diff)
+
+        table = tokens[0]
+        if len(tokens) == 1 or not isinstance(parent_diff.current_config.get(table, {}), dict):
+            return remaining - self._count_table_remaining_keys(parent_diff, table) \
+                             + self._count_table_remaining_keys(new_diff, table)
+
+        # Moves below the key level only affect a single key
+        key = tokens[1]
+        return remaining - self._is_key_remaining(parent_diff, table, key) \
+                         + self._is_key_remaining(new_diff, table, key)
+
+    def _count_table_remaining_keys(self, diff, table):
+        current_table = diff.current_config.get(table, {})
+        target_table = diff.target_config.get(table, {})
+        if current_table is target_table:
+            return 0
+
+        if not isinstance(current_table, dict) or not isinstance(target_table, dict):
+            return 0 if current_table == target_table else 1
+
+        count = 0
+        for key in set(current_table.keys()) | set(target_table.keys()):
+            if key not in current_table or key not in target_table or current_table[key] != target_table[key]:
+                count += 1
+        return count
+
+    def _is_key_remaining(self, diff, table, key):
+        current_table = diff.current_config.get(table, {})
+        target_table = diff.target_config.get(table, {})
+        if not isinstance(current_table, dict) or not isinstance(target_table, dict):
+            return 0 if current_table == target_table else 1
+
+        if (key in current_table) != (key in target_table):
+            return 1
+        return int(key in current_table and current_table[key] != target_table[key])
+
 class Algorithm(Enum):
     DFS = 1
     BFS = 2
     MEMOIZATION = 3
+    ASTAR = 4
 
 class SortAlgorithmFactory:
-    def __init__(self, operation_wrapper, config_wrapper, path_addressing):
+    def __init__(self, operation_wrapper, config_wrapper, path_addressing,
+                 search_budget=AStarSorter.DEFAULT_SEARCH_BUDGET):
         self.operation_wrapper = operation_wrapper
         self.config_wrapper = config_wrapper
         self.path_addressing = path_addressing
+        self.search_budget = search_budget
 
     def create(self, algorithm=Algorithm.DFS):
         move_generators = [RemoveCreateOnlyDependencyMoveGenerator(self.path_addressing),
@@ -1645,7 +2022,7 @@ class SortAlgorithmFactory:
                           DeleteInsteadOfReplaceMoveExtender(),
                           DeleteRefsMoveExtender(self.path_addressing)]
         move_validators = [DeleteWholeConfigMoveValidator(),
-                           FullConfigMoveValidator(self.config_wrapper),
+                           FullConfigMoveValidator(self.config_wrapper, delta_validation=True),
                            NoDependencyMoveValidator(self.path_addressing, self.config_wrapper),
                            CreateOnlyMoveValidator(self.path_addressing),
                            RequiredValueMoveValidator(self.path_addressing),
@@ -1660,19 +2037,25 @@ class SortAlgorithmFactory:
             sorter = BfsSorter(move_wrapper)
         elif algorithm == Algorithm.MEMOIZATION:
             sorter = MemoizationSorter(move_wrapper)
+        elif algorithm == Algorithm.ASTAR:
+            sorter = AStarSorter(move_wrapper, self.search_budget)
         else:
             raise ValueError(f"Algorithm {algorithm} is not supported")
 
         return sorter
 
 class StrictPatchSorter:
-    def __init__(self, config_wrapper, patch_wrapper, inner_patch_sorter=None):
+    def __init__(self, config_wrapper, patch_wrapper, inner_patch_sorter=None, algorithm=Algorithm.DFS,
+                 search_budget=AStarSorter.DEFAULT_SEARCH_BUDGET):
         self.logger = genericUpdaterLogging.get_logger(title="Patch Sorter - Strict", print_all_to_console=True)
         self.config_wrapper = config_wrapper
         self.patch_wrapper = patch_wrapper
-        self.inner_patch_sorter = inner_patch_sorter if inner_patch_sorter else PatchSorter(config_wrapper, patch_wrapper)
+        self.inner_patch_sorter = inner_patch_sorter if inner_patch_sorter else \
+            PatchSorter(config_wrapper, patch_wrapper, search_budget=search_budget)
+        self.algorithm = algorithm
 
-    def sort(self, patch, algorithm=Algorithm.DFS):
+    def sort(self, patch, algorithm=None):
+        algorithm = algorithm if algorithm is not None else self.algorithm
         current_config = self.config_wrapper.get_config_db_as_json()
 
         # Validate patch is only updating tables with yang models
@@ -1854,15 +2237,19 @@ class ChangeWrapper:
         return adjusted_changes
 
 class NonStrictPatchSorter:
-    def __init__(self, config_wrapper, patch_wrapper, config_splitter, change_wrapper=None, patch_sorter=None):
+    def __init__(self, config_wrapper, patch_wrapper, config_splitter, change_wrapper=None, patch_sorter=None,
+                 algorithm=Algorithm.DFS, search_budget=AStarSorter.DEFAULT_SEARCH_BUDGET):
         self.logger = genericUpdaterLogging.get_logger(title="Patch Sorter - Non-Strict", print_all_to_console=True)
         self.config_wrapper = config_wrapper
         self.patch_wrapper = patch_wrapper
         self.config_splitter = config_splitter
         self.change_wrapper = change_wrapper if change_wrapper else ChangeWrapper(patch_wrapper, config_splitter)
-        self.inner_patch_sorter = patch_sorter if patch_sorter else PatchSorter(config_wrapper, patch_wrapper)
+        self.inner_patch_sorter = patch_sorter if patch_sorter else \
+            PatchSorter(config_wrapper, patch_wrapper, search_budget=search_budget)
+        self.algorithm = algorithm
 
-    def sort(self, patch, algorithm=Algorithm.DFS):
+    def sort(self, patch, algorithm=None):
+        algorithm = algorithm if algorithm is not None else self.algorithm
         current_config = self.config_wrapper.get_config_db_as_json()
         target_config = self.patch_wrapper.simulate_patch(patch, current_config)
 
@@ -1915,13 +2302,14 @@ class NonStrictPatchSorter:
         return changes
 
 class PatchSorter:
-    def __init__(self, config_wrapper, patch_wrapper, sort_algorithm_factory=None):
+    def __init__(self, config_wrapper, patch_wrapper, sort_algorithm_factory=None,
+                 search_budget=AStarSorter.DEFAULT_SEARCH_BUDGET):
         self.config_wrapper = config_wrapper
         self.patch_wrapper = patch_wrapper
         self.operation_wrapper = OperationWrapper()
         self.path_addressing = PathAddressing(self.config_wrapper)
         self.sort_algorithm_factory = sort_algorithm_factory if sort_algorithm_factory else \
-            SortAlgorithmFactory(self.operation_wrapper, config_wrapper, self.path_addressing)
+            SortAlgorithmFactory(self.operation_wrapper, config_wrapper, self.path_addressing, search_budget)
 
     def sort(self, patch, algorithm=Algorithm.DFS, preloaded_current_config=None):
         current_config = preloaded_current_config if preloaded_current_config else self.config_wrapper.get_config_db_as_json()
@@ -2,20 +2,28 @@
 
 import os
 import argparse
+import copy
 import json
 import sys
 import traceback
 import re
 import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 
-from sonic_py_common import device_info, logger
+from sonic_py_common import device_info, logger, multi_asic
 from swsscommon.swsscommon import SonicV2Connector, ConfigDBConnector, SonicDBConfig
 from minigraph import parse_xml
 from utilities_common.helper import update_config
+from utilities_common.db_snapshot import DBSnapshot
+from utilities_common.redis_pipeline import get_pipeline_client
 
 INIT_CFG_FILE = '/etc/sonic/init_cfg.json'
 MINIGRAPH_FILE = '/etc/sonic/minigraph.xml'
 GOLDEN_CFG_FILE = '/etc/sonic/golden_config_db.json'
+# The fingerprint of the last migration and the parsed config sources, per namespace
+MIGRATION_CACHE_FILE = '/etc/sonic/db_migrator_cache{}.json'
 
 # mock the redis for unit test purposes #
 try:
@@ -28,6 +36,7 @@ try:
         INIT_CFG_FILE = os.path.join(mocked_db_path, "init_cfg.json")
         MINIGRAPH_FILE = os.path.join(mocked_db_path, "minigraph.xml")
         GOLDEN_CFG_FILE = os.path.join(mocked_db_path, "golden_config_db.json")
+        MIGRATION_CACHE_FILE = None
 except KeyError:
     pass
 
@@ -39,6 +48,67 @@ DEFAULT_NAMESPACE = ''
 log = logger.Logger(SYSLOG_IDENTIFIER)
 
 
+# The input files parsed by the process, shared by the namespaces it migrates
+input_cache = {}
+input_cache_lock = threading.Lock()
+
+
+def load_json(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def load_input(path, loader):
+    '''
+    Load an input file of the migration once per process, again only if it
+    changed. The data is shared by the namespaces migrated by the process, so
+    each gets a copy it may change.
+    '''
+    signature = get_file_signature(path)
+    with input_cache_lock:
+        cached = input_cache.get(path)
+        if cached is None or cached[0] != signature or cached[1] is not loader:
+            cached = (signature, loader, loader(path))
+            input_cache[path] = cached
+    return copy.deepcopy(cached[2])
+
+
+def get_file_signature(path):
+    '''
+    The modification time and size of a file, None if it doesn't exist.
+    '''
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def encode_config(config):
+    '''
+    Encode a config whose keys may be tuples, as the minigraph parser makes
+    them, to a form JSON can hold.
+    '''
+    if not isinstance(config, dict):
+        return config
+    if any(isinstance(key, tuple) for key in config):
+        return {'__items__': [[list(key) if isinstance(key, tuple) else key, encode_config(value)]
+                              for key, value in config.items()]}
+    return {key: encode_config(value) for key, value in config.items()}
+
+
+def decode_config(config):
+    '''
+    Decode a config encoded by encode_config.
+    '''
+    if not isinstance(config, dict):
+        return config
+    if '__items__' in config:
+        return {tuple(key) if isinstance(key, list) else key: decode_config(value)
+                for key, value in config['__items__']}
+    return {key: decode_config(value) for key, value in config.items()}
+
+
 class DBMigrator():
     def __init__(self, namespace, socket=None):
         """
@@ -65,9 +135,17 @@ class DBMigrator():
         self.TABLE_KEY       = 'DATABASE'
         self.TABLE_FIELD     = 'VERSION'
 
+        self.migration_cache_file = None
+        if MIGRATION_CACHE_FILE:
+            self.migration_cache_file = MIGRATION_CACHE_FILE.format('.' + namespace if namespace else '')
+        self.migration_cache = self.load_migration_cache()
+
         # Generate config_src_data from minigraph and golden config
         self.generate_config_src(namespace)
 
+        self.namespace = namespace
+        self.socket = socket
+
         db_kwargs = {}
         if socket:
             db_kwargs['unix_socket_path'] = socket
@@ -94,6 +172,7 @@ class DBMigrator():
 
         version_info = device_info.get_sonic_version_info()
         self.asic_type = version_info.get('asic_type')
+        self.build_version = version_info.get('build_version')
         if not self.asic_type:
             log.log_error("ASIC type information not obtained. DB migration will not be reliable")
 
@@ -111,24 +190,33 @@ class DBMigrator():
         This method uses golden_config_data and minigraph_data as local variables,
         which means they are not accessible or modifiable from outside this method.
         This way, this method ensures that these variables are not changed unintentionally.
+        The config_src_data of the last migration is reused while minigraph
+        and golden config are unchanged.
         Args:
             ns: namespace
         Returns:
         '''
+        self.config_src_inputs = {'namespace': ns,
+                                  'golden_config': get_file_signature(GOLDEN_CFG_FILE),
+                                  'minigraph': get_file_signature(MINIGRAPH_FILE)}
+        cached = self.migration_cache.get('config_src', {})
+        if 'data' in cached and cached.get('inputs') == self.config_src_inputs:
+            self.config_src_data = decode_config(cached['data'])
+            return
+
         # load config data from golden_config_db.json
         golden_config_data = None
         try:
             if os.path.isfile(GOLDEN_CFG_FILE):
-                with open(GOLDEN_CFG_FILE) as f:
-                    golden_data = json.load(f)
-                    if ns is None:
-                        golden_config_data = golden_data
+                golden_data = load_input(GOLDEN_CFG_FILE, load_json)
+                if ns is None:
+                    golden_config_data = golden_data
+                else:
+                    if ns == DEFAULT_NAMESPACE:
+                        config_namespace = "localhost"
                     else:
-                        if ns == DEFAULT_NAMESPACE:
-                            config_namespace = "localhost"
-                        else:
-                            config_namespace = ns
-                        golden_config_data = golden_data.get(config_namespace, None)
+                        config_namespace = ns
+                    golden_config_data = golden_data.get(config_namespace, None)
         except Exception as e:
             log.log_error('Caught exception while trying to load golden config: ' + str(e))
             pass
@@ -136,7 +224,7 @@ class DBMigrator():
         minigraph_data = None
         try:
             if os.path.isfile(MINIGRAPH_FILE):
-                minigraph_data = parse_xml(MINIGRAPH_FILE)
+                minigraph_data = load_input(MINIGRAPH_FILE, parse_xml)
         except Exception as e:
             log.log_error('Caught exception while trying to parse minigraph: ' + str(e))
             pass
@@ -1267,8 +1355,7 @@ class DBMigrator():
 
     def common_migration_ops(self):
         try:
-            with open(INIT_CFG_FILE) as f:
-                init_db = json.load(f)
+            init_db = load_input(INIT_CFG_FILE, load_json)
         except Exception as e:
             raise Exception(str(e))
 
@@ -1303,18 +1390,120 @@ class DBMigrator():
         self.migrate_tacplus()
         self.migrate_aaa()
 
-    def migrate(self):
+    def set_dbs(self, configDB, appDB):
+        self.configDB = configDB
+        self.appDB = appDB
+        if hasattr(self, 'mellanox_buffer_migrator'):
+            self.mellanox_buffer_migrator.configDB = configDB
+            self.mellanox_buffer_migrator.appDB = appDB
+
+    @contextmanager
+    def db_snapshots(self):
+        '''
+        Run the migration against in-memory snapshots of CONFIG_DB and APPL_DB,
+        written back only if every step succeeds, each as the diff of the
+        migration in a single transaction.
+        APPL_DB is written first so that the new version of CONFIG_DB is the
+        last change, and an interrupted write is migrated again.
+        '''
+        configDB, appDB = self.configDB, self.appDB
+        appDB_snapshot = DBSnapshot(appDB, appDB.APPL_DB,
+                                    get_pipeline_client(appDB, appDB.APPL_DB, self.namespace, self.socket))
+        configDB_snapshot = DBSnapshot(configDB, configDB.CONFIG_DB,
+                                       get_pipeline_client(configDB, configDB.CONFIG_DB, self.namespace, self.socket))
+        self.set_dbs(configDB_snapshot, appDB_snapshot)
+        try:
+            yield
+        finally:
+            self.set_dbs(configDB, appDB)
+
+        for snapshot in [appDB_snapshot, configDB_snapshot]:
+            count = snapshot.commit()
+            log.log_info('Wrote {} migrated keys to {}'.format(count, snapshot.db_name))
+
+    def migrate_steps(self):
+        '''
+        Run the version steps from the current version, and the common
+        migration ops.
+        Returns:
+            the list of the versions migrated
+        '''
         version = self.get_version()
         log.log_info('Upgrading from version ' + version)
+        versions = []
         while version:
+            versions.append(version)
             next_version = getattr(self, version)()
             if next_version == version:
                 raise Exception('Version migrate from %s stuck in same version' % version)
             version = next_version
         # Perform common migration ops
         self.common_migration_ops()
+        return versions
+
+    def load_migration_cache(self):
+        if not self.migration_cache_file:
+            return {}
+        try:
+            with open(self.migration_cache_file) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_migration_cache(self, fingerprint, versions):
+        if not self.migration_cache_file:
+            return
+        cache = {
+            'migration': dict(fingerprint, versions=versions),
+            'config_src': {'inputs': self.config_src_inputs, 'data': encode_config(self.config_src_data)}
+        }
+        try:
+            tmp_file = self.migration_cache_file + '.tmp'
+            with open(tmp_file, 'w') as f:
+                json.dump(cache, f)
+            os.replace(tmp_file, self.migration_cache_file)
+        except (OSError, TypeError, ValueError) as e:
+            log.log_warning('Failed to save the migration cache: ' + str(e))
+
+    def get_migration_fingerprint(self, appl_db_tables):
+        '''
+        The fingerprint of the databases and of the inputs of the migration:
+        the version, platform and image the database was migrated with,
+        INIT_CFG, the golden config and minigraph, the content of CONFIG_DB
+        and of the given tables of APPL_DB.
+        Only the tables of APPL_DB the migration steps use are fingerprinted,
+        the others hold runtime state, e.g. the routes restored on warm reboot.
+        '''
+        return {
+            'key': [self.get_version(), self.asic_type, self.hwsku, self.build_version,
+                    get_file_signature(INIT_CFG_FILE), self.config_src_inputs],
+            'config_db': self.configDB.get_digest(),
+            'appl_db': self.appDB.get_table_digests(appl_db_tables)
+        }
+
+    def is_migrated(self, fingerprint):
+        '''
+        Whether the databases and the inputs of the migration are unchanged
+        since the last migration.
+        '''
+        migration = self.migration_cache.get('migration', {})
+        return all(migration.get(name) == value for name, value in fingerprint.items())
+
+    def migrate(self):
+        with self.db_snapshots():
+            # The APPL_DB tables the steps used in the last migration
+            appl_db_tables = self.migration_cache.get('migration', {}).get('appl_db')
+            if isinstance(appl_db_tables, dict) and \
+                    self.is_migrated(self.get_migration_fingerprint(list(appl_db_tables))):
+                log.log_notice('Databases unchanged since their migration to {}, nothing to migrate'.format(
+                               self.get_version()))
+                return
+            versions = self.migrate_steps()
+            # The digests of the tables the steps did not change are those computed above
+            fingerprint = self.get_migration_fingerprint(self.appDB.get_used_tables())
         # Perform yang validation
         self.validate()
+        self.save_migration_cache(fingerprint, versions)
 
     def validate(self):
         config = self.configDB.get_config()
@@ -1331,7 +1520,7 @@ class DBMigrator():
                     new_table[table_key] = table_val
             if hit:
                 config[table_name] = new_table
-        config_file = "/tmp/validate.json"
+        config_file = "/tmp/validate{}.json".format('.' + self.namespace if self.namespace else '')
         with open(config_file, 'w') as fp:
             json.dump(config, fp)
         process = subprocess.Popen(["config_validator.py", "-c", config_file])
@@ -1342,6 +1531,30 @@ class DBMigrator():
             ret = process.wait()
             assert ret == 0, "Yang validation failed"
 
+def run_namespaces(namespaces, operation):
+    '''
+    Run an operation on the databases of several namespaces in parallel, one
+    worker per namespace. The input files are parsed once, for all of them.
+    Returns:
+        a dict of the result of the operation per namespace, or of the
+        exception it raised
+    '''
+    def run(namespace):
+        dbmgtr = DBMigrator(namespace)
+        return getattr(dbmgtr, operation)()
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=len(namespaces)) as executor:
+        futures = [(namespace, executor.submit(run, namespace)) for namespace in namespaces]
+        for namespace, future in futures:
+            try:
+                results[namespace] = future.result()
+            except Exception as e:
+                log.log_error('Caught exception in namespace {}: {}'.format(namespace or 'host', str(e)))
+                results[namespace] = e
+    return results
+
+
 def main():
     try:
         parser = argparse.ArgumentParser()
@@ -1368,11 +1581,35 @@ def main():
                         required = False,
                         help = 'The asic namespace whose DB instance we need to connect',
                         default = None )
+        parser.add_argument('-a', '--all-namespaces',
+                        dest='all_namespaces',
+                        action='store_true',
+                        help = 'Run the operation on the host and on every asic namespace, in parallel')
         args = parser.parse_args()
         operation = args.operation
         socket_path = args.socket
         namespace = args.namespace
 
+        if args.all_namespaces:
+            if socket_path or namespace is not None:
+                parser.error('-a cannot be used with -s or -n')
+            if multi_asic.is_multi_asic():
+                if not SonicDBConfig.isGlobalInit():
+                    SonicDBConfig.initializeGlobalConfig()
+            elif not SonicDBConfig.isInit():
+                SonicDBConfig.initialize()
+
+            namespaces = [None] + [ns for ns in multi_asic.get_namespace_list() if ns]
+            results = run_namespaces(namespaces, operation)
+            for ns, result in results.items():
+                if isinstance(result, Exception):
+                    print('{}: failed: {}'.format(ns or 'host', result))
+                else:
+                    print('{}: {}'.format(ns or 'host', result if result else 'done'))
+            if any(isinstance(result, Exception) for result in results.values()):
+                sys.exit(1)
+            return
+
         # Can't load global config base on the result of is_multi_asic(), because on multi-asic device, when db_migrate.py
         # run on the local database, ASIC instance will have not created the /var/run/redis0/sonic-db/database-config.json
         if args.namespace is not None:
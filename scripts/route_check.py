@@ -19,6 +19,13 @@ How:
     5) Rule out local interfaces & default routes
     6) If still outstanding diffs, report failure.
 
+    With --streaming, the route keys are read with SCAN batches instead of
+    being listed at once. APPL-DB routes are held as packed prefixes in a
+    set, ASIC-DB routes are streamed against it, so only the APPL-DB set and
+    the mismatches are kept in memory. Instead of subscribing to ASIC-DB, the
+    mismatches are re-checked against a second scan of ASIC-DB after waiting
+    for a second.
+
 To verify:
     Run this tool in SONiC switch and watch the result. In case of failure
     checkout the result to validate the failure.
@@ -58,6 +65,13 @@ APPL_DB_NAME = 'APPL_DB'
 ASIC_DB_NAME = 'ASIC_DB'
 ASIC_TABLE_NAME = 'ASIC_STATE'
 ASIC_KEY_PREFIX = 'SAI_OBJECT_TYPE_ROUTE_ENTRY:'
+APPL_ROUTE_KEY_PATTERN = 'ROUTE_TABLE:*'
+ASIC_ROUTE_KEY_PATTERN = ASIC_TABLE_NAME + ':' + ASIC_KEY_PREFIX + '*'
+
+SCAN_BATCH_SIZE = 1000
+
+ROUTE_CHECK_STATUS_FILE = '/var/run/route_check/status.json'
+DAEMON_SELECT_TIMEOUT_MSECS = 1000
 
 SUBSCRIBE_WAIT_SECS = 1
 
@@ -233,6 +247,52 @@ def diff_sorted_lists(t1, t2):
     return t1_miss, t2_miss
 
 
+def pack_prefix(prefix):
+    """
+    helper to convert a prefix into a compact hashable form.
+    :param prefix: prefix as string, e.g. "10.0.0.0/24"
+    :return packed address bytes followed by the prefix length byte
+    """
+    intf = ipaddress.ip_interface(prefix)
+    return intf.ip.packed + bytes([intf.network.prefixlen])
+
+
+def unpack_prefix(packed):
+    """
+    helper to convert a packed prefix back to its string form.
+    :param packed: prefix as returned by pack_prefix
+    :return prefix as string
+    """
+    if len(packed) == 5:
+        return str(ipaddress.IPv4Interface((packed[:4], packed[4])))
+    return str(ipaddress.IPv6Interface((packed[:16], packed[16])))
+
+
+def unpack_prefixes(packed_prefixes):
+    """
+    helper to convert packed prefixes back to a sorted list of strings.
+    :param packed_prefixes: iterable of packed prefixes
+    :return sorted list of prefixes as strings
+    """
+    return sorted(unpack_prefix(p) for p in packed_prefixes)
+
+
+def scan_keys(db, pattern):
+    """
+    helper to iterate keys matching the pattern, SCAN_BATCH_SIZE keys at a time.
+    :param db: DBConnector to scan
+    :param pattern: glob-style pattern of the keys
+    :return generator of keys
+    """
+    cursor = 0
+    while True:
+        cursor, keys = db.scan(cursor, pattern, SCAN_BATCH_SIZE)
+        for k in keys:
+            yield k
+        if int(cursor) == 0:
+            break
+
+
 def checkout_rt_entry(k):
     """
     helper to filter out correct keys and strip out IP alone.
@@ -281,6 +341,20 @@ def is_vrf(k):
     return k.startswith("Vrf")
 
 
+def checkout_appl_rt_entry(k):
+    """
+    helper to normalize an APPL-DB ROUTE_TABLE key into a prefix.
+    :param k: key without the table name, possibly prefixed with a VRF
+    :return (True, prefix) or (False, None) for local routes
+    """
+    if (is_vrf(k)):
+        k = k.split(":", 1)[1]
+
+    if is_local(k):
+        return False, None
+    return True, add_prefix_ifnot(k.lower())
+
+
 def get_appdb_routes(namespace):
     """
     helper to read route table from APPL-DB.
@@ -329,6 +403,82 @@ def get_asicdb_routes(namespace):
     return (selector, subs, sorted(rt))
 
 
+def get_appdb_routes_packed(namespace):
+    """
+    helper to scan route table from APPL-DB.
+    :return set of packed routes with prefix ensured
+    """
+    db = swsscommon.DBConnector(APPL_DB_NAME, REDIS_TIMEOUT_MSECS, True, namespace)
+    print_message(syslog.LOG_DEBUG, "APPL DB connected for routes scan")
+
+    valid_rt = set()
+    for k in scan_keys(db, APPL_ROUTE_KEY_PATTERN):
+        res, e = checkout_appl_rt_entry(k.split(":", 1)[1])
+        if res:
+            valid_rt.add(pack_prefix(e))
+
+    print_message(syslog.LOG_DEBUG, "APPL DB routes scanned: {}".format(len(valid_rt)))
+    return valid_rt
+
+
+def scan_asicdb_routes(namespace):
+    """
+    helper to scan route entries from ASIC-DB.
+    :return generator of packed routes
+    """
+    db = swsscommon.DBConnector(ASIC_DB_NAME, REDIS_TIMEOUT_MSECS, True, namespace)
+    print_message(syslog.LOG_DEBUG, "ASIC DB {} connected for routes scan".format(namespace))
+
+    for k in scan_keys(db, ASIC_ROUTE_KEY_PATTERN):
+        res, e = checkout_rt_entry(k.split(":", 1)[1])
+        if res:
+            yield pack_prefix(e)
+
+
+def diff_routes_streaming(namespace, rt_appl, intf_appl):
+    """
+    helper to diff APPL-DB and ASIC-DB routes while scanning ASIC-DB.
+    :param rt_appl: set of packed APPL-DB routes, consumed by the diff
+    :param intf_appl: set of packed APPL-DB interface addresses
+    :return (<APPL-DB routes missing in ASIC-DB>, <ASIC-DB routes missing in APPL-DB>,
+             <interface addresses missing in ASIC-DB>) as sets of packed routes
+    """
+    rt_asic_miss = set()
+    intf_appl_miss = set(intf_appl)
+
+    for rt in scan_asicdb_routes(namespace):
+        intf_appl_miss.discard(rt)
+        if rt in rt_appl:
+            rt_appl.discard(rt)
+        else:
+            rt_asic_miss.add(rt)
+
+    return rt_appl, rt_asic_miss, intf_appl_miss
+
+
+def recheck_routes_streaming(namespace, rt_appl_miss, rt_asic_miss):
+    """
+    helper to re-check the mismatches against ASIC-DB after a while, as
+    an update might have been in flight when ASIC-DB was first scanned.
+    :return (adds, deletes) as sorted lists, i.e. the APPL-DB routes missing
+    in ASIC-DB that got added and the unexpected ASIC-DB routes that got removed.
+    """
+    time.sleep(SUBSCRIBE_WAIT_SECS)
+
+    pending = set(pack_prefix(rt) for rt in rt_appl_miss + rt_asic_miss)
+    present = set()
+    for rt in scan_asicdb_routes(namespace):
+        if rt in pending:
+            present.add(rt)
+
+    adds = sorted(rt for rt in rt_appl_miss if pack_prefix(rt) in present)
+    deletes = sorted(rt for rt in rt_asic_miss if pack_prefix(rt) not in present)
+
+    print_message(syslog.LOG_DEBUG, "adds={}".format(adds))
+    print_message(syslog.LOG_DEBUG, "dels={}".format(deletes))
+    return adds, deletes
+
+
 def is_suppress_fib_pending_enabled(namespace):
     """
     Returns True if FIB suppression is enabled, False otherwise
@@ -796,9 +946,288 @@ def check_routes_for_namespace(namespace):
     return results, adds, deletes
 
 
-def check_routes(namespace):
+def check_routes_for_namespace_streaming(namespace):
     """
-    Main function to parallelize route checks across all namespaces.
+    Process a Single Namespace in streaming mode:
+    Same checks as check_routes_for_namespace, but the routes are scanned in
+    batches and diffed as packed prefixes, so that the memory used is driven
+    by the APPL-DB route set and the mismatches rather than by sorted copies
+    of all the tables.
+
+    :return (results, adds, deletes) as check_routes_for_namespace.
+    """
+
+    results = {}
+    adds = []
+    deletes = []
+
+    rt_appl = get_appdb_routes_packed(namespace)
+    intf_appl = set(pack_prefix(ip) for ip in get_interfaces(namespace))
+
+    # Diff APPL-DB routes & ASIC-DB routes
+    rt_appl_miss, rt_asic_miss, intf_appl_miss = diff_routes_streaming(namespace, rt_appl, intf_appl)
+
+    # Check missed ASIC routes against APPL-DB INTF_TABLE
+    rt_asic_miss = unpack_prefixes(rt_asic_miss - intf_appl)
+    rt_appl_miss = unpack_prefixes(rt_appl_miss)
+    intf_appl_miss = unpack_prefixes(intf_appl_miss)
+
+    rt_appl_miss, rt_asic_miss = filter_out_route_misses(namespace, rt_appl_miss, rt_asic_miss)
+
+    if rt_appl_miss or rt_asic_miss:
+        adds, deletes = recheck_routes_streaming(namespace, rt_appl_miss, rt_asic_miss)
+
+    # Drop all those which got added or removed meanwhile
+    rt_appl_miss, _ = diff_sorted_lists(rt_appl_miss, adds)
+    rt_asic_miss, _ = diff_sorted_lists(rt_asic_miss, deletes)
+
+    if rt_appl_miss:
+        results["missed_ROUTE_TABLE_routes"] = rt_appl_miss
+
+    if intf_appl_miss:
+        results["missed_INTF_TABLE_entries"] = intf_appl_miss
+
+    if rt_asic_miss:
+        results["Unaccounted_ROUTE_ENTRY_TABLE_entries"] = rt_asic_miss
+
+    # The APPL-DB set was consumed by the diff, it is scanned again if needed for mitigation
+    check_frr_routes(namespace, results, rt_appl_miss, rt_asic_miss, lambda: get_appdb_routes_packed(namespace))
+
+    return results, adds, deletes
+
+
+def filter_out_route_misses(namespace, rt_appl_miss, rt_asic_miss):
+    """
+    helper to rule out the expected mismatches, as check_routes_for_namespace does.
+    :param rt_appl_miss: sorted APPL-DB routes missing in ASIC-DB
+    :param rt_asic_miss: sorted ASIC-DB routes missing in APPL-DB, interfaces excluded
+    :return (rt_appl_miss, rt_asic_miss) filtered
+    """
+    rt_asic_miss = filter_out_default_routes(rt_asic_miss)
+    rt_asic_miss = filter_out_vnet_routes(namespace, rt_asic_miss)
+    rt_asic_miss = filter_out_standalone_tunnel_routes(namespace, rt_asic_miss)
+    rt_asic_miss = filter_out_soc_ip_routes(namespace, rt_asic_miss)
+
+    if rt_appl_miss:
+        rt_appl_miss = filter_out_local_interfaces(namespace, rt_appl_miss)
+
+    if rt_appl_miss:
+        rt_appl_miss = filter_out_voq_neigh_routes(namespace, rt_appl_miss)
+
+    # NOTE: On dualtor environment, ignore any route miss for the
+    # neighbors learned from the vlan subnet.
+    if rt_appl_miss or rt_asic_miss:
+        rt_appl_miss, rt_asic_miss = filter_out_vlan_neigh_route_miss(namespace, rt_appl_miss, rt_asic_miss)
+
+    return rt_appl_miss, rt_asic_miss
+
+
+def check_frr_routes(namespace, results, rt_appl_miss, rt_asic_miss, get_rt_appl):
+    """
+    helper to add the FRR routes not offloaded to the results, and mitigate
+    them if APPL-DB and ASIC-DB are in sync.
+    :param get_rt_appl: callable returning the set of packed APPL-DB routes
+    """
+    rt_frr_miss = check_frr_pending_routes(namespace)
+
+    if rt_frr_miss:
+        results["missed_FRR_routes"] = rt_frr_miss
+
+    if results:
+        if rt_frr_miss and not rt_appl_miss and not rt_asic_miss:
+            print_message(syslog.LOG_ERR, "Some routes are not set offloaded in FRR{} \
+                          but all routes in APPL_DB and ASIC_DB are in sync".format(namespace))
+            if is_suppress_fib_pending_enabled(namespace):
+                rt_appl = get_rt_appl()
+                rt_appl_frr = set(entry['prefix'] for entry in rt_frr_miss
+                                  if pack_prefix(add_prefix_ifnot(entry['prefix'].lower())) in rt_appl)
+                mitigate_installed_not_offloaded_frr_routes(namespace, rt_frr_miss, rt_appl_frr)
+
+
+class RouteCheckState:
+    """
+    Live APPL-DB and ASIC-DB route sets of a namespace, along with their
+    mismatches, kept up to date from the subscription updates.
+    """
+    def __init__(self, namespace):
+        self.namespace = namespace
+        self.rt_appl = set()
+        self.rt_asic = set()
+        # Mismatches, as packed route to the time the mismatch started
+        self.rt_appl_miss = {}
+        self.rt_asic_miss = {}
+
+        appl_db = swsscommon.DBConnector(APPL_DB_NAME, REDIS_TIMEOUT_MSECS, True, namespace)
+        asic_db = swsscommon.DBConnector(ASIC_DB_NAME, REDIS_TIMEOUT_MSECS, True, namespace)
+        # The subscribers first return the whole tables, then the updates
+        self.appl_subs = swsscommon.SubscriberStateTable(appl_db, 'ROUTE_TABLE')
+        self.asic_subs = swsscommon.SubscriberStateTable(asic_db, ASIC_TABLE_NAME)
+
+    def add_to_selector(self, selector):
+        selector.addSelectable(self.appl_subs)
+        selector.addSelectable(self.asic_subs)
+
+    def process_updates(self, now=None):
+        """
+        Consume the pending subscription updates.
+        :return count of route updates
+        """
+        now = time.time() if now is None else now
+        count = 0
+        while True:
+            k, op, _ = self.appl_subs.pop()
+            if not k:
+                break
+            res, e = checkout_appl_rt_entry(k)
+            if res:
+                self._update(pack_prefix(e), op == "SET", self.rt_appl, self.rt_asic,
+                             self.rt_appl_miss, self.rt_asic_miss, now)
+                count += 1
+
+        while True:
+            k, op, _ = self.asic_subs.pop()
+            if not k:
+                break
+            res, e = checkout_rt_entry(k)
+            if res:
+                self._update(pack_prefix(e), op == "SET", self.rt_asic, self.rt_appl,
+                             self.rt_asic_miss, self.rt_appl_miss, now)
+                count += 1
+
+        return count
+
+    def _update(self, rt, present, rt_own, rt_other, own_miss, other_miss, now):
+        if present:
+            rt_own.add(rt)
+            if rt in rt_other:
+                other_miss.pop(rt, None)
+            else:
+                own_miss.setdefault(rt, now)
+        else:
+            rt_own.discard(rt)
+            own_miss.pop(rt, None)
+            if rt in rt_other:
+                other_miss.setdefault(rt, now)
+
+    def get_results(self, now=None):
+        """
+        Filter the mismatches older than SUBSCRIBE_WAIT_SECS as
+        check_routes_for_namespace does, the newer ones might still be
+        in flight between APPL-DB and ASIC-DB.
+        :return results as check_routes_for_namespace
+        """
+        now = time.time() if now is None else now
+        results = {}
+
+        intf_appl = get_interfaces(self.namespace)
+        intf_appl_packed = set(pack_prefix(ip) for ip in intf_appl)
+
+        rt_appl_miss = unpack_prefixes(rt for rt, since in self.rt_appl_miss.items()
+                                       if now - since >= SUBSCRIBE_WAIT_SECS)
+        rt_asic_miss = unpack_prefixes(rt for rt, since in self.rt_asic_miss.items()
+                                       if now - since >= SUBSCRIBE_WAIT_SECS and rt not in intf_appl_packed)
+        intf_appl_miss = sorted(ip for ip in intf_appl if pack_prefix(ip) not in self.rt_asic)
+
+        rt_appl_miss, rt_asic_miss = filter_out_route_misses(self.namespace, rt_appl_miss, rt_asic_miss)
+
+        if rt_appl_miss:
+            results["missed_ROUTE_TABLE_routes"] = rt_appl_miss
+
+        if intf_appl_miss:
+            results["missed_INTF_TABLE_entries"] = intf_appl_miss
+
+        if rt_asic_miss:
+            results["Unaccounted_ROUTE_ENTRY_TABLE_entries"] = rt_asic_miss
+
+        check_frr_routes(self.namespace, results, rt_appl_miss, rt_asic_miss, lambda: self.rt_appl)
+
+        return results
+
+
+def save_status(ret, results):
+    """
+    helper to save the latest daemon result for --query.
+    """
+    status = {"timestamp": time.time(), "return": ret, "results": results}
+    os.makedirs(os.path.dirname(ROUTE_CHECK_STATUS_FILE), exist_ok=True)
+    tmp_file = ROUTE_CHECK_STATUS_FILE + ".tmp"
+    with open(tmp_file, "w") as f:
+        json.dump(status, f, indent=4)
+    os.replace(tmp_file, ROUTE_CHECK_STATUS_FILE)
+
+
+def query_status():
+    """
+    Print the latest result saved by the daemon.
+    :return (ret, results) of the latest daemon check
+    """
+    try:
+        with open(ROUTE_CHECK_STATUS_FILE, "r") as f:
+            status = json.load(f)
+    except (OSError, ValueError) as e:
+        print_message(syslog.LOG_ERR, "No route check daemon result available: {}".format(e))
+        return -1, None
+
+    print(json.dumps(status, indent=4))
+    return status["return"], status["results"]
+
+
+def report_daemon_results(states):
+    """
+    helper to log and save the current results of all the namespaces.
+    :return (ret, results) as check_routes
+    """
+    now = time.time()
+    results = {}
+    for state in states:
+        try:
+            result = state.get_results(now)
+        except Exception as e:
+            print_message(syslog.LOG_ERR, "Error processing namespace {}: {}".format(state.namespace, e))
+            result = {"error": str(e)}
+        if result:
+            results[state.namespace] = result
+
+    if results:
+        print_message(syslog.LOG_WARNING, "Failure results: {",  json.dumps(results, indent=4), "}")
+        ret = -1
+    else:
+        print_message(syslog.LOG_INFO, "All good!")
+        ret = 0
+        results = None
+
+    save_status(ret, results)
+    return ret, results
+
+
+def run_daemon(namespace, interval):
+    """
+    Keep the route sets of the namespaces up to date from the subscription
+    updates and report the mismatches every interval seconds.
+    :return (ret, results) of the last report, when unit testing only
+    """
+    states = [RouteCheckState(ns) for ns in get_route_check_namespaces(namespace)]
+    selector = swsscommon.Select()
+    for state in states:
+        state.add_to_selector(selector)
+        state.process_updates()
+
+    next_report = time.time() + interval
+    while True:
+        selector.select(DAEMON_SELECT_TIMEOUT_MSECS)
+        for state in states:
+            state.process_updates()
+
+        if UNIT_TESTING or time.time() >= next_report:
+            ret, res = report_daemon_results(states)
+            next_report = time.time() + interval
+            if UNIT_TESTING:
+                return ret, res
+
+
+def get_route_check_namespaces(namespace):
+    """
+    helper to get the namespaces to check.
     """
     namespace_list = []
     if namespace is not multi_asic.DEFAULT_NAMESPACE and namespace in multi_asic.get_namespace_list():
@@ -806,6 +1235,14 @@ def check_routes(namespace):
     else:
         namespace_list = multi_asic.get_namespace_list()
         print_message(syslog.LOG_INFO, "Checking routes for namespaces: ", namespace_list)
+    return namespace_list
+
+
+def check_routes(namespace, streaming=False):
+    """
+    Main function to parallelize route checks across all namespaces.
+    """
+    namespace_list = get_route_check_namespaces(namespace)
 
     results = {}
     all_adds = {}
@@ -813,7 +1250,8 @@ def check_routes(namespace):
 
     # Use ThreadPoolExecutor to parallelize the check for each namespace
     with concurrent.futures.ThreadPoolExecutor() as executor:
-        futures = {executor.submit(check_routes_for_namespace, ns): ns for ns in namespace_list}
+        check_fn = check_routes_for_namespace_streaming if streaming else check_routes_for_namespace
+        futures = {executor.submit(check_fn, ns): ns for ns in namespace_list}
 
         for future in concurrent.futures.as_completed(futures):
             ns = futures[future]
@@ -852,8 +1290,17 @@ def main():
     parser.add_argument("-i", "--interval", type=int, default=0, help="Scan interval in seconds")
     parser.add_argument("-s", "--log_to_syslog", action="store_true", default=True, help="Write message to syslog")
     parser.add_argument('-n','--namespace',   default=multi_asic.DEFAULT_NAMESPACE, help='Verify routes for this specific namespace')
+    parser.add_argument("--streaming", action="store_true", default=False,
+                        help="Scan the routes in batches and diff them as packed prefixes to bound memory")
+    parser.add_argument("--daemon", action="store_true", default=False,
+                        help="Keep running, tracking the route updates and reporting every interval")
+    parser.add_argument("--query", action="store_true", default=False,
+                        help="Print the latest result of the running daemon")
     args = parser.parse_args()
 
+    if args.query:
+        return query_status()
+
     namespace = args.namespace
     if namespace is not multi_asic.DEFAULT_NAMESPACE and not multi_asic.is_multi_asic():
         print_message(syslog.LOG_ERR, "Namespace option is not valid for a single-ASIC device")
@@ -882,9 +1329,12 @@ def main():
         print_message(syslog.LOG_INFO, "BGP feature is disabled, exiting without checking routes!!")
         return 0, None
 
+    if args.daemon:
+        return run_daemon(namespace, interval if interval else MIN_SCAN_INTERVAL)
+
     while True:
         signal.alarm(TIMEOUT_SECONDS)
-        ret, res= check_routes(namespace)
+        ret, res= check_routes(namespace, args.streaming)
         print_message(syslog.LOG_DEBUG, "ret={}, res={}".format(ret, res))
         signal.alarm(0)
 
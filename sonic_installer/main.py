@@ -5,7 +5,8 @@ import subprocess
 import sys
 import time
 import utilities_common.cli as clicommon
-from urllib.request import urlopen, urlretrieve
+from urllib.request import urlopen
+from utilities_common.download import download, DEFAULT_CHUNK_SIZE, DEFAULT_WORKERS
 
 import click
 from sonic_py_common import logger
@@ -536,9 +537,17 @@ def sonic_installer():
               help='If system available memory is lower than threhold, setup SWAP memory',
               cls=clicommon.MutuallyExclusiveOption, mutually_exclusive=['skip_setup_swap'],
               callback=validate_positive_int)
+@click.option('--checksum', metavar='<algorithm>:<digest>',
+              help='Checksum the downloaded image is verified against, e.g. sha256:<hex digest>')
+@click.option('--download-workers', default=DEFAULT_WORKERS, type=int, show_default=True,
+              help='Number of segments of the image downloaded in parallel', callback=validate_positive_int)
+@click.option('--download-chunk-size', default=DEFAULT_CHUNK_SIZE // (1024 * 1024), type=int,
+              show_default='8 MiB', help='Size in MiB of the segments of the image downloaded',
+              callback=validate_positive_int)
 @click.argument('url')
 def install(url, force, skip_platform_check=False, skip_migration=False, skip_package_migration=False,
-            skip_setup_swap=False, swap_mem_size=None, total_mem_threshold=None, available_mem_threshold=None):
+            skip_setup_swap=False, swap_mem_size=None, total_mem_threshold=None, available_mem_threshold=None,
+            checksum=None, download_workers=DEFAULT_WORKERS, download_chunk_size=DEFAULT_CHUNK_SIZE // (1024 * 1024)):
     """ Install image from local binary or URL"""
     bootloader = get_bootloader()
 
@@ -546,7 +555,10 @@ def install(url, force, skip_platform_check=False, skip_migration=False, skip_pa
         echo_and_log('Downloading image...')
         validate_url_or_abort(url)
         try:
-            urlretrieve(url, bootloader.DEFAULT_IMAGE_PATH, reporthook)
+            # An interrupted download resumes when the command is run again
+            download(url, bootloader.DEFAULT_IMAGE_PATH, checksum=checksum, workers=download_workers,
+                     chunk_size=download_chunk_size * 1024 * 1024,
+                     progress=lambda done, size: reporthook(done, 1, size))
             click.echo('')
         except Exception as e:
             echo_and_log("Download error", e)
@@ -798,7 +810,7 @@ def upgrade_docker(container_name, url, cleanup_image, skip_check, tag, warm):
         echo_and_log('Downloading image...')
         validate_url_or_abort(url)
         try:
-            urlretrieve(url, DEFAULT_IMAGE_PATH, reporthook)
+            download(url, DEFAULT_IMAGE_PATH, progress=lambda done, size: reporthook(done, 1, size))
         except Exception as e:
             echo_and_log("Download error: {}".format(e), LOG_ERR)
             raise click.Abort()
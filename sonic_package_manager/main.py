@@ -233,22 +233,28 @@ def manifest(ctx,
 
 
 @package.command()
-@click.argument('name')
+@click.argument('names', metavar='NAME...', nargs=-1, required=True)
 @click.option('--all', is_flag=True, help='Show all available tags in repository.')
 @click.option('--plain', is_flag=True, help='Plain output.')
 @click.pass_context
-def versions(ctx, name, all, plain):
-    """ Show available versions. """
+def versions(ctx, names, all, plain):
+    """ Show available versions of one or more packages. """
 
-    try:
-        manager: PackageManager = ctx.obj
-        versions = manager.get_package_available_versions(name, all)
+    manager: PackageManager = ctx.obj
+    results = manager.get_packages_available_versions(names, all)
+    errors = []
+    for name, versions in results.items():
+        if isinstance(versions, Exception):
+            errors.append(f'Failed to get package versions for {name}: {versions}')
+            continue
+        if len(results) > 1:
+            click.secho(f'{name}:', bold=True)
         for version in versions:
             if not plain:
                 click.secho(f'{BULLET_UC} ', bold=True, fg='green', nl=False)
             click.secho(f'{version}')
-    except Exception as err:
-        exit_cli(f'Failed to get package versions for {name}: {err}', fg='red')
+    if errors:
+        exit_cli('\n'.join(errors), fg='red')
 
 
 @package.command()
@@ -6,6 +6,7 @@ import os
 import pkgutil
 import tempfile
 import yang as ly
+from concurrent.futures import ThreadPoolExecutor
 from inspect import signature
 from typing import Any, Iterable, List, Callable, Dict, Optional
 
@@ -42,7 +43,7 @@ from sonic_package_manager.metadata import MetadataResolver
 from sonic_package_manager.package import Package
 from sonic_package_manager.progress import ProgressManager
 from sonic_package_manager.reference import PackageReference
-from sonic_package_manager.registry import RegistryResolver
+from sonic_package_manager.registry import RegistryCache, RegistryResolver
 from sonic_package_manager.service_creator import SONIC_CLI_COMMANDS
 from sonic_package_manager.service_creator.creator import (
     ServiceCreator,
@@ -67,13 +68,15 @@ from sonic_package_manager.version import (
 )
 import click
 import json
-import requests
 import getpass
 import paramiko
 import urllib.parse
 from scp import SCPClient
+from utilities_common.download import download, DownloadError
 from sonic_package_manager.manifest import Manifest, MANIFESTS_LOCATION, DEFAULT_MANIFEST_FILE
 LOCAL_JSON = "/tmp/local_json"
+# The number of packages whose registries are queried concurrently
+REGISTRY_WORKERS = 8
 
 @contextlib.contextmanager
 def failure_ignore(ignore: bool):
@@ -951,6 +954,38 @@ class PackageManager:
 
         return map(tag_to_version, filter(is_semantic_ver_tag, available_tags))
 
+    def get_packages_available_versions(self,
+                                        names: Iterable[str],
+                                        all: bool = False) -> Dict[str, Any]:
+        """ Returns the available versions of several packages, resolved
+        concurrently.
+
+        Args:
+            names: Package names.
+            all: If set to True will return all tags including
+                 those which do not follow semantic versioning.
+        Returns:
+            Dictionary of the list of versions of each package, in the
+            order of names, or of the exception raised getting them.
+        """
+
+        names = list(names)
+        if not names:
+            return {}
+
+        def resolve(name):
+            return list(self.get_package_available_versions(name, all))
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=min(len(names), REGISTRY_WORKERS)) as executor:
+            futures = [(name, executor.submit(resolve, name)) for name in names]
+            for name, future in futures:
+                try:
+                    results[name] = future.result()
+                except Exception as err:
+                    results[name] = err
+        return results
+
     def is_installed(self, name: str) -> bool:
         """ Returns boolean whether a package called name is installed.
 
@@ -1124,17 +1159,12 @@ class PackageManager:
             click.echo("Protocol not supported")
             return False
 
-        # If the protocol is HTTP and no username or password is provided, proceed with the download using requests
+        # If the protocol is HTTP and no username or password is provided, proceed with the download directly
         if (protocol == 'http' or protocol == 'https') and not username and not password:
             try:
-                with requests.get(url, stream=True) as response:
-                    response.raise_for_status()
-                    with open(local_path, 'wb') as f:
-                        for chunk in response.iter_content(chunk_size=8192):
-                            if chunk:
-                                f.write(chunk)
-            except requests.exceptions.RequestException as e:
-                click.echo("Download error", e)
+                download(url, local_path)
+            except DownloadError as e:
+                click.echo(f"Download error: {e}")
                 return False
         else:
             # If password is not provided, prompt the user for it securely
@@ -1163,14 +1193,9 @@ class PackageManager:
                 elif protocol == 'http' or protocol == 'https':
                     # Download using HTTP for URLs without credentials
                     try:
-                        with requests.get(url, auth=(username, password), stream=True) as response:
-                            response.raise_for_status()  # Raise an exception if the request was not successful
-                            with open(local_path, 'wb') as f:
-                                for chunk in response.iter_content(chunk_size=8192):
-                                    if chunk:
-                                        f.write(chunk)
-                    except requests.exceptions.RequestException as e:
-                        click.echo("Download error", e)
+                        download(url, local_path, auth=(username, password))
+                    except DownloadError as e:
+                        click.echo(f"Download error: {e}")
                         return False
                 else:
                     click.echo(f"Error: Source file '{remote_path}' does not exist.")
@@ -1297,7 +1322,7 @@ class PackageManager:
         """
 
         docker_api = DockerApi(docker.from_env(), ProgressManager())
-        registry_resolver = RegistryResolver()
+        registry_resolver = RegistryResolver(RegistryCache())
         metadata_resolver = MetadataResolver(docker_api, registry_resolver)
         cfg_mgmt = config_mgmt.ConfigMgmt(source=INIT_CFG_JSON, sonicYangOptions=ly.LY_CTX_DISABLE_SEARCHDIR_CWD)
         cli_generator = CliGenerator(log)
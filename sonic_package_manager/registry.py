@@ -1,8 +1,13 @@
 #!/usr/bin/env python
 
+import hashlib
 import json
+import os
+import tempfile
+import threading
+import time
 from dataclasses import dataclass
-from typing import List, Dict
+from typing import Any, List, Dict, Optional
 
 import requests
 import www_authenticate
@@ -12,6 +17,10 @@ from prettyprinter import pformat
 from sonic_package_manager.logger import log
 from sonic_package_manager.utils import DockerReference
 
+REGISTRY_CACHE_PATH = '/var/cache/sonic-package-manager/registry'
+TAGS_CACHE_TTL = 300
+DEFAULT_TOKEN_EXPIRES_IN = 60
+
 
 class AuthenticationServiceError(Exception):
     """ Exception class for errors related to authentication. """
@@ -20,14 +29,20 @@ class AuthenticationServiceError(Exception):
 
 
 class AuthenticationService:
-    """ AuthenticationService provides an authentication tokens. """
+    """ AuthenticationService provides an authentication tokens.
+    A token is reused for the same bearer until it expires. """
 
-    @staticmethod
-    def get_token(bearer: Dict) -> str:
+    _tokens: Dict = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_token(cls, bearer: Dict, refresh: bool = False) -> str:
         """ Retrieve an authentication token.
 
         Args:
             bearer: Bearer token.
+            refresh: Retrieve a new token even if the last one has not
+                     expired yet.
         Returns:
             token value as a string.
         """
@@ -36,6 +51,14 @@ class AuthenticationService:
         if 'realm' not in bearer:
             raise AuthenticationServiceError(f'Realm is required in bearer')
 
+        key = tuple(sorted(bearer.items()))
+        with cls._lock:
+            token, expires_at = cls._tokens.get(key, (None, 0))
+        if token is not None and not refresh and time.monotonic() < expires_at:
+            log.debug(f'reusing authentication token for bearer={bearer}')
+            return token
+
+        bearer = dict(bearer)
         url = bearer.pop('realm')
         response = requests.get(url, params=bearer)
         if response.status_code != requests.codes.ok:
@@ -43,13 +66,96 @@ class AuthenticationService:
 
         content = json.loads(response.content)
         token = content['token']
+        expires_in = int(content.get('expires_in', DEFAULT_TOKEN_EXPIRES_IN))
 
         log.debug(f'authentication token for bearer={bearer}: '
                   f'token={token}')
 
+        with cls._lock:
+            cls._tokens[key] = (token, time.monotonic() + expires_in)
         return token
 
 
+class RegistryCache:
+    """ On-disk cache of the content of registries.
+
+    Manifests and blobs are stored by their digest, as they never change
+    for a digest, and are verified against it when read. Tag lists and the
+    digests of the manifests tags point to expire after a TTL. The cache
+    never fails a request: content it fails to read or write is fetched
+    from the registry. """
+
+    def __init__(self, path: str = REGISTRY_CACHE_PATH, ttl: float = TAGS_CACHE_TTL):
+        self.path = path
+        self.ttl = ttl
+
+    def _digest_path(self, digest: str) -> Optional[str]:
+        algorithm, _, value = digest.partition(':')
+        if algorithm not in hashlib.algorithms_available or not value.isalnum():
+            return None
+        return os.path.join(self.path, 'digests', algorithm, value)
+
+    def _ref_path(self, key: str) -> str:
+        return os.path.join(self.path, 'refs', hashlib.sha256(key.encode()).hexdigest())
+
+    @staticmethod
+    def _verify(digest: str, content: bytes) -> bool:
+        algorithm, _, value = digest.partition(':')
+        return hashlib.new(algorithm, content).hexdigest() == value
+
+    def _write(self, path: str, content: bytes):
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except OSError as err:
+            log.debug(f'failed to write registry cache {path}: {err}')
+
+    def get_content(self, digest: str) -> Optional[bytes]:
+        """ Get content by its digest, None if it is not cached. """
+
+        path = self._digest_path(digest)
+        if path is None:
+            return None
+        try:
+            with open(path, 'rb') as f:
+                content = f.read()
+        except OSError:
+            return None
+        if not self._verify(digest, content):
+            log.debug(f'registry cache content for {digest} is corrupted')
+            return None
+        return content
+
+    def put_content(self, digest: str, content: bytes):
+        """ Cache content by its digest, if it matches it. """
+
+        path = self._digest_path(digest)
+        if path is not None and self._verify(digest, content):
+            self._write(path, content)
+
+    def get_ref(self, key: str) -> Optional[Any]:
+        """ Get a value cached under a key, None if it is not cached or
+        it expired. """
+
+        try:
+            with open(self._ref_path(key)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get('key') != key or time.time() - entry.get('time', 0) > self.ttl:
+            return None
+        return entry.get('value')
+
+    def put_ref(self, key: str, value: Any):
+        """ Cache a value under a key for the TTL. """
+
+        entry = {'key': key, 'time': time.time(), 'value': value}
+        self._write(self._ref_path(key), json.dumps(entry).encode())
+
+
 @dataclass
 class RegistryApiError(Exception):
     """ Class for registry related errors. """
@@ -72,11 +178,18 @@ class Registry:
 
     MIME_DOCKER_MANIFEST = 'application/vnd.docker.distribution.manifest.v2+json'
 
-    def __init__(self, host: str):
+    def __init__(self, host: str, cache: Optional[RegistryCache] = None):
         self.url = host
-
-    @staticmethod
-    def _execute_get_request(url, headers):
+        self.cache = cache
+        # The bearer of each repository, to authenticate its next requests
+        # without being challenged again
+        self._bearers: Dict[str, Dict] = {}
+
+    def _execute_get_request(self, repository, url, headers):
+        bearer = self._bearers.get(repository)
+        if bearer is not None:
+            token = AuthenticationService.get_token(bearer)
+            headers['Authorization'] = f'Bearer {token}'
         response = requests.get(url, headers=headers)
         if response.status_code == requests.codes.unauthorized:
             # Get authentication details from headers
@@ -85,7 +198,9 @@ class Registry:
             log.debug(f'unauthorized: retrieving authentication details '
                       f'from response headers {www_authenticate_details}')
             bearer = www_authenticate.parse(www_authenticate_details)['bearer']
-            token = AuthenticationService.get_token(bearer)
+            # The reused token was rejected, e.g. it was revoked
+            token = AuthenticationService.get_token(bearer, refresh='Authorization' in headers)
+            self._bearers[repository] = bearer
             headers['Authorization'] = f'Bearer {token}'
             # Repeat request
             response = requests.get(url, headers=headers)
@@ -94,28 +209,58 @@ class Registry:
     def _get_base_url(self, repository: str):
         return f'{self.url}/v2/{repository}'
 
+    def _get_cache_key(self, repository: str, path: str):
+        return f'{self._get_base_url(repository)}/{path}'
+
     def tags(self, repository: str) -> List[str]:
         log.debug(f'getting tags for {repository}')
 
         _, repository = reference.Reference.split_docker_domain(repository)
+        cache_key = self._get_cache_key(repository, 'tags/list')
+        if self.cache is not None:
+            tags = self.cache.get_ref(cache_key)
+            if tags is not None:
+                log.debug(f'cached tags list for {repository}: {tags}')
+                return tags
+
         headers = {'Accept': 'application/json'}
         url = f'{self._get_base_url(repository)}/tags/list'
-        response = self._execute_get_request(url, headers)
+        response = self._execute_get_request(repository, url, headers)
         if response.status_code != requests.codes.ok:
             raise RegistryApiError(f'Failed to retrieve tags from {repository}', response)
 
         content = json.loads(response.content)
         log.debug(f'tags list api response: f{content}')
 
+        if self.cache is not None:
+            self.cache.put_ref(cache_key, content['tags'])
         return content['tags']
 
+    def _get_cached(self, digest: Optional[str]) -> Optional[Dict]:
+        if self.cache is None or digest is None:
+            return None
+        content = self.cache.get_content(digest)
+        if content is None:
+            return None
+        return json.loads(content)
+
     def manifest(self, repository: str, ref: str) -> Dict:
         log.debug(f'getting manifest for {repository}:{ref}')
 
         _, repository = reference.Reference.split_docker_domain(repository)
+        # A tag points to a digest for the TTL of the cache
+        cache_key = self._get_cache_key(repository, f'manifests/{ref}')
+        is_digest = ':' in ref
+        if self.cache is not None:
+            digest = ref if is_digest else self.cache.get_ref(cache_key)
+            content = self._get_cached(digest)
+            if content is not None:
+                log.debug(f'cached manifest content for {repository}:{ref}: {content}')
+                return content
+
         headers = {'Accept': self.MIME_DOCKER_MANIFEST}
         url = f'{self._get_base_url(repository)}/manifests/{ref}'
-        response = self._execute_get_request(url, headers)
+        response = self._execute_get_request(repository, url, headers)
 
         if response.status_code != requests.codes.ok:
             raise RegistryApiError(f'Failed to retrieve manifest for {repository}:{ref}', response)
@@ -123,35 +268,51 @@ class Registry:
         content = json.loads(response.content)
         log.debug(f'manifest content for {repository}:{ref}: {content}')
 
+        if self.cache is not None:
+            digest = 'sha256:' + hashlib.sha256(response.content).hexdigest()
+            self.cache.put_content(digest, response.content)
+            if not is_digest:
+                self.cache.put_ref(cache_key, digest)
         return content
 
     def blobs(self, repository: str, digest: str):
         log.debug(f'retrieving blob for {repository}:{digest}')
 
         _, repository = reference.Reference.split_docker_domain(repository)
+        content = self._get_cached(digest)
+        if content is not None:
+            log.debug(f'cached blob for {repository}:{digest}: {content}')
+            return content
+
         headers = {'Accept': self.MIME_DOCKER_MANIFEST}
         url = f'{self._get_base_url(repository)}/blobs/{digest}'
-        response = self._execute_get_request(url, headers)
+        response = self._execute_get_request(repository, url, headers)
         if response.status_code != requests.codes.ok:
             raise RegistryApiError(f'Failed to retrieve blobs for {repository}:{digest}', response)
         content = json.loads(response.content)
 
         log.debug(f'retrieved blob for {repository}:{digest}: {content}')
+        if self.cache is not None:
+            self.cache.put_content(digest, response.content)
         return content
 
 
 class RegistryResolver:
     """ Returns a registry object based on the input repository reference
-     string. """
-
-    DockerHubRegistry = Registry('https://index.docker.io')
+     string. The registry of a domain is reused, with its tokens. """
 
-    def __init__(self):
-        pass
+    def __init__(self, cache: Optional[RegistryCache] = None):
+        self.cache = cache
+        self.DockerHubRegistry = Registry('https://index.docker.io', cache)
+        self._registries: Dict[str, Registry] = {}
+        self._lock = threading.Lock()
 
     def get_registry_for(self, ref: str) -> Registry:
         domain, _ = DockerReference.split_docker_domain(ref)
         if domain == reference.DEFAULT_DOMAIN:
             return self.DockerHubRegistry
-        # TODO: support insecure registries
-        return Registry(f'https://{domain}')
+        with self._lock:
+            if domain not in self._registries:
+                # TODO: support insecure registries
+                self._registries[domain] = Registry(f'https://{domain}', self.cache)
+            return self._registries[domain]
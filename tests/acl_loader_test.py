@@ -1,3 +1,4 @@
+import contextlib
 import importlib
 import sys
 import os
@@ -324,6 +325,47 @@ class TestAclLoader(object):
         acl_loader.incremental_update()
         assert acl_loader.rules_info[(('NTP_ACL', 'RULE_1'))]["PACKET_ACTION"] == "DROP"
 
+    def test_rules_diff(self, acl_loader):
+        acl_loader.rules_db_info = {
+            ('DATAACL', 'RULE_1'): {'PRIORITY': '9999', 'PACKET_ACTION': 'DROP'},
+            ('DATAACL', 'RULE_2'): {'PRIORITY': '9998', 'PACKET_ACTION': 'DROP', 'SRC_IP': '10.0.0.1/32'},
+            ('DATAACL', 'RULE_3'): {'PRIORITY': '9997', 'PACKET_ACTION': 'DROP'},
+            ('DATAACL', 'RULE_4'): {'PRIORITY': '9996', 'PACKET_ACTION': 'DROP'},
+        }
+        acl_loader.rules_info = {
+            ('DATAACL', 'RULE_1'): {'PRIORITY': 9999, 'PACKET_ACTION': 'DROP'},
+            ('DATAACL', 'RULE_2'): {'PRIORITY': '9998', 'PACKET_ACTION': 'DROP'},
+            ('DATAACL', 'RULE_4'): {'PRIORITY': '9996', 'PACKET_ACTION': 'FORWARD'},
+            ('DATAACL', 'RULE_5'): {'PRIORITY': '9995', 'PACKET_ACTION': 'DROP'},
+        }
+        removed, updated = acl_loader.get_rules_diff(set(acl_loader.rules_db_info.keys()))
+        # RULE_1 is unchanged, RULE_2 lost a field and is rewritten
+        assert sorted(removed) == [('DATAACL', 'RULE_2'), ('DATAACL', 'RULE_3')]
+        assert sorted(updated) == [('DATAACL', 'RULE_2'), ('DATAACL', 'RULE_4'), ('DATAACL', 'RULE_5')]
+
+    def test_full_update_writes_diff(self, acl_loader):
+        acl_loader.per_npu_configdb = None
+        acl_loader.current_table = None
+        acl_loader.rules_db_info = {
+            ('DATAACL', 'RULE_1'): {'PRIORITY': '9999', 'PACKET_ACTION': 'DROP'},
+            ('DATAACL', 'RULE_2'): {'PRIORITY': '9998', 'PACKET_ACTION': 'DROP'},
+        }
+        acl_loader.rules_info = {
+            ('DATAACL', 'RULE_1'): {'PRIORITY': '9999', 'PACKET_ACTION': 'DROP'},
+            ('DATAACL', 'RULE_3'): {'PRIORITY': '9997', 'PACKET_ACTION': 'DROP'},
+        }
+        with mock.patch.object(acl_loader.configdb, 'mod_config') as mod_config:
+            acl_loader.full_update()
+        assert mod_config.call_args_list == [
+            mock.call({'ACL_RULE': {('DATAACL', 'RULE_2'): None}}),
+            mock.call({'ACL_RULE': {('DATAACL', 'RULE_3'): {'PRIORITY': '9997', 'PACKET_ACTION': 'DROP'}}})
+        ]
+
+        acl_loader.rules_db_info = dict(acl_loader.rules_info)
+        with mock.patch.object(acl_loader.configdb, 'mod_config') as mod_config:
+            acl_loader.incremental_update()
+        mod_config.assert_not_called()
+
 
 
 class TestMasicAclLoader(object):
@@ -363,3 +405,43 @@ class TestMasicAclLoader(object):
         acl_loader.load_rules_from_file(os.path.join(test_path, 'acl_input/incremental_2.json'))
         acl_loader.incremental_update()
         assert acl_loader.rules_info[(('NTP_ACL', 'RULE_1'))]["PACKET_ACTION"] == "DROP"
+
+    def test_delete_all_namespaces(self, acl_loader):
+        acl_loader.rules_db_info = {('DATAACL', 'RULE_1'): {'PRIORITY': '9999', 'PACKET_ACTION': 'DROP'}}
+        configdbs = acl_loader.get_configdbs()
+        # The host and both front asic namespaces
+        assert len(configdbs) == 3
+        with contextlib.ExitStack() as stack:
+            mock_configdb = stack.enter_context(mock.patch('acl_loader.main.ConfigDBPipeConnector'))
+            mod_configs = [stack.enter_context(mock.patch.object(configdb, 'mod_config'))
+                           for configdb in configdbs.values()]
+            acl_loader.delete('DATAACL')
+        # The connectors of the loader are reused
+        mock_configdb.assert_not_called()
+        for mod_config in mod_configs:
+            mod_config.assert_called_once_with({'ACL_RULE': {('DATAACL', 'RULE_1'): None}})
+
+    def test_full_update_resyncs_drifted_namespace(self, acl_loader):
+        rule = {'PRIORITY': '9999', 'PACKET_ACTION': 'DROP'}
+        acl_loader.current_table = None
+        acl_loader.rules_info = {('DATAACL', 'RULE_1'): rule}
+        acl_loader.rules_db_info = {('DATAACL', 'RULE_1'): rule}
+        configdbs = acl_loader.get_configdbs()
+        rules_db_info = {'asic0': {('DATAACL', 'RULE_1'): rule},
+                         'asic1': {('DATAACL', 'RULE_1'): {'PRIORITY': '9999', 'PACKET_ACTION': 'FORWARD'},
+                                   ('DATAACL', 'RULE_2'): rule}}
+        with contextlib.ExitStack() as stack:
+            mod_configs = {namespace: stack.enter_context(mock.patch.object(configdb, 'mod_config'))
+                           for namespace, configdb in configdbs.items()}
+            for namespace in rules_db_info:
+                stack.enter_context(mock.patch.object(configdbs[namespace], 'get_table',
+                                                      return_value=rules_db_info[namespace]))
+            acl_loader.full_update()
+
+        # Only the front asic whose rules drifted from the host ones is written
+        mod_configs[''].assert_not_called()
+        mod_configs['asic0'].assert_not_called()
+        assert mod_configs['asic1'].call_args_list == [
+            mock.call({'ACL_RULE': {('DATAACL', 'RULE_2'): None}}),
+            mock.call({'ACL_RULE': {('DATAACL', 'RULE_1'): rule}})
+        ]
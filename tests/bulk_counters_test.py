@@ -0,0 +1,61 @@
+from unittest import mock
+
+import mockredis
+import redis
+
+from utilities_common.bulk_counters import BulkCounterFetcher
+
+
+class TestBulkCounterFetcher(object):
+    def setup_method(self):
+        self.client = mockredis.MockRedis(strict=True)
+        self.client.hset("RATES:oid:0x1", "RX_BPS", "1")
+        self.client.hset("RATES:oid:0x2", "RX_BPS", "2")
+        self.db = mock.MagicMock()
+        self.db.get_redis_client.return_value = self.client
+
+    def test_get_all_with_pipeline(self):
+        fetcher = BulkCounterFetcher(self.db, "COUNTERS_DB")
+
+        with mock.patch.object(self.client, "pipeline", wraps=self.client.pipeline) as mock_pipeline:
+            fvs = fetcher.get_all(["RATES:oid:0x2", "RATES:oid:0x3", "RATES:oid:0x1"])
+
+        assert fvs == [{b"RX_BPS": b"2"}, {}, {b"RX_BPS": b"1"}]
+        mock_pipeline.assert_called_once_with(transaction=False)
+        self.db.get_redis_client.assert_called_once_with("COUNTERS_DB")
+
+    def test_get_all_client_without_pipeline_uses_unix_socket(self):
+        self.db.get_redis_client.return_value = mock.MagicMock(spec=["hgetall"])
+
+        with mock.patch("utilities_common.redis_pipeline.SonicDBConfig") as mock_config, \
+                mock.patch("utilities_common.redis_pipeline.redis.Redis", return_value=self.client) as mock_redis:
+            mock_config.getDbSock.return_value = "/var/run/redis/redis.sock"
+            mock_config.getDbId.return_value = 2
+            fetcher = BulkCounterFetcher(self.db, "COUNTERS_DB", namespace="asic0")
+        with mock.patch.object(self.client, "pipeline", wraps=self.client.pipeline) as mock_pipeline:
+            fvs = fetcher.get_all(["RATES:oid:0x1", "RATES:oid:0x3"])
+
+        assert fvs == [{b"RX_BPS": b"1"}, {}]
+        mock_config.getDbSock.assert_called_once_with("COUNTERS_DB", "asic0")
+        mock_redis.assert_called_once_with(unix_socket_path="/var/run/redis/redis.sock", db=2,
+                                           decode_responses=True)
+        mock_pipeline.assert_called_once_with(transaction=False)
+        self.db.get_redis_client.return_value.hgetall.assert_not_called()
+
+    def test_get_all_without_pipeline(self):
+        client = mock.MagicMock(spec=["hgetall"])
+        client.hgetall.side_effect = lambda key: {"RATES:oid:0x1": {"RX_BPS": "1"}}.get(key)
+        self.db.get_redis_client.return_value = client
+        with mock.patch("utilities_common.redis_pipeline.redis.Redis") as mock_redis:
+            mock_redis.return_value.ping.side_effect = redis.ConnectionError("no socket")
+            fetcher = BulkCounterFetcher(self.db, "COUNTERS_DB")
+
+        fvs = fetcher.get_all(["RATES:oid:0x1", "RATES:oid:0x2"])
+
+        assert fvs == [{"RX_BPS": "1"}, {}]
+        assert client.hgetall.call_count == 2
+
+    def test_get_all_no_keys(self):
+        fetcher = BulkCounterFetcher(self.db, "COUNTERS_DB")
+
+        assert fetcher.get_all([]) == []
@@ -1,8 +1,11 @@
+import concurrent.futures
 import copy
 import datetime
 import pytest
 import filecmp
+import functools
 import importlib
+import multiprocessing
 import os
 import traceback
 import json
@@ -24,6 +27,8 @@ from utilities_common.general import load_module_from_source
 from mock import call, patch, mock_open, MagicMock
 
 from generic_config_updater.generic_updater import ConfigFormat
+from generic_config_updater.patch_sorter import Algorithm
+from generic_config_updater.gu_common import GenericConfigUpdaterError
 
 import config.main as config
 import config.validated_config_db_connector as validated_config_db_connector
@@ -1836,6 +1841,26 @@ class TestGenericUpdateCommands(unittest.TestCase):
         mock_generic_updater.apply_patch.assert_called_once()
         mock_generic_updater.apply_patch.assert_has_calls([expected_call_with_non_default_values])
 
+    @patch('config.main.validate_patch', mock.Mock(return_value=True))
+    def test_apply_patch__sort_algorithm_and_search_budget__passed_to_generic_updater(self):
+        # Arrange
+        expected_exit_code = 0
+        mock_generic_updater = mock.Mock()
+        with mock.patch('config.main.GenericUpdater', return_value=mock_generic_updater) as mock_updater_class:
+            with mock.patch('builtins.open', mock.mock_open(read_data=self.any_patch_as_text)):
+
+                # Act
+                result = self.runner.invoke(config.config.commands["apply-patch"],
+                                            [self.any_path,
+                                             "--sort-algorithm", Algorithm.ASTAR.name,
+                                             "--search-budget", "500"],
+                                            catch_exceptions=False)
+
+        # Assert
+        self.assertEqual(expected_exit_code, result.exit_code)
+        mock_updater_class.assert_called_once_with(scope=mock.ANY, sort_algorithm=Algorithm.ASTAR, search_budget=500)
+        mock_generic_updater.apply_patch.assert_called_once()
+
     @patch('config.main.validate_patch', mock.Mock(return_value=True))
     def test_apply_patch__exception_thrown__error_displayed_error_code_returned(self):
         # Arrange
@@ -3388,6 +3413,14 @@ class TestConfigClock(object):
         print('TEARDOWN')
 
 
+WORKER_PID_ENV = "APPLY_PATCH_TEST_WORKER_PID"
+
+
+def load_yang_models_in_worker(yang_dir):
+    # Stands for the loading of the YANG models by the initializer of an apply-patch worker process
+    os.environ[WORKER_PID_ENV] = str(os.getpid())
+
+
 class TestApplyPatchMultiAsic(unittest.TestCase):
     def setUp(self):
         os.environ['UTILITIES_UNIT_TESTING'] = "2"
@@ -3440,6 +3473,9 @@ class TestApplyPatchMultiAsic(unittest.TestCase):
         self.all_config["asic1"] = data
         self.all_config["asic1"]["bgpraw"] = ""
 
+    def get_config_db_snapshot(self, scope=multi_asic.DEFAULT_NAMESPACE):
+        return copy.deepcopy(self.all_config["localhost" if scope == multi_asic.DEFAULT_NAMESPACE else scope])
+
     @patch('config.main.validate_patch', mock.Mock(return_value=True))
     def test_apply_patch_multiasic(self):
         # Mock open to simulate file reading
@@ -3615,6 +3651,95 @@ class TestApplyPatchMultiAsic(unittest.TestCase):
                     # Ensure ConfigDBConnector was never instantiated or called
                     mock_config_db_connector.assert_not_called()
 
+    @patch('config.main.validate_patch', mock.Mock(return_value=True))
+    @patch('config.main.init_apply_patch_worker')
+    @patch('config.main.concurrent.futures.ProcessPoolExecutor', concurrent.futures.ThreadPoolExecutor)
+    def test_apply_patch_parallel_process_mode_multiasic(self, mock_init_worker):
+        # Mock open to simulate file reading
+        with patch('builtins.open', mock_open(read_data=json.dumps(self.patch_content)), create=True) as mocked_open:
+            # Mock GenericUpdater to avoid actual patch application
+            with patch('config.main.GenericUpdater') as mock_generic_updater:
+                mock_generic_updater.return_value.apply_patch = MagicMock()
+
+                # Invocation of the command with the CliRunner
+                result = self.runner.invoke(config.config.commands["apply-patch"],
+                                            [self.patch_file_path,
+                                             "--format", ConfigFormat.SONICYANG.name,
+                                             "--parallel",
+                                             "--parallel-mode", "process",
+                                             "--verbose"],
+                                            catch_exceptions=False)
+
+                print("Exit Code: {}, output: {}".format(result.exit_code, result.output))
+                # Assertions and verifications
+                self.assertEqual(result.exit_code, 0, "Command should succeed")
+                self.assertIn("Patch applied successfully.", result.output)
+
+                # Each worker loads the YANG models when it starts
+                self.assertTrue(mock_init_worker.called)
+                self.assertEqual(mock_generic_updater.return_value.apply_patch.call_count,
+                                 multi_asic.get_num_asics() + 1)
+
+                # Verify mocked_open was called as expected
+                mocked_open.assert_called_with(self.patch_file_path, 'r')
+
+    @patch('config.main.validate_patch', mock.Mock(return_value=True))
+    @patch('config.main.init_apply_patch_worker', mock.Mock())
+    @patch('config.main.concurrent.futures.ProcessPoolExecutor', concurrent.futures.ThreadPoolExecutor)
+    def test_apply_patch_parallel_process_mode_with_error_multiasic(self):
+        # Mock open to simulate file reading
+        with patch('builtins.open', mock_open(read_data=json.dumps(self.patch_content)), create=True):
+            # Mock GenericUpdater to fail applying the patch on one of the scopes
+            with patch('config.main.GenericUpdater') as mock_generic_updater:
+                def create_generic_updater(scope, **kwargs):
+                    generic_updater = MagicMock()
+                    if scope == "asic0":
+                        generic_updater.apply_patch.side_effect = GenericConfigUpdaterError("asic0 failure")
+                    return generic_updater
+                mock_generic_updater.side_effect = create_generic_updater
+
+                # Invocation of the command with the CliRunner
+                result = self.runner.invoke(config.config.commands["apply-patch"],
+                                            [self.patch_file_path,
+                                             "--parallel",
+                                             "--parallel-mode", "process"],
+                                            catch_exceptions=True)
+
+                print("Exit Code: {}, output: {}".format(result.exit_code, result.output))
+                # Assertions and verifications
+                self.assertNotEqual(result.exit_code, 0, "Command should failed.")
+                self.assertIn("- asic0: asic0 failure", result.output)
+                self.assertNotIn("- localhost", result.output)
+
+    @patch('config.main.validate_patch', mock.Mock(return_value=True))
+    @patch('config.main.SharedYangModels.get', load_yang_models_in_worker)
+    @patch('config.main.concurrent.futures.ProcessPoolExecutor',
+           functools.partial(concurrent.futures.ProcessPoolExecutor, mp_context=multiprocessing.get_context('fork')))
+    def test_apply_patch_parallel_process_mode_in_processes_multiasic(self):
+        # The worker processes are forked, so that they inherit the patches of the test, but the scopes and
+        # their changes are sent to them, and their results sent back, pickled
+        parent_pid = os.getpid()
+
+        def create_generic_updater(scope, **kwargs):
+            # Called in a worker process, once its initializer loaded the YANG models
+            if os.getpid() == parent_pid or os.environ.get(WORKER_PID_ENV) != str(os.getpid()):
+                raise GenericConfigUpdaterError("{} not applied by an initialized worker".format(scope))
+            return MagicMock()
+
+        with patch('builtins.open', mock_open(read_data=json.dumps(self.patch_content)), create=True):
+            with patch('config.main.GenericUpdater', side_effect=create_generic_updater):
+                result = self.runner.invoke(config.config.commands["apply-patch"],
+                                            [self.patch_file_path,
+                                             "--parallel",
+                                             "--parallel-mode", "process",
+                                             "--sort-algorithm", Algorithm.ASTAR.name],
+                                            catch_exceptions=False)
+
+        print("Exit Code: {}, output: {}".format(result.exit_code, result.output))
+        self.assertEqual(result.exit_code, 0, "Command should succeed")
+        self.assertIn("Patch applied successfully.", result.output)
+        self.assertNotIn(WORKER_PID_ENV, os.environ)
+
     @patch('config.main.validate_patch', mock.Mock(return_value=True))
     @patch('config.main.concurrent.futures.wait', autospec=True)
     def test_apply_patch_check_running_in_not_parallel_multiasic(self, MockThreadPoolWait):
@@ -3689,12 +3814,10 @@ class TestApplyPatchMultiAsic(unittest.TestCase):
                     # Ensure ConfigDBConnector was never instantiated or called
                     mock_config_db_connector.assert_not_called()
 
-    @patch('config.main.subprocess.Popen')
+    @patch('config.main.get_config_db_snapshot')
     @patch('config.main.SonicYangCfgDbGenerator.validate_config_db_json', mock.Mock(return_value=True))
-    def test_apply_patch_validate_patch_multiasic(self, mock_subprocess_popen):
-        mock_instance = MagicMock()
-        mock_instance.communicate.return_value = (json.dumps(self.all_config), 0)
-        mock_subprocess_popen.return_value = mock_instance
+    def test_apply_patch_validate_patch_multiasic(self, mock_get_config_db_snapshot):
+        mock_get_config_db_snapshot.side_effect = self.get_config_db_snapshot
 
         # Mock open to simulate file reading
         with patch('builtins.open', mock_open(read_data=json.dumps(self.patch_content)), create=True) as mocked_open:
@@ -3716,12 +3839,10 @@ class TestApplyPatchMultiAsic(unittest.TestCase):
                 # Verify mocked_open was called as expected
                 mocked_open.assert_called_with(self.patch_file_path, 'r')
 
-    @patch('config.main.subprocess.Popen')
+    @patch('config.main.get_config_db_snapshot')
     @patch('config.main.SonicYangCfgDbGenerator.validate_config_db_json', mock.Mock(return_value=True))
-    def test_apply_patch_validate_patch_with_badpath_multiasic(self, mock_subprocess_popen):
-        mock_instance = MagicMock()
-        mock_instance.communicate.return_value = (json.dumps(self.all_config), 0)
-        mock_subprocess_popen.return_value = mock_instance
+    def test_apply_patch_validate_patch_with_badpath_multiasic(self, mock_get_config_db_snapshot):
+        mock_get_config_db_snapshot.side_effect = self.get_config_db_snapshot
 
         bad_patch = copy.deepcopy(self.patch_content)
         bad_patch.append({
@@ -3753,12 +3874,10 @@ class TestApplyPatchMultiAsic(unittest.TestCase):
                 # Verify mocked_open was called as expected
                 mocked_open.assert_called_with(self.patch_file_path, 'r')
 
-    @patch('config.main.subprocess.Popen')
+    @patch('config.main.get_config_db_snapshot')
     @patch('config.main.SonicYangCfgDbGenerator.validate_config_db_json', mock.Mock(return_value=True))
-    def test_apply_patch_parallel_badpath_multiasic(self, mock_subprocess_popen):
-        mock_instance = MagicMock()
-        mock_instance.communicate.return_value = (json.dumps(self.all_config), 0)
-        mock_subprocess_popen.return_value = mock_instance
+    def test_apply_patch_parallel_badpath_multiasic(self, mock_get_config_db_snapshot):
+        mock_get_config_db_snapshot.side_effect = self.get_config_db_snapshot
 
         bad_patch = copy.deepcopy(self.patch_content)
         bad_patch.append({
@@ -3791,12 +3910,10 @@ class TestApplyPatchMultiAsic(unittest.TestCase):
                 # Verify mocked_open was called as expected
                 mocked_open.assert_called_with(self.patch_file_path, 'r')
 
-    @patch('config.main.subprocess.Popen')
+    @patch('config.main.get_config_db_snapshot')
     @patch('config.main.SonicYangCfgDbGenerator.validate_config_db_json', mock.Mock(return_value=True))
-    def test_apply_patch_validate_patch_with_wrong_fetch_config(self, mock_subprocess_popen):
-        mock_instance = MagicMock()
-        mock_instance.communicate.return_value = (json.dumps(self.all_config), 2)
-        mock_subprocess_popen.return_value = mock_instance
+    def test_apply_patch_validate_patch_with_wrong_fetch_config(self, mock_get_config_db_snapshot):
+        mock_get_config_db_snapshot.side_effect = GenericConfigUpdaterError("Failed to get running config")
 
         # Mock open to simulate file reading
         with patch('builtins.open', mock_open(read_data=json.dumps(self.patch_content)), create=True) as mocked_open:
@@ -0,0 +1,96 @@
+from unittest import mock
+
+import mockredis
+import redis
+
+from utilities_common.counter_maps import CounterMapIndex
+
+
+class FakeDb(object):
+    COUNTERS_DB = "COUNTERS_DB"
+
+    def __init__(self, client):
+        self.client = client
+
+    def get_all(self, db_name, key):
+        return {k.decode(): v.decode() for k, v in self.client.hgetall(key).items()}
+
+    def get_redis_client(self, db_name):
+        return self.client
+
+
+class TestCounterMapIndex(object):
+    def setup_method(self):
+        self.client = mockredis.MockRedis(strict=True)
+        self.client.hset("COUNTERS_QUEUE_PORT_MAP", "oid:0x1", "oid:0x100")
+        self.client.hset("COUNTERS_QUEUE_PORT_MAP", "oid:0x2", "oid:0x100")
+        self.client.hset("COUNTERS:oid:0x1", "SAI_QUEUE_STAT_PACKETS", "1")
+        self.client.hset("USER_WATERMARKS:oid:0x2", "SAI_QUEUE_STAT_SHARED_WATERMARK_BYTES", "2")
+        self.db = FakeDb(self.client)
+
+    def test_get_reads_map_once(self):
+        index = CounterMapIndex(self.db)
+
+        with mock.patch.object(self.db, "get_all", wraps=self.db.get_all) as mock_get_all:
+            assert index.get("COUNTERS_QUEUE_PORT_MAP", "oid:0x1") == "oid:0x100"
+            assert index.get("COUNTERS_QUEUE_PORT_MAP", "oid:0x2") == "oid:0x100"
+            assert index.get("COUNTERS_QUEUE_PORT_MAP", "oid:0x3") is None
+            assert index.get("COUNTERS_QUEUE_INDEX_MAP", "oid:0x1") is None
+
+        assert mock_get_all.call_count == 2
+
+    def test_get_counters(self):
+        index = CounterMapIndex(self.db)
+
+        with mock.patch.object(self.client, "pipeline", wraps=self.client.pipeline) as mock_pipeline:
+            counters = index.get_counters(["oid:0x1", "oid:0x2"])
+
+        assert counters == {"oid:0x1": {b"SAI_QUEUE_STAT_PACKETS": b"1"}, "oid:0x2": {}}
+        mock_pipeline.assert_called_once_with(transaction=False)
+
+    def test_get_counters_client_without_pipeline(self):
+        db = FakeDb(mock.MagicMock(spec=["hgetall"], wraps=self.client))
+        index = CounterMapIndex(db)
+
+        with mock.patch("utilities_common.redis_pipeline.redis.Redis", return_value=self.client) as mock_redis, \
+                mock.patch("utilities_common.redis_pipeline.SonicDBConfig"), \
+                mock.patch.object(self.client, "pipeline", wraps=self.client.pipeline) as mock_pipeline:
+            counters = index.get_counters(["oid:0x1", "oid:0x2"])
+            counters_again = index.get_counters(["oid:0x1"])
+
+        assert counters == {"oid:0x1": {b"SAI_QUEUE_STAT_PACKETS": b"1"}, "oid:0x2": {}}
+        assert counters_again == {"oid:0x1": {b"SAI_QUEUE_STAT_PACKETS": b"1"}}
+        # The connection over the unix socket is made once, and read with pipelines
+        mock_redis.assert_called_once()
+        assert mock_pipeline.call_count == 2
+        db.client.hgetall.assert_not_called()
+
+    def test_get_counters_no_pipeline_available(self):
+        db = FakeDb(mock.MagicMock(spec=["hgetall"], wraps=self.client))
+        index = CounterMapIndex(db)
+
+        with mock.patch("utilities_common.redis_pipeline.redis.Redis") as mock_redis:
+            mock_redis.return_value.ping.side_effect = redis.ConnectionError("no socket")
+            counters = index.get_counters(["oid:0x1", "oid:0x2"])
+
+        assert counters == {"oid:0x1": {b"SAI_QUEUE_STAT_PACKETS": b"1"}, "oid:0x2": {}}
+        assert db.client.hgetall.call_count == 2
+
+    def test_get_counters_table_prefix(self):
+        index = CounterMapIndex(self.db)
+
+        counters = index.get_counters(["oid:0x2"], "USER_WATERMARKS:")
+
+        assert counters == {"oid:0x2": {b"SAI_QUEUE_STAT_SHARED_WATERMARK_BYTES": b"2"}}
+
+    def test_multiple_dbs(self):
+        client = mockredis.MockRedis(strict=True)
+        client.hset("COUNTERS_QUEUE_PORT_MAP", "oid:0x3", "oid:0x200")
+        client.hset("COUNTERS:oid:0x3", "SAI_QUEUE_STAT_PACKETS", "3")
+        index = CounterMapIndex([self.db, FakeDb(client)])
+
+        assert index.get("COUNTERS_QUEUE_PORT_MAP", "oid:0x1") == "oid:0x100"
+        assert index.get("COUNTERS_QUEUE_PORT_MAP", "oid:0x3") == "oid:0x200"
+        counters = index.get_counters(["oid:0x1", "oid:0x3"])
+        assert counters == {"oid:0x1": {b"SAI_QUEUE_STAT_PACKETS": b"1"},
+                            "oid:0x3": {b"SAI_QUEUE_STAT_PACKETS": b"3"}}
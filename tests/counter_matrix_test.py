@@ -0,0 +1,85 @@
+from utilities_common.counter_matrix import CounterMatrix, diff_counters, format_counters, rate_counters, \
+                                           to_counters
+from utilities_common.netstat import ns_diff, ns_rate
+
+
+class TestCounterColumns(object):
+    def test_to_counters(self):
+        assert to_counters(["1", "20", 3]) == [1, 20, 3]
+        assert to_counters(["1", "N/A"]) == [1, None]
+
+    def test_diff_counters_as_ns_diff(self):
+        new = ["10", "N/A", "5", "7", "N/A"]
+        old = ["4", "3", "N/A", "9", "N/A"]
+
+        diffs = format_counters(diff_counters(to_counters(new), to_counters(old)))
+
+        assert diffs == [ns_diff(n, o) for n, o in zip(new, old)]
+        assert diffs == ["6", "N/A", "5", "0", "N/A"]
+
+    def test_format_counters(self):
+        assert format_counters([1234567, 0]) == ["1,234,567", "0"]
+        assert format_counters([1234, None]) == ["1,234", "N/A"]
+
+    def test_rate_counters_as_ns_rate(self):
+        new = ["100", "N/A", "50", "10"]
+        old = ["40", "1", "N/A", "20"]
+
+        rates = rate_counters(to_counters(new), to_counters(old), 2)
+
+        assert rates == [ns_rate(n, o, 2) for n, o in zip(new, old)]
+        assert rates == [30, "N/A", "N/A", 0]
+        assert rate_counters([1], [0], 0) == ["N/A"]
+
+
+class TestCounterMatrix(object):
+    def setup_method(self):
+        self.new = {
+            'time': '2024-01-01',
+            'Ethernet0': {'rx_ok': '1000', 'rx_err': '5'},
+            'Ethernet4': {'rx_ok': '2000', 'rx_err': 'N/A'},
+            'Ethernet8': {'rx_ok': '300', 'rx_err': '1'},
+        }
+        self.old = {
+            'time': '2023-01-01',
+            'Ethernet0': {'rx_ok': '400', 'rx_err': '5'},
+            'Ethernet4': {'rx_ok': '2500', 'rx_err': '2'},
+        }
+        self.keys = ['Ethernet0', 'Ethernet4', 'Ethernet8']
+
+    def test_format_diff(self):
+        new = CounterMatrix(self.new, self.keys, ['rx_ok', 'rx_err'])
+        old = CounterMatrix(self.old, self.keys, ['rx_ok', 'rx_err'])
+
+        columns = new.format_diff(old)
+
+        # Ethernet8 has no baseline, its counters are shown as deltas from 0
+        assert columns == {'rx_ok': ['600', '0', '300'], 'rx_err': ['0', 'N/A', '1']}
+        assert old.present == [True, True, False]
+
+    def test_format_diff_raw(self):
+        self.new['Ethernet8']['rx_ok'] = '3000'
+        new = CounterMatrix(self.new, self.keys, ['rx_ok'])
+        old = CounterMatrix(self.old, self.keys, ['rx_ok'])
+
+        assert new.format_diff(old, raw=True) == {'rx_ok': ['600', '0', '3000']}
+
+    def test_rates(self):
+        new = CounterMatrix(self.new, self.keys, ['rx_ok', 'rx_err'])
+        old = CounterMatrix(self.old, self.keys, ['rx_ok', 'rx_err'])
+
+        assert new.rates(old, 'rx_ok', 2) == [300, 0, 150]
+        assert new.rates(old, 'rx_err', 2) == [0, 'N/A', 0.5]
+
+    def test_missing_fields(self):
+        # A baseline saved before a counter was added
+        del self.old['Ethernet0']['rx_err']
+        new = CounterMatrix(self.new, self.keys, ['rx_ok', 'rx_err'])
+        old = CounterMatrix(self.old, self.keys, ['rx_ok', 'rx_err'])
+
+        assert new.format_diff(old, ['rx_err']) == {'rx_err': ['5', 'N/A', '1']}
+
+    def test_empty(self):
+        new = CounterMatrix(self.new, [], ['rx_ok'])
+
+        assert new.format_diff(CounterMatrix({}, [], ['rx_ok'])) == {'rx_ok': []}
@@ -0,0 +1,70 @@
+import datetime
+import json
+import os
+
+import pytest
+
+from utilities_common.cli import json_serial
+from utilities_common.counter_snapshot import save_counter_snapshot, load_counter_snapshot, \
+                                              CounterSnapshot, SNAPSHOT_PREAMBLE, SNAPSHOT_MAGIC
+
+
+class TestCounterSnapshot(object):
+    def test_save_load(self, tmp_path):
+        path = str(tmp_path / "portstat")
+        now = datetime.datetime(2024, 1, 1, 10, 0, 0)
+        data = {
+            'time': now,
+            'Ethernet0': {'rx_ok': '10', 'rx_err': 'N/A', 'queuetype': 'UC'},
+            'Ethernet4': {'rx_ok': '18446744073709551613', 'rx_err': '0', 'queuetype': 'MC'},
+            'Ethernet8': {'rx_ok': '7', 'rx_err': None},
+        }
+
+        save_counter_snapshot(path, data, default=json_serial)
+        snapshot = load_counter_snapshot(path)
+
+        assert isinstance(snapshot, CounterSnapshot)
+        assert list(snapshot) == ['time', 'Ethernet0', 'Ethernet4', 'Ethernet8']
+        assert snapshot.get('time') == now.isoformat()
+        assert snapshot['Ethernet0'] == {'rx_ok': '10', 'rx_err': 'N/A', 'queuetype': 'UC'}
+        assert snapshot['Ethernet4'] == {'rx_ok': '18446744073709551613', 'rx_err': '0', 'queuetype': 'MC'}
+        assert snapshot['Ethernet8'] == {'rx_ok': '7', 'rx_err': None}
+        assert 'Ethernet12' not in snapshot
+        assert snapshot.get('Ethernet12', {}) == {}
+        assert not os.path.exists(path + '.tmp')
+
+    def test_save_load_int_counters(self, tmp_path):
+        path = str(tmp_path / "dropstat")
+        data = {
+            'Ethernet0': {'SAI_PORT_STAT_IF_IN_DISCARDS': 10, 'DEBUG_0': 2},
+            'Ethernet4': {'SAI_PORT_STAT_IF_IN_DISCARDS': 0},
+        }
+
+        save_counter_snapshot(path, data)
+        snapshot = load_counter_snapshot(path)
+
+        assert dict(snapshot) == data
+
+    def test_save_load_meta_only(self, tmp_path):
+        path = str(tmp_path / "dropstat-switch")
+        data = {'SAI_SWITCH_STAT_IN_DROP_REASON_RANGE_BASE': 1000}
+
+        save_counter_snapshot(path, data)
+
+        assert dict(load_counter_snapshot(path)) == data
+
+    def test_load_json(self, tmp_path):
+        path = str(tmp_path / "portstat")
+        data = {'time': '2024-01-01T10:00:00', 'Ethernet0': {'rx_ok': '10'}}
+        with open(path, 'w') as f:
+            json.dump(data, f)
+
+        assert load_counter_snapshot(path) == data
+
+    def test_load_unsupported_version(self, tmp_path):
+        path = str(tmp_path / "portstat")
+        with open(path, 'wb') as f:
+            f.write(SNAPSHOT_PREAMBLE.pack(SNAPSHOT_MAGIC, 99, 0))
+
+        with pytest.raises(ValueError):
+            load_counter_snapshot(path)
@@ -0,0 +1,155 @@
+"""
+Migration from version_3_0_0 over mock CONFIG_DB and APPL_DB of production size, with the steps run against
+the databases and against in-memory snapshots written back as a diff.
+    python -m tests.db_migrator_benchmark
+
+The snapshots trade the per step reads and writes for one load per table and one transaction per database,
+so the redis calls and pipelines are counted and priced at ROUND_TRIP_TIME on top of the measured time.
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+from .mock_tables import dbconnector
+
+PORT_COUNTS = [64, 256, 512]
+ACL_RULE_COUNT = 2000
+ROUTE_COUNT = 10000
+ROUND_TRIP_TIME = 0.0001
+START_VERSION = 'version_3_0_0'
+
+test_path = os.path.dirname(os.path.abspath(__file__))
+scripts_path = os.path.join(os.path.dirname(test_path), "scripts")
+
+
+class RoundTripCounter(object):
+    """ Counts the round trips of a mock redis client, a pipeline execution counting as one """
+    COMMANDS = ['keys', 'exists', 'hexists', 'hget', 'hgetall', 'hset', 'hmset', 'hdel', 'delete']
+
+    def __init__(self, client):
+        self.count = 0
+        self.in_pipeline = False
+        for name in self.COMMANDS:
+            setattr(client, name, self.counted(getattr(client, name)))
+        pipeline = client.pipeline
+
+        def counted_pipeline(*args, **kwargs):
+            pipe = pipeline(*args, **kwargs)
+            execute = pipe.execute
+
+            def counted_execute():
+                self.count += 1
+                self.in_pipeline = True
+                try:
+                    return execute()
+                finally:
+                    self.in_pipeline = False
+            pipe.execute = counted_execute
+            return pipe
+        client.pipeline = counted_pipeline
+
+    def counted(self, command):
+        def counted_command(*args, **kwargs):
+            if not self.in_pipeline:
+                self.count += 1
+            return command(*args, **kwargs)
+        return counted_command
+
+
+def create_config_db(port_count):
+    config_db = {
+        'VERSIONS|DATABASE': {'VERSION': START_VERSION},
+        'DEVICE_METADATA|localhost': {
+            'hwsku': 'Force10-S6000', 'type': 'ToRRouter', 'platform': 'x86_64-dell_s6000-r0'
+        },
+        'BUFFER_POOL|ingress_lossless_pool': {'mode': 'dynamic', 'size': '12766208', 'type': 'ingress'},
+        'BUFFER_PROFILE|pg_lossless_profile': {'pool': '[BUFFER_POOL|ingress_lossless_pool]', 'size': '1248'},
+        'BUFFER_PROFILE|q_lossy_profile': {'pool': '[BUFFER_POOL|ingress_lossless_pool]', 'size': '0'},
+    }
+    for i in range(32):
+        config_db['FEATURE|feature{}'.format(i)] = {'state': 'enabled', 'has_timer': 'false'}
+    for i in range(port_count):
+        port = 'Ethernet{}'.format(i * 4)
+        config_db['PORT|' + port] = {'alias': 'etp{}'.format(i), 'lanes': str(i * 4), 'mtu': '9100',
+                                     'speed': '100000', 'autoneg': '1' if i % 2 else '0'}
+        config_db['INTERFACE|{}|10.0.{}.{}/31'.format(port, i // 128, i % 128 * 2)] = {'NULL': 'NULL'}
+        config_db['PORT_QOS_MAP|' + port] = {'dscp_to_tc_map': '[DSCP_TO_TC_MAP|AZURE]', 'pfc_enable': '3,4'}
+        config_db['BUFFER_PG|{}|3-4'.format(port)] = {'profile': '[BUFFER_PROFILE|pg_lossless_profile]'}
+        for queue in ['0-2', '3-4', '5-6']:
+            config_db['BUFFER_QUEUE|{}|{}'.format(port, queue)] = {'profile': '[BUFFER_PROFILE|q_lossy_profile]'}
+            config_db['QUEUE|{}|{}'.format(port, queue)] = {'scheduler': '[SCHEDULER|scheduler.0]'}
+    for i in range(port_count // 8):
+        config_db['PORTCHANNEL|PortChannel{}'.format(i)] = {'admin_status': 'up', 'min_links': '1', 'mtu': '9100'}
+    for i in range(ACL_RULE_COUNT):
+        config_db['ACL_RULE|DATAACL|RULE_{}'.format(i)] = {'PRIORITY': str(9999 - i), 'PACKET_ACTION': 'FORWARD',
+                                                            'SRC_IP': '10.{}.{}.0/24'.format(i // 256, i % 256)}
+    return config_db
+
+
+def create_appl_db(port_count):
+    appl_db = {}
+    for i in range(port_count):
+        port = 'Ethernet{}'.format(i * 4)
+        appl_db['PORT_TABLE:' + port] = {'alias': 'etp{}'.format(i), 'mtu': '9100', 'speed': '100000'}
+        appl_db['BUFFER_PG_TABLE:{}:3-4'.format(port)] = {'profile': '[BUFFER_PROFILE_TABLE:pg_lossless_profile]'}
+    for i in range(ROUTE_COUNT):
+        appl_db['ROUTE_TABLE:10.{}.{}.0/24'.format(i // 256, i % 256)] = {'nexthop': '10.0.0.1', 'ifname': 'Ethernet0'}
+    appl_db['COPP_TABLE:default'] = {'queue': '0', 'meter_type': 'packets'}
+    return appl_db
+
+
+def migrate(db_dir, port_count, snapshot):
+    # db_migrator reads the mock databases and the test inputs in unit testing mode
+    import db_migrator
+
+    for db_name, db in [('config_db', create_config_db(port_count)), ('appl_db', create_appl_db(port_count))]:
+        with open(os.path.join(db_dir, db_name + '.json'), 'w') as f:
+            json.dump(db, f)
+    dbconnector.dedicated_dbs['CONFIG_DB'] = os.path.join(db_dir, 'config_db')
+    dbconnector.dedicated_dbs['APPL_DB'] = os.path.join(db_dir, 'appl_db')
+
+    dbmgtr = db_migrator.DBMigrator(None)
+    counters = [RoundTripCounter(dbmgtr.configDB.get_redis_client(dbmgtr.configDB.CONFIG_DB)),
+                RoundTripCounter(dbmgtr.appDB.get_redis_client(dbmgtr.appDB.APPL_DB))]
+    start = time.perf_counter()
+    if snapshot:
+        with dbmgtr.db_snapshots():
+            dbmgtr.migrate_steps()
+    else:
+        dbmgtr.migrate_steps()
+    elapsed = time.perf_counter() - start
+
+    config = dbmgtr.configDB.get_config()
+    appl_db = {key: dbmgtr.appDB.get_all(dbmgtr.appDB.APPL_DB, key)
+               for key in dbmgtr.appDB.keys(dbmgtr.appDB.APPL_DB, '*')}
+    return elapsed, sum(counter.count for counter in counters), (config, appl_db)
+
+
+def main():
+    os.environ['UTILITIES_UNIT_TESTING'] = "2"
+    sys.path.insert(0, scripts_path)
+    print("Migrating from {} with {} ACL rules and {} routes".format(START_VERSION, ACL_RULE_COUNT, ROUTE_COUNT))
+    print("{:>6} {:>11} {:>12} {:>15} {:>12} {:>9}".format("ports", "live calls", "est. (ms)",
+                                                          "snapshot calls", "est. (ms)", "speedup"))
+    try:
+        with tempfile.TemporaryDirectory() as db_dir:
+            for port_count in PORT_COUNTS:
+                live_time, live_trips, live_dbs = migrate(db_dir, port_count, snapshot=False)
+                snapshot_time, snapshot_trips, snapshot_dbs = migrate(db_dir, port_count, snapshot=True)
+                assert live_dbs == snapshot_dbs
+
+                live_est = live_time + live_trips * ROUND_TRIP_TIME
+                snapshot_est = snapshot_time + snapshot_trips * ROUND_TRIP_TIME
+                print("{:>6} {:>11} {:>12.1f} {:>15} {:>12.1f} {:>8.1f}x".format(
+                      port_count, live_trips, live_est * 1000, snapshot_trips, snapshot_est * 1000,
+                      live_est / snapshot_est))
+    finally:
+        dbconnector.dedicated_dbs['CONFIG_DB'] = None
+        dbconnector.dedicated_dbs['APPL_DB'] = None
+        os.environ['UTILITIES_UNIT_TESTING'] = "0"
+
+
+if __name__ == "__main__":
+    main()
@@ -314,6 +314,139 @@ class TestAutoNegMigrator(object):
         assert dbmgtr.configDB.get_table('PORT') == expected_db.cfgdb.get_table('PORT')
         assert dbmgtr.configDB.get_table('VERSIONS') == expected_db.cfgdb.get_table('VERSIONS')
 
+class TestMigrateSnapshot(object):
+    @classmethod
+    def setup_class(cls):
+        os.environ['UTILITIES_UNIT_TESTING'] = "2"
+
+    @classmethod
+    def teardown_class(cls):
+        os.environ['UTILITIES_UNIT_TESTING'] = "0"
+        dbconnector.dedicated_dbs['CONFIG_DB'] = None
+
+    def test_migrate_single_transaction(self):
+        dbconnector.dedicated_dbs['CONFIG_DB'] = os.path.join(mock_db_path, 'config_db', 'port-an-input')
+        import db_migrator
+        dbmgtr = db_migrator.DBMigrator(None)
+        client = dbmgtr.configDB.get_redis_client(dbmgtr.configDB.CONFIG_DB)
+        with mock.patch.object(client, 'pipeline', wraps=client.pipeline) as mock_pipeline:
+            dbmgtr.migrate()
+
+        assert mock_pipeline.call_args_list.count(mock.call(transaction=True)) == 1
+        assert dbmgtr.get_version() == dbmgtr.CURRENT_VERSION
+
+    def test_migrate_failure_writes_nothing(self):
+        dbconnector.dedicated_dbs['CONFIG_DB'] = os.path.join(mock_db_path, 'config_db', 'port-an-input')
+        import db_migrator
+        dbmgtr = db_migrator.DBMigrator(None)
+        original_config = dbmgtr.configDB.get_config()
+        with mock.patch.object(dbmgtr, 'common_migration_ops', side_effect=Exception('failed')):
+            with pytest.raises(Exception):
+                dbmgtr.migrate()
+
+        assert not isinstance(dbmgtr.configDB, db_migrator.DBSnapshot)
+        assert dbmgtr.configDB.get_config() == original_config
+
+class TestMigrationCache(object):
+    @classmethod
+    def setup_class(cls):
+        os.environ['UTILITIES_UNIT_TESTING'] = "2"
+
+    @classmethod
+    def teardown_class(cls):
+        os.environ['UTILITIES_UNIT_TESTING'] = "0"
+        dbconnector.dedicated_dbs['CONFIG_DB'] = None
+
+    def test_unchanged_config_db_not_migrated(self, tmp_path):
+        dbconnector.dedicated_dbs['CONFIG_DB'] = os.path.join(mock_db_path, 'config_db', 'port-an-input')
+        import db_migrator
+        with mock.patch.object(db_migrator, 'MIGRATION_CACHE_FILE', str(tmp_path / 'cache{}.json')):
+            dbmgtr = db_migrator.DBMigrator(None)
+            dbmgtr.migrate()
+            assert os.path.isfile(str(tmp_path / 'cache.json'))
+
+            dbmgtr.migration_cache = dbmgtr.load_migration_cache()
+            with mock.patch.object(dbmgtr, 'migrate_steps') as mock_migrate_steps:
+                dbmgtr.migrate()
+            mock_migrate_steps.assert_not_called()
+
+            dbmgtr.configDB.set_entry('PORT', 'Ethernet0', {'lanes': '0,1', 'autoneg': '1'})
+            with mock.patch.object(dbmgtr, 'migrate_steps', return_value=[]) as mock_migrate_steps:
+                dbmgtr.migrate()
+            mock_migrate_steps.assert_called_once()
+
+    def test_golden_config_changed_migrated(self, tmp_path):
+        dbconnector.dedicated_dbs['CONFIG_DB'] = os.path.join(mock_db_path, 'config_db', 'port-an-input')
+        import db_migrator
+        golden_config_file = str(tmp_path / 'golden_config_db.json')
+        with open(golden_config_file, 'w') as f:
+            json.dump({'DEVICE_METADATA': {'localhost': {'hostname': 'golden1'}}}, f)
+        with mock.patch.object(db_migrator, 'MIGRATION_CACHE_FILE', str(tmp_path / 'cache{}.json')), \
+                mock.patch.object(db_migrator, 'GOLDEN_CFG_FILE', golden_config_file):
+            dbmgtr = db_migrator.DBMigrator(None)
+            dbmgtr.migrate()
+            dbmgtr.migration_cache = dbmgtr.load_migration_cache()
+
+            with open(golden_config_file, 'w') as f:
+                json.dump({'DEVICE_METADATA': {'localhost': {'hostname': 'golden2-changed'}}}, f)
+            dbmgtr.generate_config_src(None)
+            with mock.patch.object(dbmgtr, 'migrate_steps', return_value=[]) as mock_migrate_steps:
+                dbmgtr.migrate()
+            mock_migrate_steps.assert_called_once()
+
+    def test_appl_db_changed_migrated(self, tmp_path):
+        dbconnector.dedicated_dbs['CONFIG_DB'] = os.path.join(mock_db_path, 'config_db', 'port-an-input')
+        import db_migrator
+        with mock.patch.object(db_migrator, 'MIGRATION_CACHE_FILE', str(tmp_path / 'cache{}.json')):
+            dbmgtr = db_migrator.DBMigrator(None)
+            # The COPP_TABLE entries of APPL_DB are removed by the migration on this platform
+            dbmgtr.asic_type = 'broadcom'
+            dbmgtr.migrate()
+            dbmgtr.migration_cache = dbmgtr.load_migration_cache()
+            assert 'COPP_TABLE' in dbmgtr.migration_cache['migration']['appl_db']
+
+            dbmgtr.appDB.set(dbmgtr.appDB.APPL_DB, 'COPP_TABLE:default', 'queue', '0')
+            with mock.patch.object(dbmgtr, 'migrate_steps', return_value=[]) as mock_migrate_steps:
+                dbmgtr.migrate()
+            mock_migrate_steps.assert_called_once()
+
+    def test_appl_db_runtime_state_not_migrated(self, tmp_path):
+        dbconnector.dedicated_dbs['CONFIG_DB'] = os.path.join(mock_db_path, 'config_db', 'port-an-input')
+        import db_migrator
+        with mock.patch.object(db_migrator, 'MIGRATION_CACHE_FILE', str(tmp_path / 'cache{}.json')):
+            dbmgtr = db_migrator.DBMigrator(None)
+            dbmgtr.migrate()
+            dbmgtr.migration_cache = dbmgtr.load_migration_cache()
+            assert 'ROUTE_TABLE' not in dbmgtr.migration_cache['migration']['appl_db']
+
+            # The tables the migration doesn't use, e.g. the routes restored on warm reboot, are not fingerprinted
+            dbmgtr.appDB.set(dbmgtr.appDB.APPL_DB, 'ROUTE_TABLE:10.0.0.0/24', 'nexthop', '10.0.0.1')
+            with mock.patch.object(dbmgtr, 'migrate_steps') as mock_migrate_steps:
+                dbmgtr.migrate()
+            mock_migrate_steps.assert_not_called()
+
+    def test_config_src_data_cached(self, tmp_path):
+        dbconnector.dedicated_dbs['CONFIG_DB'] = os.path.join(mock_db_path, 'config_db', 'port-an-input')
+        import db_migrator
+        with mock.patch.object(db_migrator, 'MIGRATION_CACHE_FILE', str(tmp_path / 'cache{}.json')):
+            dbmgtr = db_migrator.DBMigrator(None)
+            dbmgtr.migrate()
+
+            with mock.patch('db_migrator.parse_xml') as mock_parse_xml:
+                cached_dbmgtr = db_migrator.DBMigrator(None)
+            mock_parse_xml.assert_not_called()
+
+        config_src_data = json.loads(json.dumps(db_migrator.encode_config(dbmgtr.config_src_data)))
+        assert db_migrator.encode_config(cached_dbmgtr.config_src_data) == config_src_data
+
+    def test_encode_config(self):
+        import db_migrator
+        config_data = {'INTERFACE': {'Ethernet0': {}, ('Ethernet0', '10.0.0.0/31'): {}},
+                       'DEVICE_METADATA': {'localhost': {'hwsku': 'sku'}}}
+
+        encoded = json.loads(json.dumps(db_migrator.encode_config(config_data)))
+        assert db_migrator.decode_config(encoded) == config_data
+
 class TestInitConfigMigrator(object):
     @classmethod
     def setup_class(cls):
@@ -897,7 +1030,8 @@ class TestMain(object):
 
     @mock.patch('argparse.ArgumentParser.parse_args')
     def test_init(self, mock_args):
-        mock_args.return_value=argparse.Namespace(namespace=None, operation='get_version', socket=None)
+        mock_args.return_value=argparse.Namespace(namespace=None, operation='get_version', socket=None,
+                                                  all_namespaces=False)
         import db_migrator
         db_migrator.main()
 
@@ -905,7 +1039,8 @@ class TestMain(object):
     @mock.patch('swsscommon.swsscommon.SonicDBConfig.isInit', mock.MagicMock(return_value=False))
     @mock.patch('swsscommon.swsscommon.SonicDBConfig.initialize', mock.MagicMock())
     def test_init_no_namespace(self, mock_args):
-        mock_args.return_value = argparse.Namespace(namespace=None, operation='version_202411_01', socket=None)
+        mock_args.return_value = argparse.Namespace(namespace=None, operation='version_202411_01', socket=None,
+                                                    all_namespaces=False)
         import db_migrator
         db_migrator.main()
 
@@ -913,10 +1048,41 @@ class TestMain(object):
     @mock.patch('swsscommon.swsscommon.SonicDBConfig.isGlobalInit', mock.MagicMock(return_value=False))
     @mock.patch('swsscommon.swsscommon.SonicDBConfig.initializeGlobalConfig', mock.MagicMock())
     def test_init_namespace(self, mock_args):
-        mock_args.return_value = argparse.Namespace(namespace="asic0", operation='version_202411_01', socket=None)
+        mock_args.return_value = argparse.Namespace(namespace="asic0", operation='version_202411_01', socket=None,
+                                                    all_namespaces=False)
         import db_migrator
         db_migrator.main()
 
+    @mock.patch('argparse.ArgumentParser.parse_args')
+    @mock.patch('sonic_py_common.multi_asic.is_multi_asic', mock.MagicMock(return_value=True))
+    @mock.patch('sonic_py_common.multi_asic.get_namespace_list', mock.MagicMock(return_value=['asic0', 'asic1']))
+    @mock.patch('swsscommon.swsscommon.SonicDBConfig.isGlobalInit', mock.MagicMock(return_value=False))
+    @mock.patch('swsscommon.swsscommon.SonicDBConfig.initializeGlobalConfig', mock.MagicMock())
+    def test_init_all_namespaces(self, mock_args, capsys):
+        mock_args.return_value = argparse.Namespace(namespace=None, operation='get_version', socket=None,
+                                                    all_namespaces=True)
+        import db_migrator
+        with mock.patch('db_migrator.DBMigrator') as mock_dbmigrator:
+            mock_dbmigrator.return_value.get_version.side_effect = ['version_1', 'version_2', Exception('failed')]
+            with pytest.raises(SystemExit):
+                db_migrator.main()
+
+        assert mock_dbmigrator.call_count == 3
+        assert sorted(capsys.readouterr().out.splitlines()) == sorted(['host: version_1', 'asic0: version_2',
+                                                                       'asic1: failed: failed'])
+
+    def test_load_input_shared(self, tmp_path):
+        import db_migrator
+        input_file = str(tmp_path / 'init_cfg.json')
+        with open(input_file, 'w') as f:
+            json.dump({'FEATURE': {'bgp': {'state': 'enabled'}}}, f)
+        loader = mock.MagicMock(wraps=db_migrator.load_json)
+
+        data = db_migrator.load_input(input_file, loader)
+        data['FEATURE']['bgp']['state'] = 'disabled'
+        assert db_migrator.load_input(input_file, loader) == {'FEATURE': {'bgp': {'state': 'enabled'}}}
+        loader.assert_called_once_with(input_file)
+
 
 class TestGNMIMigrator(object):
     @classmethod
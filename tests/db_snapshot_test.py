@@ -0,0 +1,89 @@
+import json
+from unittest import mock
+
+import pytest
+
+from .mock_tables import dbconnector  # noqa: F401
+from utilities_common.db import Db
+from utilities_common.db_snapshot import DBSnapshot
+
+
+class TestDBSnapshot(object):
+    def setup_method(self):
+        self.cfgdb = Db().cfgdb
+        self.client = self.cfgdb.get_redis_client(self.cfgdb.CONFIG_DB)
+        self.snapshot = DBSnapshot(self.cfgdb, self.cfgdb.CONFIG_DB, self.client)
+
+    def test_changes_written_on_commit(self):
+        port = self.cfgdb.get_entry('PORT', 'Ethernet0')
+        self.snapshot.mod_entry('PORT', 'Ethernet0', {'mtu': '1500'})
+        self.snapshot.set_entry('PORT', 'Ethernet4', None)
+        self.snapshot.set_entry('VLAN', 'Vlan3999', {'vlanid': '3999'})
+
+        assert self.snapshot.get_entry('PORT', 'Ethernet0') == dict(port, mtu='1500')
+        assert 'Ethernet4' not in self.snapshot.get_keys('PORT')
+        assert self.cfgdb.get_entry('PORT', 'Ethernet0') == port
+        assert self.cfgdb.get_entry('PORT', 'Ethernet4')
+
+        assert self.snapshot.commit() == 3
+        assert self.cfgdb.get_entry('PORT', 'Ethernet0') == dict(port, mtu='1500')
+        assert not self.cfgdb.get_entry('PORT', 'Ethernet4')
+        assert self.cfgdb.get_entry('VLAN', 'Vlan3999') == {'vlanid': '3999'}
+
+    def test_set_entry_removes_fields(self):
+        port = self.cfgdb.get_entry('PORT', 'Ethernet0')
+        self.snapshot.set_entry('PORT', 'Ethernet0', {'lanes': port['lanes']})
+        self.snapshot.commit()
+
+        assert self.cfgdb.get_entry('PORT', 'Ethernet0') == {'lanes': port['lanes']}
+
+    def test_unchanged_entries_not_written(self):
+        for key, entry in self.snapshot.get_table('PORT').items():
+            self.snapshot.set_entry('PORT', key, entry)
+
+        assert self.snapshot.get_diff() == ([], {})
+        with mock.patch.object(self.client, 'pipeline', wraps=self.client.pipeline) as mock_pipeline:
+            assert self.snapshot.commit() == 0
+        mock_pipeline.assert_not_called()
+
+    def test_commit_single_transaction(self):
+        self.snapshot.set(self.cfgdb.CONFIG_DB, 'PORT|Ethernet0', 'mtu', '1500')
+        self.snapshot.delete(self.cfgdb.CONFIG_DB, 'PORT|Ethernet4')
+
+        with mock.patch.object(self.client, 'pipeline', wraps=self.client.pipeline) as mock_pipeline:
+            self.snapshot.commit()
+        mock_pipeline.assert_called_once_with(transaction=True)
+
+    def test_table_read_once(self):
+        with mock.patch.object(self.client, 'keys', wraps=self.client.keys) as mock_keys:
+            self.snapshot.get_table('PORT')
+            self.snapshot.get_entry('PORT', 'Ethernet0')
+            self.snapshot.get(self.cfgdb.CONFIG_DB, 'PORT|Ethernet4', 'mtu')
+            self.snapshot.keys(self.cfgdb.CONFIG_DB, 'PORT|*')
+
+        assert mock_keys.call_count == 1
+
+    def test_keys(self):
+        self.snapshot.set(self.cfgdb.CONFIG_DB, 'VXLAN_TUNNEL|vtep2', 'src_ip', '10.1.0.1')
+
+        keys = self.snapshot.keys(self.cfgdb.CONFIG_DB, 'VXLAN_TUNNEL*')
+        assert sorted(keys) == sorted(self.client.keys('VXLAN_TUNNEL*') + ['VXLAN_TUNNEL|vtep2'])
+
+    def test_table_digests(self):
+        digests = self.snapshot.get_table_digests(['PORT', 'VLAN'])
+        assert sorted(digests) == ['PORT', 'VLAN']
+        # The tables read for their digests are not used by the calls
+        assert self.snapshot.get_used_tables() == []
+
+        self.snapshot.mod_entry('PORT', 'Ethernet0', {'mtu': '1500'})
+        with mock.patch('utilities_common.db_snapshot.json.dumps', wraps=json.dumps) as mock_dumps:
+            new_digests = self.snapshot.get_table_digests(['PORT', 'VLAN'])
+        # Only the digest of the changed table is computed again
+        assert mock_dumps.call_count == 1
+        assert new_digests['PORT'] != digests['PORT']
+        assert new_digests['VLAN'] == digests['VLAN']
+        assert self.snapshot.get_used_tables() == ['PORT']
+
+    def test_other_db(self):
+        with pytest.raises(ValueError):
+            self.snapshot.get_all('APPL_DB', 'PORT_TABLE:Ethernet0')
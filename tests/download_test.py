@@ -0,0 +1,227 @@
+import hashlib
+import os
+import re
+import stat
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utilities_common import download
+from utilities_common.download import DownloadError
+
+CHUNK_SIZE = 64 * 1024
+CONTENT = os.urandom(10 * CHUNK_SIZE + 123)
+CHECKSUM = 'sha256:' + hashlib.sha256(CONTENT).hexdigest()
+
+
+class FileServer(ThreadingHTTPServer):
+    """ A local HTTP server of a file, which records the ranges requested
+    and can drop connections or fail requests """
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), FileHandler)
+        self.content = CONTENT
+        self.etag = '"v1"'
+        self.ranges = True
+        self.ranges_requested = []
+        self.authorizations = []
+        # The bytes served by a response before its connection is dropped, by offset
+        self.drops = {}
+        # The offsets whose requests always fail
+        self.failing = set()
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:{}/image.bin'.format(self.server_address[1])
+
+
+class FileHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        content = server.content
+        start, end = 0, len(content) - 1
+        status = 200
+        match = re.match(r'bytes=(\d+)-(\d+)', self.headers.get('Range', ''))
+        if_range = self.headers.get('If-Range')
+        if server.ranges and match and (if_range is None or if_range == server.etag):
+            start, end, status = int(match.group(1)), min(int(match.group(2)), len(content) - 1), 206
+        with server.lock:
+            server.authorizations.append(self.headers.get('Authorization'))
+            if status == 206:
+                server.ranges_requested.append((start, end + 1))
+            drop = server.drops.pop(start, None)
+        if start in server.failing:
+            self.send_error(503)
+            return
+
+        self.send_response(status)
+        self.send_header('Content-Length', str(end + 1 - start))
+        self.send_header('ETag', server.etag)
+        if server.ranges:
+            self.send_header('Accept-Ranges', 'bytes')
+        if status == 206:
+            self.send_header('Content-Range', 'bytes {}-{}/{}'.format(start, end, len(content)))
+        self.end_headers()
+        if drop is not None:
+            self.wfile.write(content[start:start + drop])
+            self.close_connection = True
+            return
+        self.wfile.write(content[start:end + 1])
+
+
+@pytest.fixture
+def server():
+    server = FileServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def get(server, path, **kwargs):
+    kwargs.setdefault('chunk_size', CHUNK_SIZE)
+    kwargs.setdefault('retry_delay', 0)
+    download.download(server.url, path, **kwargs)
+
+
+class TestDownload(object):
+    def test_parallel_segments(self, server, tmp_path):
+        path = str(tmp_path / 'image.bin')
+        progress = []
+
+        get(server, path, checksum=CHECKSUM, workers=4, progress=lambda done, size: progress.append((done, size)))
+
+        with open(path, 'rb') as f:
+            assert f.read() == CONTENT
+        segments = [(start, min(start + CHUNK_SIZE, len(CONTENT))) for start in range(0, len(CONTENT), CHUNK_SIZE)]
+        assert sorted(server.ranges_requested[1:]) == segments
+        assert progress[-1] == (len(CONTENT), len(CONTENT))
+        assert not os.path.exists(path + download.PARTIAL_SUFFIX)
+        assert not os.path.exists(path + download.STATE_SUFFIX)
+
+    def test_dropped_connection_resumed_from_offset(self, server, tmp_path):
+        path = str(tmp_path / 'image.bin')
+        server.drops[2 * CHUNK_SIZE] = 1000
+
+        get(server, path, checksum=CHECKSUM)
+
+        with open(path, 'rb') as f:
+            assert f.read() == CONTENT
+        assert (2 * CHUNK_SIZE + 1000, 3 * CHUNK_SIZE) in server.ranges_requested
+
+    def test_resume_partial_file(self, server, tmp_path):
+        path = str(tmp_path / 'image.bin')
+        server.failing.add(5 * CHUNK_SIZE)
+        with pytest.raises(DownloadError):
+            get(server, path, checksum=CHECKSUM, workers=1, retries=1)
+        assert os.path.exists(path + download.PARTIAL_SUFFIX)
+        assert not os.path.exists(path)
+
+        server.failing.clear()
+        server.ranges_requested = []
+        get(server, path, checksum=CHECKSUM, workers=1)
+
+        with open(path, 'rb') as f:
+            assert f.read() == CONTENT
+        # Only the segments missing are downloaded again
+        assert all(start >= 5 * CHUNK_SIZE for start, _ in server.ranges_requested[1:])
+
+    def fail_download(self, server, path):
+        server.failing.add(5 * CHUNK_SIZE)
+        with pytest.raises(DownloadError):
+            get(server, path, checksum=CHECKSUM, workers=1, retries=0)
+        server.failing.clear()
+        server.ranges_requested = []
+
+    def test_partial_file_symlink_starts_over(self, server, tmp_path):
+        path = str(tmp_path / 'image.bin')
+        self.fail_download(server, path)
+        target = str(tmp_path / 'target')
+        os.replace(path + download.PARTIAL_SUFFIX, target)
+        os.symlink(target, path + download.PARTIAL_SUFFIX)
+
+        get(server, path, checksum=CHECKSUM, workers=1)
+
+        with open(path, 'rb') as f:
+            assert f.read() == CONTENT
+        assert (0, CHUNK_SIZE) in server.ranges_requested
+        # The target of the symlink is left untouched
+        assert os.path.getsize(target) == len(CONTENT) and not os.path.islink(path)
+
+    def test_state_file_writable_by_others_starts_over(self, server, tmp_path):
+        path = str(tmp_path / 'image.bin')
+        self.fail_download(server, path)
+        os.chmod(path + download.STATE_SUFFIX, 0o666)
+
+        get(server, path, checksum=CHECKSUM, workers=1)
+
+        with open(path, 'rb') as f:
+            assert f.read() == CONTENT
+        assert (0, CHUNK_SIZE) in server.ranges_requested
+
+    def test_directory_writable_by_others_starts_over(self, server, tmp_path):
+        path = str(tmp_path / 'image.bin')
+        self.fail_download(server, path)
+        os.chmod(str(tmp_path), 0o777)
+
+        get(server, path, checksum=CHECKSUM, workers=1)
+
+        assert (0, CHUNK_SIZE) in server.ranges_requested
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+
+    def test_file_changed_starts_over(self, server, tmp_path):
+        path = str(tmp_path / 'image.bin')
+        server.failing.add(5 * CHUNK_SIZE)
+        with pytest.raises(DownloadError):
+            get(server, path, workers=1, retries=0)
+
+        server.failing.clear()
+        server.content = CONTENT[::-1]
+        server.etag = '"v2"'
+        server.ranges_requested = []
+        get(server, path, checksum='sha256:' + hashlib.sha256(CONTENT[::-1]).hexdigest())
+
+        with open(path, 'rb') as f:
+            assert f.read() == CONTENT[::-1]
+        assert (0, CHUNK_SIZE) in server.ranges_requested
+
+    def test_checksum_mismatch(self, server, tmp_path):
+        path = str(tmp_path / 'image.bin')
+
+        with pytest.raises(DownloadError, match='Checksum mismatch'):
+            get(server, path, checksum='sha256:' + hashlib.sha256(b'other').hexdigest())
+
+        assert not os.path.exists(path)
+        assert not os.path.exists(path + download.PARTIAL_SUFFIX)
+        assert not os.path.exists(path + download.STATE_SUFFIX)
+
+    def test_no_range_support(self, server, tmp_path):
+        path = str(tmp_path / 'image.bin')
+        server.ranges = False
+
+        get(server, path, checksum=CHECKSUM)
+
+        with open(path, 'rb') as f:
+            assert f.read() == CONTENT
+        assert server.ranges_requested == []
+
+    def test_credentials(self, server, tmp_path):
+        path = str(tmp_path / 'image.bin')
+        url = server.url.replace('http://', 'http://admin:secret@')
+
+        download.download(url, path, chunk_size=CHUNK_SIZE)
+
+        assert set(server.authorizations) == {'Basic YWRtaW46c2VjcmV0'}
+
+    def test_invalid_checksum(self, tmp_path):
+        with pytest.raises(ValueError):
+            download.download('http://127.0.0.1/image.bin', str(tmp_path / 'image.bin'), checksum='nope')
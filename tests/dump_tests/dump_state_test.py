@@ -9,7 +9,7 @@ from unittest import mock, TestCase
 from importlib import reload
 from click.testing import CliRunner
 from utilities_common.db import Db
-from dump.match_infra import ConnectionPool, MatchEngine, CONN
+from dump.match_infra import ConnectionPool, MatchEngine, TableSnapshot, CONN
 from dump.helper import populate_mock
 from deepdiff import DeepDiff
 from utilities_common.constants import DEFAULT_NAMESPACE
@@ -112,11 +112,7 @@ table_config_file_copp='''\
 +-----------+-------------+---------------------------------------------------------------+
 '''
 
-@pytest.fixture(scope="class")
-def match_engine():
-    print("SETUP")
-    os.environ["VERBOSE"] = "1"
-
+def create_conn_pool():
     dump_port_input = os.path.join(os.path.dirname(__file__), "../dump_input/dump/default")
 
     dedicated_dbs = {}
@@ -124,7 +120,7 @@ def match_engine():
     dedicated_dbs['APPL_DB'] = os.path.join(dump_port_input, "appl_db.json")
     dedicated_dbs['STATE_DB'] = os.path.join(dump_port_input, "state_db.json")
     dedicated_dbs['ASIC_DB'] =  os.path.join(dump_port_input, "asic_db.json")
-    
+
     conn = SonicV2Connector()
     # popualate the db ,with mock data
     db_names = list(dedicated_dbs.keys())
@@ -135,7 +131,15 @@ def match_engine():
 
     conn_pool = ConnectionPool()
     conn_pool.fill(DEFAULT_NAMESPACE, conn, db_names)
-    match_engine = MatchEngine(conn_pool)
+    return conn_pool
+
+
+@pytest.fixture(scope="class")
+def match_engine():
+    print("SETUP")
+    os.environ["VERBOSE"] = "1"
+
+    match_engine = MatchEngine(create_conn_pool())
 
     yield match_engine
     print("TEARDOWN")
@@ -174,6 +178,21 @@ class TestDumpState:
         ddiff = compare_json_output(expected, result.output)
         assert not ddiff, ddiff
 
+    def test_identifier_multiple_snapshot_opt_in(self, match_engine):
+        runner = CliRunner()
+        with mock.patch("dump.match_infra.TableSnapshot", wraps=TableSnapshot) as table_snapshot:
+            lookups = runner.invoke(dump.state, ["port", "Ethernet0,Ethernet4"], obj=MatchEngine(match_engine.conn_pool))
+        # A list of identifiers is dumped with lookups of their keys, unless the snapshot mode is asked for
+        table_snapshot.assert_not_called()
+
+        with mock.patch("dump.match_infra.TableSnapshot", wraps=TableSnapshot) as table_snapshot:
+            snapshot = runner.invoke(dump.state, ["port", "Ethernet0,Ethernet4", "--snapshot"],
+                                     obj=MatchEngine(match_engine.conn_pool))
+        assert table_snapshot.called
+        assert snapshot.exit_code == 0, "exit code: {}, Exception: {}, Traceback: {}".format(snapshot.exit_code, snapshot.exception, snapshot.exc_info)
+        ddiff = compare_json_output(json.loads(lookups.output), snapshot.output)
+        assert not ddiff, ddiff
+
     def test_option_key_map(self, match_engine):
         runner = CliRunner()
         result = runner.invoke(dump.state, ["port", "Ethernet0", "--key-map"], obj=match_engine)
@@ -218,6 +237,48 @@ class TestDumpState:
         ddiff = DeepDiff(set(expected_entries), set(rec_json.keys()))
         assert not ddiff, "Expected Entries were not recieved when passing all keyword"
 
+    def invoke_parallel(self, match_engine, args):
+        """ Invoke the command with a new ConnectionPool of mock connections created by each worker """
+        worker_pools = []
+
+        def create_worker_pool():
+            worker_pools.append(create_conn_pool())
+            return worker_pools[-1]
+
+        match_engine.clear_snapshot()
+        with mock.patch("dump.main.ConnectionPool", side_effect=create_worker_pool), \
+                mock.patch("dump.match_infra.TableSnapshot", wraps=TableSnapshot) as table_snapshot:
+            result = CliRunner().invoke(dump.state, args, obj=match_engine)
+        assert result.exit_code == 0, "exit code: {}, Exception: {}, Traceback: {}".format(result.exit_code, result.exception, result.exc_info)
+        # Each worker reads from its own connections
+        assert worker_pools
+        assert all(pool is not match_engine.conn_pool for pool in worker_pools)
+        # The workers share the snapshots: each table is loaded once, by the main thread or a worker
+        loaded = [(req.ns, req.db, req.table) for (_, req), _ in table_snapshot.call_args_list]
+        assert loaded and len(loaded) == len(set(loaded))
+        return result
+
+    def test_identifier_all_parallel(self, match_engine):
+        runner = CliRunner()
+        serial = runner.invoke(dump.state, ["port", "all"], obj=match_engine)
+        result = self.invoke_parallel(match_engine, ["port", "all", "--jobs", "4"])
+        ddiff = compare_json_output(json.loads(serial.output), result.output)
+        assert not ddiff, ddiff
+        assert list(json.loads(result.output).keys()) == list(json.loads(serial.output).keys())
+
+    def test_identifier_all_stream(self, match_engine):
+        runner = CliRunner()
+        serial = runner.invoke(dump.state, ["port", "all", "--key-map"], obj=match_engine)
+        result = self.invoke_parallel(match_engine, ["port", "all", "--key-map", "--jobs", "2", "--stream"])
+        ddiff = compare_json_output(json.loads(serial.output), result.output)
+        assert not ddiff, ddiff
+
+    def test_option_tabular_display_stream(self, match_engine):
+        runner = CliRunner()
+        result = runner.invoke(dump.state, ["port", "Ethernet0", "--table", "--key-map", "--stream"], obj=match_engine)
+        assert result.exit_code == 0, "exit code: {}, Exception: {}, Traceback: {}".format(result.exit_code, result.exception, result.exc_info)
+        assert table_display_output_no_filtering == result.output
+
     def test_namespace_single_asic(self, match_engine):
         runner = CliRunner()
         result = runner.invoke(dump.state, ["port", "Ethernet0", "--table", "--key-map", "--namespace", "asic0"], obj=match_engine)
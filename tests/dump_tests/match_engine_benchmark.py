@@ -0,0 +1,172 @@
+"""
+Fetches of the route dumps of the MatchEngine, one call per key vs the pipelined batches of RedisSource.
+    python -m tests.dump_tests.match_engine_benchmark
+
+The mock source of each size holds ROUTE_COUNTS routes in APPL_DB and ASIC_DB, with their VIDTORID entries.
+A key fetch costs a round trip while a batch costs one per pipeline, each priced at ROUND_TRIP_TIME.
+"""
+import fnmatch
+import os
+import time
+from contextlib import nullcontext
+from unittest import mock
+
+import mockredis
+from mockredis.pipeline import MockRedisPipeline
+from swsscommon.swsscommon import SonicDBConfig
+
+from dump.match_infra import ConnectionPool, MatchEngine, MatchRequest
+from utilities_common.constants import DEFAULT_NAMESPACE
+
+ROUTE_COUNTS = [1000, 5000, 20000]
+REPEATS = 3
+ROUND_TRIP_TIME = 0.0001
+DB_CONFIG = os.path.join(os.path.dirname(__file__), "../mock_tables/database_config.json")
+
+
+def decode(value):
+    if isinstance(value, bytes):
+        return value.decode()
+    if isinstance(value, dict):
+        return {decode(k): decode(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [decode(v) for v in value]
+    return value
+
+
+class CountingPipeline(MockRedisPipeline):
+    def execute(self):
+        self.mock_redis.round_trip()
+        self.mock_redis.in_pipeline = True
+        try:
+            return super().execute()
+        finally:
+            self.mock_redis.in_pipeline = False
+
+
+class CountingRedis(mockredis.MockRedis):
+    """ A mock redis client with decoded responses, which counts its round trips """
+
+    def __init__(self):
+        super().__init__(strict=True)
+        self.round_trips = 0
+        self.in_pipeline = False
+
+    def round_trip(self):
+        if not self.in_pipeline:
+            self.round_trips += 1
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        return CountingPipeline(self, transaction, shard_hint)
+
+    def keys(self, pattern="*"):
+        # The glob of mockredis doesn't match a "/", which the route prefixes have
+        self.round_trip()
+        return fnmatch.filter(decode(list(self.redis.keys())), pattern)
+
+    def hget(self, key, field):
+        self.round_trip()
+        return decode(super().hget(key, field))
+
+    def hgetall(self, key):
+        self.round_trip()
+        return decode(super().hgetall(key))
+
+    def hmget(self, key, keys, *args):
+        self.round_trip()
+        return decode(super().hmget(key, keys, *args))
+
+
+class MockConnector(object):
+    """ The calls of SonicV2Connector made by the MatchEngine, over a single CountingRedis """
+
+    def __init__(self, client):
+        self.client = client
+
+    def connect(self, db_name):
+        pass
+
+    def get_db_separator(self, db_name):
+        return SonicDBConfig.getSeparator(db_name)
+
+    def get_redis_client(self, db_name):
+        return self.client
+
+    def keys(self, db_name, pattern):
+        return self.client.keys(pattern)
+
+    def get(self, db_name, key, field):
+        return self.client.hget(key, field)
+
+    def get_all(self, db_name, key):
+        return self.client.hgetall(key)
+
+
+def create_routes(client, route_count):
+    vids = []
+    for i in range(route_count):
+        prefix = "10.{}.{}.0/24".format(i // 256, i % 256)
+        client.hmset("ROUTE_TABLE:" + prefix, {"nexthop": "10.0.0.1", "ifname": "Ethernet{}".format(i % 32 * 4)})
+        vid = "oid:0x{:x}".format(0x4000000000000 + i)
+        client.hmset("ASIC_STATE:SAI_OBJECT_TYPE_NEXT_HOP:" + vid, {"SAI_NEXT_HOP_ATTR_IP": "10.0.0.1"})
+        client.hset("VIDTORID", vid, "oid:0x{:x}".format(0x3000000000000 + i))
+        vids.append(vid)
+    return vids
+
+
+def run_scenarios(engine, vids):
+    # The dump plugins read the db config when imported
+    from dump.main import extract_rid
+
+    results = []
+    ret = engine.fetch(MatchRequest(db="APPL_DB", table="ROUTE_TABLE", field="ifname", value="Ethernet0",
+                                    return_fields=["nexthop"]))
+    results.append(ret)
+    ret = engine.fetch(MatchRequest(db="ASIC_DB", table="ASIC_STATE", key_pattern="SAI_OBJECT_TYPE_NEXT_HOP:*",
+                                    just_keys=False))
+    results.append(ret)
+    info = {vid: {"ASIC_DB": {"keys": ["ASIC_STATE:SAI_OBJECT_TYPE_NEXT_HOP:" + vid]}} for vid in vids}
+    results.append(extract_rid(info, DEFAULT_NAMESPACE, engine.conn_pool))
+    return results
+
+
+def time_scenarios(route_count, pipelined):
+    client = CountingRedis()
+    vids = create_routes(client, route_count)
+    pool = ConnectionPool()
+    pool.fill(DEFAULT_NAMESPACE, MockConnector(client), ["APPL_DB", "ASIC_DB"])
+    engine = MatchEngine(pool)
+
+    elapsed = []
+    for _ in range(REPEATS):
+        client.round_trips = 0
+        # Without a pipeline connection RedisSource falls back to a call per key
+        patch = nullcontext() if pipelined else mock.patch.object(pool, "get_pipeline_conn", return_value=None)
+        with patch:
+            start = time.perf_counter()
+            results = run_scenarios(engine, vids)
+            elapsed.append(time.perf_counter() - start)
+    return min(elapsed), client.round_trips, results
+
+
+def main():
+    if not SonicDBConfig.isInit():
+        SonicDBConfig.initialize(DB_CONFIG)
+    print("Filtering routes by a field, reading all the fields of the next hops and resolving their RIDs, "
+          "best of {}".format(REPEATS))
+    print("{:>7} {:>14} {:>12} {:>14} {:>12} {:>9}".format("routes", "per key calls", "est. (ms)",
+                                                          "batched calls", "est. (ms)", "speedup"))
+    for route_count in ROUTE_COUNTS:
+        legacy_time, legacy_trips, legacy_results = time_scenarios(route_count, pipelined=False)
+        batched_time, batched_trips, batched_results = time_scenarios(route_count, pipelined=True)
+        assert legacy_results == batched_results
+
+        legacy_est = legacy_time + legacy_trips * ROUND_TRIP_TIME
+        batched_est = batched_time + batched_trips * ROUND_TRIP_TIME
+        print("{:>7} {:>14} {:>12.1f} {:>14} {:>12.1f} {:>8.1f}x".format(
+              route_count, legacy_trips, legacy_est * 1000, batched_trips, batched_est * 1000,
+              legacy_est / batched_est))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,11 @@ import os
 import sys
 import unittest
 import pytest
-from dump.match_infra import MatchEngine, EXCEP_DICT, MatchRequest, MatchRequestOptimizer, ConnectionPool, CONN
+from dump.match_infra import MatchEngine, EXCEP_DICT, MatchRequest, MatchRequestOptimizer, ConnectionPool, CONN, \
+    RedisSource, TableSnapshot
 from utilities_common.constants import DEFAULT_NAMESPACE
 from dump.helper import populate_mock
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 from deepdiff import DeepDiff
 from importlib import reload
 
@@ -267,6 +268,135 @@ class TestNonDefaultNameSpace:
         assert len(ret["keys"]) == 1
         assert "PORT|Ethernet-BP256" in ret["keys"]
 
+class TestBatchedFetch:
+
+    def get_client(self, match_engine, db):
+        conn = match_engine.conn_pool.get(db, DEFAULT_NAMESPACE)
+        return conn, match_engine.conn_pool.get_pipeline_conn(db, DEFAULT_NAMESPACE)
+
+    def test_field_value_match_pipelined(self, match_engine):
+        conn, client = self.get_client(match_engine, "STATE_DB")
+        req = MatchRequest(db="STATE_DB", table="VXLAN_TUNNEL_TABLE", key_pattern="EVPN_25.25.25.2*",
+                           field="operstatus", value="down", return_fields=["src_ip"])
+        with patch.object(client, "pipeline", wraps=client.pipeline) as mock_pipeline, \
+                patch.object(conn, "get", wraps=conn.get) as mock_get:
+            ret = match_engine.fetch(req)
+        assert ret["error"] == ""
+        assert len(ret["keys"]) == 3
+        assert "1.1.1.1" == ret["return_values"]["VXLAN_TUNNEL_TABLE|EVPN_25.25.25.25"]["src_ip"]
+        # One pipeline to filter the keys and one to read the return fields
+        assert mock_pipeline.call_count == 2
+        assert mock_get.call_count == 0
+
+    def test_just_keys_false_pipelined(self, match_engine):
+        conn, client = self.get_client(match_engine, "CONFIG_DB")
+        req = MatchRequest(db="CONFIG_DB", table="SFLOW", key_pattern="global", just_keys=False)
+        with patch.object(client, "pipeline", wraps=client.pipeline) as mock_pipeline, \
+                patch.object(conn, "get_all", wraps=conn.get_all) as mock_get_all:
+            ret = match_engine.fetch(req)
+        assert ret["error"] == ""
+        assert ret["keys"] == [{"SFLOW|global": {"admin_state": "up", "polling_interval": "0"}}]
+        assert mock_pipeline.call_count == 1
+        assert mock_get_all.call_count == 0
+
+    def test_hmget(self, match_engine):
+        conn, client = self.get_client(match_engine, "STATE_DB")
+        src = RedisSource(match_engine.conn_pool)
+        assert src.connect("STATE_DB", DEFAULT_NAMESPACE)
+        values = src.hmget("STATE_DB", "REBOOT_CAUSE|2020_10_09_04_53_58", ["cause", "missing_field"])
+        assert values == ["warm-reboot", None]
+        assert src.get_many("STATE_DB", ["REBOOT_CAUSE|2020_10_09_04_53_58", "REBOOT_CAUSE|missing"])[1] == {}
+
+    def test_no_pipeline_fallback(self, match_engine):
+        src = RedisSource(match_engine.conn_pool)
+        assert src.connect("STATE_DB", DEFAULT_NAMESPACE)
+        with patch.object(match_engine.conn_pool, "get_pipeline_conn", return_value=None):
+            values = src.hget_many("STATE_DB", ["REBOOT_CAUSE|2020_10_09_04_53_58"], "cause")
+        assert values == ["warm-reboot"]
+
+
+class TestMatchEngineSnapshot:
+
+    def test_snapshot_matches_source(self, match_engine):
+        snapshot_engine = MatchEngine(match_engine.conn_pool, snapshot=True)
+        file = os.path.join(dump_test_input, "copp_cfg.json")
+        reqs = [
+            dict(db="STATE_DB", table="VXLAN_TUNNEL_TABLE", key_pattern="EVPN_25.25.25.2*", field="operstatus",
+                 value="down", return_fields=["src_ip"]),
+            dict(db="CONFIG_DB", table="SFLOW", key_pattern="global", just_keys=False),
+            dict(db="CONFIG_DB", table="PORT", key_pattern="*", field="lanes", value="61,62,63,64",
+                 match_entire_list=True),
+            dict(db="STATE_DB", table="REBOOT_CAUSE", return_fields=["cause", "missing_field"]),
+            dict(file=file, table="COPP_TRAP", field="trap_ids", value="arp_req"),
+            dict(file=file, table="COPP_GROUP", key_pattern="queue4*", field="red_action", value="drop",
+                 just_keys=False),
+            dict(db="CONFIG_DB", table="PORT", key_pattern="Ethernet1234"),
+            dict(db="STATE_DB", table="CHASSIS_MODULE_TABLE", field="oper_status", value="Unknown"),
+        ]
+        for kwargs in reqs:
+            ret = match_engine.fetch(MatchRequest(**kwargs))
+            snapshot_ret = snapshot_engine.fetch(MatchRequest(**kwargs))
+            ddiff = DeepDiff(ret, snapshot_ret, ignore_order=True)
+            assert not ddiff, ddiff
+
+    def get_table_snapshot(self, table, separator, keys):
+        src = MagicMock()
+        src.MISSING_FIELD = "missing"
+        src.get_separator.return_value = separator
+        src.getKeys.return_value = [table + separator + key for key in keys]
+        src.get_many.return_value = [{"field": "value"} for _ in keys]
+        snapshot = TableSnapshot(src, MatchRequest(db="ASIC_DB", table=table, key_pattern="*"))
+        # Count the keys each pattern is matched against
+        scanned = []
+
+        def get_pattern(key_pattern):
+            pattern = TableSnapshot._TableSnapshot__get_pattern(snapshot, key_pattern)
+            return MagicMock(match=lambda key: scanned.append(key) or pattern.match(key))
+        snapshot._TableSnapshot__get_pattern = get_pattern
+        return snapshot, scanned
+
+    def test_get_keys_route_pattern_scans_route_keys(self):
+        table = "ASIC_STATE:SAI_OBJECT_TYPE_ROUTE_ENTRY"
+        keys = ['{"dest":"10.0.%d.0/24","switch_id":"oid:0x21000000000000","vr":"oid:0x3000000000002"}' % i
+                for i in range(1000)] + ["not_json"]
+        snapshot, scanned = self.get_table_snapshot(table, ":", keys)
+
+        matched = snapshot.get_keys('*"dest":"10.0.7.0/24"*')
+
+        assert matched == [table + ":" + keys[7]]
+        # Only the route to the destination, and the key which isn't json, are matched against the pattern
+        assert sorted(scanned) == sorted([table + ":" + keys[7], table + ":not_json"])
+        assert snapshot.get_keys('*"dest":"10.1.0.0/24"*') == []
+
+    def test_get_keys_literal_prefix_scans_prefixed_keys(self):
+        keys = ["Vlan%d|Ethernet%d" % (vlan, port) for vlan in range(100) for port in range(0, 40, 4)]
+        snapshot, scanned = self.get_table_snapshot("VLAN_MEMBER", "|", keys)
+
+        matched = snapshot.get_keys("Vlan12|Ethernet*")
+
+        assert matched == ["VLAN_MEMBER|Vlan12|Ethernet%d" % port for port in range(0, 40, 4)]
+        assert len(scanned) == 10
+        assert len(snapshot.get_keys("*|Ethernet0")) == 100
+        assert len(scanned) == 10 + len(keys)
+
+    def test_table_loaded_once(self, match_engine):
+        snapshot_engine = MatchEngine(match_engine.conn_pool, snapshot=True)
+        with patch.object(RedisSource, "getKeys", autospec=True, side_effect=RedisSource.getKeys) as mock_get_keys:
+            for lanes in ["61,62,63,64", "29,30,31,32"]:
+                req = MatchRequest(db="CONFIG_DB", table="PORT", key_pattern="*", field="lanes", value=lanes,
+                                   match_entire_list=True)
+                ret = snapshot_engine.fetch(req)
+                assert ret["error"] == ""
+                assert len(ret["keys"]) == 1
+            req = MatchRequest(db="CONFIG_DB", table="PORT", key_pattern="Ethernet60", return_fields=["lanes"])
+            ret = snapshot_engine.fetch(req)
+            assert ret["return_values"]["PORT|Ethernet60"]["lanes"] == "61,62,63,64"
+        assert mock_get_keys.call_count == 1
+
+        snapshot_engine.clear_snapshot(DEFAULT_NAMESPACE)
+        assert not snapshot_engine.snapshots
+
+
 class TestMatchEngineOptimizer:
 
     def test_caching(self):
@@ -1,14 +1,19 @@
 import os
 from click.testing import CliRunner
+from unittest import mock
 import pytest
+import redis
 
 import show.main as show
+from .mock_tables import dbconnector
 from .utils import get_result_and_return_code
+from utilities_common.general import load_module_from_source
 import subprocess
 
 root_path = os.path.dirname(os.path.abspath(__file__))
 modules_path = os.path.dirname(root_path)
 scripts_path = os.path.join(modules_path, "scripts")
+fdbshow = load_module_from_source('fdbshow', os.path.join(scripts_path, 'fdbshow'))
 
 show_mac_output_with_def_vlan = """\
   No.    Vlan  MacAddress         Port       Type
@@ -572,3 +577,37 @@ class TestFdbshow():
         print("result = {}".format(result))
         assert return_code == 1
         assert result == show_mac_invalid_address_output.strip("\n")
+
+
+class TestFdbshowFetch():
+    def setup_method(self):
+        mock_db_path = os.path.join(root_path, "fdbshow_input")
+        dbconnector.dedicated_dbs['ASIC_DB'] = os.path.join(mock_db_path, 'asic_db')
+        dbconnector.dedicated_dbs['COUNTERS_DB'] = os.path.join(mock_db_path, 'counters_db')
+
+    def teardown_method(self):
+        dbconnector.dedicated_dbs['ASIC_DB'] = None
+        dbconnector.dedicated_dbs['COUNTERS_DB'] = None
+
+    @pytest.mark.parametrize("unix_socket", [True, False])
+    def test_iter_fdb_data_client_without_pipeline(self, unix_socket):
+        fdb = fdbshow.FdbShow()
+        expected = list(fdb.iter_fdb_data())
+        client = fdb.db.get_redis_client(fdb.db.ASIC_DB)
+        client_without_pipeline = mock.MagicMock(spec=["scan", "hgetall"], wraps=client)
+
+        with mock.patch.object(fdb.db, "get_redis_client", return_value=client_without_pipeline), \
+                mock.patch("utilities_common.redis_pipeline.redis.Redis") as mock_redis:
+            if unix_socket:
+                # The entries are read with a pipeline on a connection over the unix socket
+                mock_redis.return_value = client
+            else:
+                mock_redis.return_value.ping.side_effect = redis.ConnectionError("no socket")
+            fdb.fetcher = fdbshow.BulkCounterFetcher(fdb.db, fdb.db.ASIC_DB)
+            with mock.patch.object(client, "pipeline", wraps=client.pipeline) as mock_pipeline:
+                entries = list(fdb.iter_fdb_data())
+
+        assert expected
+        assert entries == expected
+        assert mock_pipeline.called == unix_socket
+        assert client_without_pipeline.hgetall.called != unix_socket
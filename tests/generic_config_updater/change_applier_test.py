@@ -68,31 +68,16 @@ json_changes = {}
 json_change_index = 0
 
 DB_HANDLE = "config_db"
+PIPE_HANDLE = "config_db_pipe"
 
 def debug_print(msg):
     print(msg)
 
-# Mimics os.system call for `sonic-cfggen -d --print-data` output
-def subprocess_Popen_cfggen(cmd, *args, **kwargs):
+# Mimics the ConfigDB snapshot read, i.e. `sonic-cfggen -d --print-data` output
+def get_config_db_snapshot(scope=None):
     global running_config
 
-    stdout = kwargs.get('stdout', None)
-
-    if stdout is None:
-        output = json.dumps(running_config, indent=4)
-    elif isinstance(stdout, int) and stdout == -1:
-        output = json.dumps(running_config, indent=4)
-    else:
-        raise ValueError("stdout must be set to subprocess.PIPE or omitted for capturing output")
-
-    class MockPopen:
-        def __init__(self):
-            self.returncode = 0
-
-        def communicate(self):
-            return output.encode(), "".encode()
-
-    return MockPopen()
+    return copy.deepcopy(running_config)
 
 
 # mimics config_db.set_entry
@@ -222,14 +207,14 @@ def vlan_validate(old_cfg, new_cfg, keys):
 
 class TestChangeApplier(unittest.TestCase):
 
-    @patch("generic_config_updater.gu_common.subprocess.Popen")
+    @patch("generic_config_updater.gu_common.get_config_db_snapshot")
     @patch("generic_config_updater.change_applier.get_config_db")
     @patch("generic_config_updater.change_applier.set_config")
-    def test_change_apply(self, mock_set, mock_db, mock_subprocess_Popen):
+    def test_change_apply(self, mock_set, mock_db, mock_get_snapshot):
         global read_data, running_config, json_changes, json_change_index
         global start_running_config
 
-        mock_subprocess_Popen.side_effect = subprocess_Popen_cfggen
+        mock_get_snapshot.side_effect = get_config_db_snapshot
         mock_db.return_value = DB_HANDLE
         mock_set.side_effect = set_entry
 
@@ -282,6 +267,110 @@ class TestChangeApplier(unittest.TestCase):
         debug_print("all good for applier")
 
 
+# mimics a pipelined config_db.mod_config
+#
+def mod_config(config_db, data):
+    assert config_db == PIPE_HANDLE
+    for tbl in data:
+        for key in data[tbl]:
+            set_entry(DB_HANDLE, tbl, key, data[tbl][key])
+
+
+# mimics reading a few tables from config_db
+#
+def get_tables(config_db, tables):
+    assert config_db == DB_HANDLE
+    return {tbl: copy.deepcopy(running_config[tbl]) for tbl in tables if tbl in running_config}
+
+
+class TestBatchedChangeApplier(unittest.TestCase):
+
+    @patch("generic_config_updater.gu_common.get_config_db_snapshot")
+    @patch("generic_config_updater.change_applier.get_config_db")
+    @patch("generic_config_updater.change_applier.get_config_db_pipe")
+    @patch("generic_config_updater.change_applier.set_config")
+    @patch("generic_config_updater.change_applier.mod_config")
+    @patch("generic_config_updater.change_applier.get_tables")
+    def test_change_apply__batch_writes__running_config_read_once(self, mock_get_tables, mock_mod, mock_set,
+                                                                  mock_pipe, mock_db, mock_get_snapshot):
+        global read_data, running_config, json_changes, json_change_index
+        global start_running_config
+
+        # Arrange
+        mock_get_snapshot.side_effect = get_config_db_snapshot
+        mock_db.return_value = DB_HANDLE
+        mock_pipe.return_value = PIPE_HANDLE
+        mock_set.side_effect = set_entry
+        mock_mod.side_effect = mod_config
+        mock_get_tables.side_effect = get_tables
+
+        with open(DATA_FILE, "r") as s:
+            read_data = json.load(s)
+
+        running_config = copy.deepcopy(read_data["running_data"])
+        json_changes = copy.deepcopy(read_data["json_changes"])
+
+        generic_config_updater.change_applier.ChangeApplier.updater_conf = None
+        generic_config_updater.change_applier.UPDATER_CONF_FILE = CONF_FILE
+
+        applier = generic_config_updater.change_applier.ChangeApplier(batch_writes=True)
+
+        for i in range(len(json_changes)):
+            json_change_index = i
+            start_running_config = copy.deepcopy(running_config)
+
+            # Act
+            ret = applier.apply(mock_obj())
+
+            # Assert
+            self.assertFalse(ret)
+            self.assertFalse(json_changes[i]["update"])
+            self.assertFalse(json_changes[i]["remove"])
+            self.assertFalse(json_changes[i].get("services_validated", []))
+
+        self.assertEqual(read_data["running_data"], running_config)
+        self.assertEqual(applier.running_config, running_config)
+        self.assertEqual(1, mock_get_snapshot.call_count)
+        self.assertTrue(mock_mod.called)
+
+    @patch("generic_config_updater.change_applier.get_config_db_as_json")
+    @patch("generic_config_updater.change_applier.get_config_db")
+    @patch("generic_config_updater.change_applier.get_config_db_pipe")
+    @patch("generic_config_updater.change_applier.set_config")
+    @patch("generic_config_updater.change_applier.mod_config")
+    @patch("generic_config_updater.change_applier.get_tables")
+    def test_apply__batch_writes_fields_removed__set_entry_used_for_key(self, mock_get_tables, mock_mod, mock_set,
+                                                                         mock_pipe, mock_db, mock_get_config):
+        # Arrange
+        mock_db.return_value = DB_HANDLE
+        mock_pipe.return_value = PIPE_HANDLE
+        mock_get_config.return_value = {
+            "PORT": {"Ethernet0": {"mtu": "9100", "description": "uplink"}},
+            "VLAN": {"Vlan1000": {"vlanid": "1000"}}
+        }
+        expected = {
+            "PORT": {"Ethernet0": {"mtu": "9100"}},
+            "VLAN": {"Vlan1000": {"vlanid": "1000"}, "Vlan1001": {"vlanid": "1001"}}
+        }
+        mock_get_tables.side_effect = [
+            {"PORT": mock_get_config.return_value["PORT"], "VLAN": mock_get_config.return_value["VLAN"]},
+            expected
+        ]
+        change = Mock()
+        change.apply.return_value = copy.deepcopy(expected)
+        generic_config_updater.change_applier.ChangeApplier.updater_conf = {"tables": {}, "services": {}}
+        applier = generic_config_updater.change_applier.ChangeApplier(batch_writes=True)
+
+        # Act
+        ret = applier.apply(change)
+
+        # Assert
+        self.assertFalse(ret)
+        mock_set.assert_called_once_with(DB_HANDLE, "PORT", "Ethernet0", {"mtu": "9100"})
+        mock_mod.assert_called_once_with(PIPE_HANDLE, {"VLAN": {"Vlan1001": {"vlanid": "1001"}}})
+        self.assertEqual(expected, applier.running_config)
+
+
 class TestDryRunChangeApplier(unittest.TestCase):
     def test_apply__calls_apply_change_to_config_db(self):
         # Arrange
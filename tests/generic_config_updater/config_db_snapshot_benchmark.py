@@ -0,0 +1,41 @@
+"""
+Reading of the running config through the sonic-cfggen subprocess vs the in-process snapshot reader, on a
+device with a running ConfigDB:
+    python -m tests.generic_config_updater.config_db_snapshot_benchmark [namespace]
+
+Both readers are expected to return the same config, which is checked before the timings are printed.
+"""
+import json
+import sys
+import time
+
+from generic_config_updater.gu_common import get_config_db_as_text, get_config_db_snapshot
+
+ITERATIONS = 10
+
+def read_with_cfggen(scope):
+    config = json.loads(get_config_db_as_text(scope))
+    config.pop("bgpraw", None)
+    return config
+
+def time_reads(read_fn, scope):
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        config = read_fn(scope)
+    elapsed = (time.perf_counter() - start) / ITERATIONS
+    return elapsed, config
+
+def main():
+    scope = sys.argv[1] if len(sys.argv) > 1 else None
+
+    cfggen_time, cfggen_config = time_reads(read_with_cfggen, scope)
+    snapshot_time, snapshot_config = time_reads(get_config_db_snapshot, scope)
+    assert cfggen_config == snapshot_config, "The snapshot reader returned a different config than sonic-cfggen"
+
+    keys_count = sum(len(entries) for entries in snapshot_config.values())
+    print(f"Reading {len(snapshot_config)} tables, {keys_count} keys, average of {ITERATIONS} reads")
+    print(f"{'sonic-cfggen (ms)':>18} {'snapshot (ms)':>14} {'speedup':>8}")
+    print(f"{cfggen_time * 1000:>18.1f} {snapshot_time * 1000:>14.1f} {cfggen_time / snapshot_time:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
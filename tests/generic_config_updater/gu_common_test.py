@@ -1,7 +1,10 @@
 import copy
 import json
 import jsonpatch
+import os
 import sonic_yang
+import tempfile
+import threading
 import unittest
 import mock
 
@@ -10,15 +13,43 @@ from mock import patch
 from .gutest_helpers import create_side_effect_dict, Files
 import generic_config_updater.gu_common as gu_common
 
+class TestGetConfigDbSnapshot(unittest.TestCase):
+    @patch('generic_config_updater.gu_common.ConfigDBPipeConnector')
+    def test_get_config_db_snapshot__multi_part_keys__keys_serialized(self, mock_connector):
+        # Arrange
+        config_db = mock_connector.return_value
+        config_db.get_config.return_value = {
+            "PORT": {"Ethernet0": {"mtu": "9100"}},
+            "VLAN_MEMBER": {("Vlan1000", "Ethernet0"): {"tagging_mode": "untagged"}},
+            "bgpraw": {}
+        }
+        config_db.serialize_key.side_effect = lambda key: "|".join(key) if isinstance(key, tuple) else key
+        expected = {
+            "PORT": {"Ethernet0": {"mtu": "9100"}},
+            "VLAN_MEMBER": {"Vlan1000|Ethernet0": {"tagging_mode": "untagged"}}
+        }
+
+        # Act
+        actual = gu_common.get_config_db_snapshot(scope="asic0")
+
+        # Assert
+        self.assertDictEqual(expected, actual)
+        mock_connector.assert_called_once_with(use_unix_socket_path=True, namespace="asic0")
+        config_db.connect.assert_called_once()
+
+    @patch('generic_config_updater.gu_common.ConfigDBPipeConnector')
+    def test_get_config_db_snapshot__read_fails__raises_error(self, mock_connector):
+        # Arrange
+        mock_connector.return_value.get_config.side_effect = RuntimeError("connection refused")
+
+        # Act and Assert
+        self.assertRaises(gu_common.GenericConfigUpdaterError, gu_common.get_config_db_snapshot)
+
 class TestDryRunConfigWrapper(unittest.TestCase):
-    @patch('generic_config_updater.gu_common.subprocess.Popen')
-    def test_get_config_db_as_json(self, mock_popen):
+    @patch('generic_config_updater.gu_common.ConfigDBPipeConnector')
+    def test_get_config_db_as_json(self, mock_connector):
         config_wrapper = gu_common.DryRunConfigWrapper()
-        mock_proc = MagicMock()
-        mock_proc.communicate = MagicMock(
-            return_value=('{"PORT": {}, "bgpraw": ""}', None))
-        mock_proc.returncode = 0
-        mock_popen.return_value = mock_proc
+        mock_connector.return_value.get_config.return_value = {"PORT": {}}
         actual = config_wrapper.get_config_db_as_json()
         expected = {"PORT": {}}
         self.assertDictEqual(actual, expected)
@@ -66,6 +97,92 @@ class TestDryRunConfigWrapper(unittest.TestCase):
             # Assert
             self.assertDictEqual(expected, actual)
 
+class TestYangModelsIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.yang_dir = os.path.join(self.tmp_dir.name, "yang-models")
+        os.makedirs(self.yang_dir)
+        self.write_yang_file("sonic-port.yang", "module sonic-port {}")
+        self.index = gu_common.YangModelsIndex(self.yang_dir, os.path.join(self.tmp_dir.name, "cache", "index.json"))
+        self.tables_references = {"PORT": set(), "VLAN_MEMBER": {"PORT", "VLAN"}}
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_yang_file(self, name, content):
+        with open(os.path.join(self.yang_dir, name), "w") as fh:
+            fh.write(content)
+
+    def test_load__no_index__returns_none(self):
+        self.assertIsNone(self.index.load())
+
+    def test_load__index_saved__returns_tables_references(self):
+        # Act
+        self.index.save(self.tables_references)
+
+        # Assert
+        self.assertEqual(self.tables_references, self.index.load())
+
+    def test_load__yang_file_added__returns_none(self):
+        # Arrange
+        self.index.save(self.tables_references)
+
+        # Act
+        self.write_yang_file("sonic-vlan.yang", "module sonic-vlan {}")
+
+        # Assert
+        self.assertIsNone(self.index.load())
+
+    def test_load__yang_file_modified__returns_none(self):
+        # Arrange
+        self.index.save(self.tables_references)
+
+        # Act
+        self.write_yang_file("sonic-port.yang", "module sonic-port { container sonic-port {} }")
+
+        # Assert
+        self.assertIsNone(self.index.load())
+
+    def test_save__index_saved__no_temporary_file_left(self):
+        # Act
+        self.index.save(self.tables_references)
+
+        # Assert
+        self.assertEqual(["index.json"], os.listdir(os.path.dirname(self.index.index_file)))
+
+    def test_load__index_is_symlink__returns_none(self):
+        # Arrange
+        other_index_file = os.path.join(self.tmp_dir.name, "other_index.json")
+        gu_common.YangModelsIndex(self.yang_dir, other_index_file).save(self.tables_references)
+        os.makedirs(os.path.dirname(self.index.index_file))
+        os.symlink(other_index_file, self.index.index_file)
+
+        # Act and assert
+        self.assertIsNone(self.index.load())
+
+    def test_get_index_file__no_index_file__user_cache_used(self):
+        # Arrange
+        index = gu_common.YangModelsIndex(self.yang_dir)
+
+        # Act
+        with patch("generic_config_updater.gu_common.UserCache") as mock_user_cache:
+            mock_user_cache.return_value.get_directory.return_value = self.tmp_dir.name
+            index_file = index.get_index_file()
+
+        # Assert
+        mock_user_cache.assert_called_once_with(app_name="generic_config_updater")
+        self.assertEqual(os.path.join(self.tmp_dir.name, gu_common.YANG_MODELS_INDEX_FILE_NAME), index_file)
+
+    def test_save__yang_dir_does_not_exist__index_not_saved(self):
+        # Arrange
+        index = gu_common.YangModelsIndex(os.path.join(self.tmp_dir.name, "missing"), self.index.index_file)
+
+        # Act
+        index.save(self.tables_references)
+
+        # Assert
+        self.assertFalse(os.path.exists(self.index.index_file))
+
 class TestConfigWrapper(unittest.TestCase):
     def setUp(self):
         self.config_wrapper_mock = gu_common.ConfigWrapper()
@@ -131,6 +248,19 @@ class TestConfigWrapper(unittest.TestCase):
         # Assert
         self.assertDictEqual(expected, actual)
 
+    def test_get_tables_references__returns_referenced_tables(self):
+        # Arrange
+        config_wrapper = gu_common.ConfigWrapper()
+
+        # Act
+        actual = config_wrapper.get_tables_references()
+
+        # Assert
+        self.assertIn("VLAN", actual["VLAN_MEMBER"])
+        self.assertIn("PORT", actual["VLAN_MEMBER"])
+        self.assertNotIn("VLAN_MEMBER", actual["VLAN_MEMBER"])
+        self.assertNotIn("VLAN_MEMBER", actual["PORT"])
+
     def test_convert_sonic_yang_to_config_db__empty_sonic_yang__returns_empty_config_db(self):
         # Arrange
         config_wrapper = gu_common.ConfigWrapper()
@@ -494,6 +624,35 @@ class TestConfigWrapper(unittest.TestCase):
         check(sy1, config_wrapper.sonic_yang_with_loaded_models)
         check(sy2, config_wrapper.sonic_yang_with_loaded_models)
 
+    def test_create_sonic_yang_with_loaded_models__multiple_config_wrappers__models_loaded_once(self):
+        # Arrange
+        config_wrapper1 = gu_common.ConfigWrapper()
+        config_wrapper2 = gu_common.ConfigWrapper(scope="asic0")
+
+        # Act
+        sy1 = config_wrapper1.create_sonic_yang_with_loaded_models()
+        sy2 = config_wrapper2.create_sonic_yang_with_loaded_models()
+
+        # Assert
+        self.assertIs(config_wrapper1.sonic_yang_with_loaded_models, config_wrapper2.sonic_yang_with_loaded_models)
+        self.assertIsNot(sy1, sy2)
+        self.assertIs(sy1.ctx, sy2.ctx)
+
+    def test_create_sonic_yang_with_loaded_models__other_thread__models_loaded_per_thread(self):
+        # Arrange
+        config_wrapper = gu_common.ConfigWrapper()
+        sy1 = config_wrapper.create_sonic_yang_with_loaded_models()
+        thread_sys = []
+
+        # Act
+        thread = threading.Thread(target=lambda: thread_sys.append(config_wrapper.create_sonic_yang_with_loaded_models()))
+        thread.start()
+        thread.join()
+
+        # Assert
+        self.assertIsNot(sy1.ctx, thread_sys[0].ctx)
+        self.assertIs(sy1.ctx, config_wrapper.create_sonic_yang_with_loaded_models().ctx)
+
 class TestPatchWrapper(unittest.TestCase):
     def setUp(self):
         self.config_wrapper_mock = gu_common.ConfigWrapper()
@@ -785,6 +944,57 @@ class TestPathAddressing(unittest.TestCase):
         # Assert
         self.assertEqual(expected, actual)
 
+    def test_find_ref_paths__same_config_queried_multiple_times__config_loaded_once(self):
+        # Arrange
+        config = Files.CROPPED_CONFIG_DB_AS_JSON
+        expected = [
+            "/VLAN_MEMBER/Vlan1000|Ethernet0",
+            "/VLAN_MEMBER/Vlan1000|Ethernet4",
+            "/VLAN_MEMBER/Vlan1000|Ethernet8",
+        ]
+
+        with patch.object(self.path_addressing, "_create_sonic_yang_with_loaded_models",
+                          wraps=self.path_addressing._create_sonic_yang_with_loaded_models) as create_sy:
+            # Act
+            self.path_addressing.find_ref_paths("/PORT/Ethernet0", config)
+            actual = self.path_addressing.find_ref_paths("/VLAN/Vlan1000", config)
+
+            # Assert
+            self.assertEqual(expected, actual)
+            create_sy.assert_called_once()
+
+    def test_find_ref_paths__config_with_removed_keys__derived_from_indexed_config(self):
+        # Arrange
+        config = Files.CROPPED_CONFIG_DB_AS_JSON
+        self.path_addressing.find_ref_paths("/PORT/Ethernet0", config)
+
+        derived_config = dict(config)
+        derived_config["VLAN_MEMBER"] = dict(config["VLAN_MEMBER"])
+        del derived_config["VLAN_MEMBER"]["Vlan1000|Ethernet0"]
+        del derived_config["ACL_TABLE"]
+
+        expected = gu_common.PathAddressing(gu_common.ConfigWrapper()).find_ref_paths("/PORT", derived_config)
+
+        with patch.object(self.path_addressing, "_create_sonic_yang_with_loaded_models") as create_sy:
+            # Act
+            actual = self.path_addressing.find_ref_paths("/PORT", derived_config)
+
+            # Assert
+            self.assertEqual(expected, actual)
+            self.assertEqual(["/VLAN_MEMBER/Vlan1000|Ethernet4", "/VLAN_MEMBER/Vlan1000|Ethernet8"], actual)
+            create_sy.assert_not_called()
+
+    def test_get_removed_paths__keys_added__returns_none(self):
+        # Arrange
+        config = Files.CROPPED_CONFIG_DB_AS_JSON
+        self.path_addressing.find_ref_paths("/PORT/Ethernet0", config)
+
+        derived_config = dict(config)
+        derived_config["VLAN_MEMBER"] = dict(config["VLAN_MEMBER"])
+        derived_config["VLAN_MEMBER"]["Vlan1000|Ethernet12"] = {"tagging_mode": "untagged"}
+
+        self.assertIsNone(self.path_addressing._get_removed_paths(config, derived_config))
+
     def test_find_ref_paths__ref_is_a_part_of_key__returns_ref_paths(self):
         # Arrange
         path = "/VLAN/Vlan1000"
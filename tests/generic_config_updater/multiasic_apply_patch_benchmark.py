@@ -0,0 +1,72 @@
+"""
+'config apply-patch --parallel' on a mocked multi-ASIC device, with the per-ASIC updates run serially, in
+threads and in processes, as the number of ASICs grows.
+    python -m tests.generic_config_updater.multiasic_apply_patch_benchmark
+
+GenericUpdater is replaced by a fake sorting a patch over a synthetic config of each ASIC, which is the CPU-bound
+part of applying a patch, so no database is needed. The fake is installed before the worker processes are forked.
+"""
+import concurrent.futures
+import time
+
+import config.main as config_main
+import generic_config_updater.patch_sorter as ps
+from generic_config_updater.generic_updater import ConfigFormat
+from . import patch_sorter_benchmark
+
+ASIC_COUNTS = [1, 2, 4, 6]
+CONFIG_KEYS = 10000
+
+class FakeGenericUpdater:
+    def __init__(self, scope):
+        self.scope = scope
+
+    def apply_patch(self, patch, config_format, verbose, dry_run, ignore_non_yang_tables, ignore_path):
+        current_config = patch_sorter_benchmark.create_config(CONFIG_KEYS)
+        target_config = patch_sorter_benchmark.create_target_config(current_config, patch_sorter_benchmark.PATCH_SIZE)
+        patch_sorter_benchmark.time_sort(ps.Diff, current_config, target_config)
+
+def create_changes_by_scope(asic_count):
+    changes_by_scope = {"": []}
+    for asic in range(asic_count):
+        changes_by_scope[f"asic{asic}"] = []
+    return changes_by_scope
+
+def apply_serially(changes_by_scope, results):
+    for scope_changes in changes_by_scope.items():
+        config_main.apply_patch_for_scope(scope_changes, results, ConfigFormat.CONFIGDB, False, False, False, ())
+
+def apply_in_threads(changes_by_scope, results):
+    with concurrent.futures.ThreadPoolExecutor() as executor:
+        futures = [executor.submit(config_main.apply_patch_for_scope, scope_changes, results, ConfigFormat.CONFIGDB,
+                                   False, False, False, ()) for scope_changes in changes_by_scope.items()]
+        concurrent.futures.wait(futures)
+
+def apply_in_processes(changes_by_scope, results):
+    config_main.apply_patch_in_processes(changes_by_scope, results, ConfigFormat.CONFIGDB, False, False, False, ())
+
+def time_apply(apply_fn, changes_by_scope):
+    results = {}
+    start = time.perf_counter()
+    apply_fn(changes_by_scope, results)
+    elapsed = time.perf_counter() - start
+    assert len(results) == len(changes_by_scope) and all(result["success"] for result in results.values())
+    return elapsed
+
+def main():
+    config_main.GenericUpdater = FakeGenericUpdater
+    # The YANG models are not needed by the fake updater
+    config_main.init_apply_patch_worker = lambda: None
+
+    print(f"Applying a patch on the host and each ASIC, {CONFIG_KEYS} config keys per ASIC")
+    print(f"{'asics':>6} {'serial (s)':>11} {'threads (s)':>12} {'processes (s)':>14} {'speedup':>8}")
+    for asic_count in ASIC_COUNTS:
+        changes_by_scope = create_changes_by_scope(asic_count)
+        serial_time = time_apply(apply_serially, changes_by_scope)
+        threads_time = time_apply(apply_in_threads, changes_by_scope)
+        processes_time = time_apply(apply_in_processes, changes_by_scope)
+        print(f"{asic_count:>6} {serial_time:>11.2f} {threads_time:>12.2f} {processes_time:>14.2f} "
+              f"{serial_time / processes_time:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -164,4 +164,4 @@ class TestMultiAsicPatchApplier(unittest.TestCase):
         patch_applier.apply(patch_data)
 
         # Assertions to ensure the namespace is correctly used in underlying calls
-        mock_ChangeApplier.assert_called_once_with(scope=scope)
+        mock_ChangeApplier.assert_called_once_with(scope=scope, batch_writes=True)
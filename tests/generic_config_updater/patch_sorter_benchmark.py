@@ -0,0 +1,114 @@
+"""
+Exploration cost of the patch sorter as a function of the ConfigDB size.
+    python -m tests.generic_config_updater.patch_sorter_benchmark
+
+The sorting is done using the move generators and the validators that do not require YANG models, so
+the numbers reflect the cost of the Diff handling (hashing, simulating moves) rather than YANG validation.
+The legacy Diff implementation is reproduced below to compare against.
+
+A second comparison runs the DFS and the A* sorters on a synthetic 'config replace' scenario, where the target
+config modifies, adds and removes keys across several tables. The A* sorter expands the whole move set of a diff,
+so its search time is higher than DFS stopping at the first valid move, but each resulting move is applied to
+ConfigDB separately, so the number of moves dominates the total time of a replace.
+"""
+import copy
+import json
+import time
+
+import generic_config_updater.patch_sorter as ps
+from generic_config_updater.gu_common import PathAddressing
+
+CONFIG_SIZES = [1000, 5000, 10000, 40000]
+PATCH_SIZE = 50
+
+class LegacyDiff(ps.Diff):
+    """
+    The Diff behavior before hashes were maintained incrementally: re-serializing both configs on every
+    hash, comparing both configs on every check and deep-copying the whole config on every move.
+    """
+    def __hash__(self):
+        cc = json.dumps(self.current_config, sort_keys=True)
+        tc = json.dumps(self.target_config, sort_keys=True)
+        return hash((cc, tc))
+
+    def apply_move(self, move):
+        new_current_config = move.patch.apply(self.current_config)
+        return LegacyDiff(new_current_config, self.target_config)
+
+    def has_no_diff(self):
+        return self.current_config == self.target_config
+
+def create_config(keys_count):
+    """Creates a config of roughly keys_count fields spread over PORT/VLAN/VLAN_MEMBER tables."""
+    ports_count = keys_count // 5
+    config = {
+        "PORT": {},
+        "VLAN": {"Vlan1000": {"vlanid": "1000"}},
+        "VLAN_MEMBER": {},
+    }
+    for i in range(ports_count):
+        port = f"Ethernet{i}"
+        config["PORT"][port] = {"alias": f"etp{i}", "lanes": str(i), "mtu": "9100", "speed": "100000"}
+        config["VLAN_MEMBER"][f"Vlan1000|{port}"] = {"tagging_mode": "untagged"}
+    return config
+
+def create_target_config(config, patch_size):
+    target_config = copy.deepcopy(config)
+    for i in range(patch_size):
+        target_config["PORT"][f"Ethernet{i}"]["mtu"] = "1500"
+    return target_config
+
+def create_replace_target_config(config, changes_count):
+    target_config = copy.deepcopy(config)
+    for i in range(changes_count):
+        target_config["PORT"][f"Ethernet{i}"]["mtu"] = "1500"
+        target_config["VLAN_MEMBER"].pop(f"Vlan1000|Ethernet{i}")
+        target_config["VLAN"][f"Vlan{2000 + i}"] = {"vlanid": str(2000 + i)}
+    return target_config
+
+def create_move_wrapper():
+    path_addressing = PathAddressing()
+    move_wrapper = ps.MoveWrapper(move_generators=[ps.LowLevelMoveGenerator(path_addressing)],
+                                  move_non_extendable_generators=[ps.KeyLevelMoveGenerator()],
+                                  move_extenders=[ps.UpperLevelMoveExtender(),
+                                                  ps.DeleteInsteadOfReplaceMoveExtender()],
+                                  move_validators=[ps.DeleteWholeConfigMoveValidator(),
+                                                   ps.NoEmptyTableMoveValidator(path_addressing)])
+    return move_wrapper
+
+def time_sort(diff_type, current_config, target_config, sorter_type=ps.DfsSorter):
+    sorter = sorter_type(create_move_wrapper())
+    diff = diff_type(current_config, target_config)
+    start = time.perf_counter()
+    moves = sorter.sort(diff)
+    elapsed = time.perf_counter() - start
+    return elapsed, len(moves)
+
+def main():
+    print(f"Sorting a patch of {PATCH_SIZE} field replacements")
+    print(f"{'config keys':>12} {'legacy (s)':>12} {'incremental (s)':>16} {'speedup':>8}")
+    for keys_count in CONFIG_SIZES:
+        current_config = create_config(keys_count)
+        target_config = create_target_config(current_config, PATCH_SIZE)
+
+        legacy_time, legacy_moves = time_sort(LegacyDiff, current_config, target_config)
+        incremental_time, incremental_moves = time_sort(ps.Diff, current_config, target_config)
+        assert legacy_moves == incremental_moves == PATCH_SIZE
+
+        print(f"{keys_count:>12} {legacy_time:>12.3f} {incremental_time:>16.3f} "
+              f"{legacy_time / incremental_time:>7.1f}x")
+
+    print()
+    print(f"Sorting a replace of {PATCH_SIZE} modified, {PATCH_SIZE} removed and {PATCH_SIZE} added keys")
+    print(f"{'config keys':>12} {'dfs (s)':>10} {'dfs moves':>10} {'a* (s)':>10} {'a* moves':>10}")
+    for keys_count in CONFIG_SIZES:
+        current_config = create_config(keys_count)
+        target_config = create_replace_target_config(current_config, PATCH_SIZE)
+
+        dfs_time, dfs_moves = time_sort(ps.Diff, current_config, target_config, ps.DfsSorter)
+        astar_time, astar_moves = time_sort(ps.Diff, current_config, target_config, ps.AStarSorter)
+
+        print(f"{keys_count:>12} {dfs_time:>10.3f} {dfs_moves:>10} {astar_time:>10.3f} {astar_moves:>10}")
+
+if __name__ == "__main__":
+    main()
@@ -108,6 +108,68 @@ class TestDiff(unittest.TestCase):
         self.assertEqual(diff, other_diff)
         self.assertTrue(diff == other_diff)
 
+    def test_apply_move__original_diff_not_modified(self):
+        # Arrange
+        current_config = {"VLAN": {"Vlan1000": {"vlanid": "1000"}}, "PORT": {"Ethernet0": {"mtu": "9100"}}}
+        diff = ps.Diff(current_config, Files.ANY_CONFIG_DB)
+        move = ps.JsonMove.from_operation({"op": "remove", "path": "/VLAN/Vlan1000"})
+
+        # Act
+        actual = diff.apply_move(move)
+
+        # Assert
+        self.assertEqual({"VLAN": {"Vlan1000": {"vlanid": "1000"}}, "PORT": {"Ethernet0": {"mtu": "9100"}}},
+                         diff.current_config)
+        self.assertEqual({"VLAN": {}, "PORT": {"Ethernet0": {"mtu": "9100"}}}, actual.current_config)
+        # untouched tables are shared instead of copied
+        self.assertIs(diff.current_config["PORT"], actual.current_config["PORT"])
+
+    def test_apply_move__hash_computed__hash_updated_incrementally(self):
+        test_cases = [
+            {"op": "add", "path": "/PORT/Ethernet0/mtu", "value": "1500"},
+            {"op": "add", "path": "/ACL_TABLE", "value": {"EVERFLOW": {"ports": ["Ethernet0"]}}},
+            {"op": "add", "path": "/ACL_TABLE/NO-NSW-PACL-V4/ports/0", "value": "Ethernet8"},
+            {"op": "add", "path": "/ACL_TABLE/NO-NSW-PACL-V4/ports/-", "value": "Ethernet8"},
+            {"op": "remove", "path": "/ACL_TABLE/NO-NSW-PACL-V4/ports/0"},
+            {"op": "remove", "path": "/VLAN_MEMBER"},
+            {"op": "replace", "path": "/PORT/Ethernet0", "value": {"alias": "Eth0"}},
+            {"op": "replace", "path": "", "value": {"PORT": {}}},
+        ]
+        for operation in test_cases:
+            with self.subTest(name=str(operation)):
+                # Arrange
+                diff = ps.Diff(Files.CROPPED_CONFIG_DB_AS_JSON, Files.ANY_CONFIG_DB)
+                hash(diff)
+                move = ps.JsonMove.from_operation(operation)
+                expected = ps.Diff(jsonpatch.JsonPatch([operation]).apply(Files.CROPPED_CONFIG_DB_AS_JSON),
+                                   Files.ANY_CONFIG_DB)
+
+                # Act
+                actual = diff.apply_move(move)
+
+                # Assert
+                self.assertEqual(expected.current_config, actual.current_config)
+                self.assertEqual(hash(expected), hash(actual))
+
+    def test_has_no_diff__moves_applied_until_no_diff__returns_true(self):
+        # Arrange
+        current_config = {"PORT": {"Ethernet0": {"mtu": "9100"}}}
+        target_config = {"PORT": {"Ethernet0": {"mtu": "1500", "alias": "Eth0"}}}
+        diff = ps.Diff(current_config, target_config)
+        hash(diff)
+
+        # Act
+        diff = diff.apply_move(ps.JsonMove.from_operation(
+            {"op": "replace", "path": "/PORT/Ethernet0/mtu", "value": "1500"}))
+        has_no_diff_after_first_move = diff.has_no_diff()
+        diff = diff.apply_move(ps.JsonMove.from_operation(
+            {"op": "add", "path": "/PORT/Ethernet0/alias", "value": "Eth0"}))
+
+        # Assert
+        self.assertFalse(has_no_diff_after_first_move)
+        self.assertTrue(diff.has_no_diff())
+        self.assertEqual(hash(ps.Diff(target_config, target_config)), hash(diff))
+
 class TestJsonMove(unittest.TestCase):
     def setUp(self):
         self.operation_wrapper = OperationWrapper()
@@ -412,6 +474,29 @@ class TestJsonMove(unittest.TestCase):
                              tokens,
                              jsonmove)
 
+    def test_apply__path_does_not_exist__failure(self):
+        # Arrange
+        config = {"table1": {"key1": "value1"}}
+        jsonmove = ps.JsonMove.from_operation({"op": "remove", "path": "/table2/key1"})
+
+        # Act and assert
+        self.assertRaises(jsonpatch.JsonPointerException, jsonmove.apply, config)
+        self.assertEqual({"table1": {"key1": "value1"}}, config)
+
+    def test_apply__nested_list_path__only_containers_along_path_copied(self):
+        # Arrange
+        config = {"table1": {"key1": {"list1": ["value1", "value2"]}}, "table2": {"key2": "value2"}}
+        jsonmove = ps.JsonMove.from_operation({"op": "add", "path": "/table1/key1/list1/1", "value": "value3"})
+
+        # Act
+        actual = jsonmove.apply(config)
+
+        # Assert
+        self.assertEqual({"table1": {"key1": {"list1": ["value1", "value3", "value2"]}}, "table2": {"key2": "value2"}},
+                         actual)
+        self.assertEqual(["value1", "value2"], config["table1"]["key1"]["list1"])
+        self.assertIs(config["table2"], actual["table2"])
+
     def verify_jsonmove(self,
                         expected_operation,
                         expected_op_type,
@@ -933,6 +1018,77 @@ class TestFullConfigMoveValidator(unittest.TestCase):
         # Act and assert
         self.assertTrue(validator.validate(self.any_move, self.any_diff))
 
+    def test_validate__same_simulated_config__validated_once(self):
+        # Arrange
+        config_wrapper = Mock()
+        config_wrapper.validate_config_db_config.return_value = (True, None)
+        validator = ps.FullConfigMoveValidator(config_wrapper)
+        diff = ps.Diff({"VLAN": {"Vlan1000": {}}}, {})
+        move = ps.JsonMove.from_operation({"op": "add", "path": "/VLAN/Vlan1000/vlanid", "value": "1000"})
+        other_move = ps.JsonMove.from_operation({"op": "add", "path": "/VLAN/Vlan1000", "value": {"vlanid": "1000"}})
+
+        # Act
+        first_result = validator.validate(move, diff)
+        second_result = validator.validate(other_move, diff)
+
+        # Assert
+        self.assertTrue(first_result)
+        self.assertTrue(second_result)
+        config_wrapper.validate_config_db_config.assert_called_once_with({"VLAN": {"Vlan1000": {"vlanid": "1000"}}})
+
+    def test_validate__delta_validation__only_affected_tables_validated(self):
+        # Arrange
+        config_wrapper = Mock()
+        config_wrapper.validate_config_db_config.return_value = (True, None)
+        config_wrapper.get_tables_references.return_value = {
+            "PORT": set(),
+            "VLAN": set(),
+            "VLAN_MEMBER": {"VLAN", "PORT"},
+            "ACL_TABLE": {"PORT"},
+            "LOOPBACK_INTERFACE": set(),
+        }
+        current_config = {
+            "DEVICE_METADATA": {"localhost": {"hostname": "any"}},
+            "PORT": {"Ethernet0": {}},
+            "VLAN": {"Vlan1000": {}},
+            "VLAN_MEMBER": {"Vlan1000|Ethernet0": {}},
+            "ACL_TABLE": {"EVERFLOW": {"ports": ["Ethernet0"]}},
+            "LOOPBACK_INTERFACE": {"Loopback0": {}},
+        }
+        validator = ps.FullConfigMoveValidator(config_wrapper, delta_validation=True)
+        diff = ps.Diff(current_config, {})
+        move = ps.JsonMove.from_operation({"op": "add", "path": "/VLAN/Vlan1000/vlanid", "value": "1000"})
+
+        # Act
+        actual = validator.validate(move, diff)
+
+        # Assert
+        self.assertTrue(actual)
+        config_wrapper.validate_config_db_config.assert_called_with({
+            "DEVICE_METADATA": {"localhost": {"hostname": "any"}},
+            "PORT": {"Ethernet0": {}},
+            "VLAN": {"Vlan1000": {"vlanid": "1000"}},
+            "VLAN_MEMBER": {"Vlan1000|Ethernet0": {}},
+        })
+
+    def test_validate__delta_validation_current_config_invalid__full_config_validated(self):
+        # Arrange
+        config_wrapper = Mock()
+        config_wrapper.validate_config_db_config.side_effect = [(False, None), (True, None)]
+        config_wrapper.get_tables_references.return_value = {"PORT": set(), "VLAN": set()}
+        current_config = {"PORT": {"Ethernet0": {}}, "VLAN": {"Vlan1000": {}}}
+        validator = ps.FullConfigMoveValidator(config_wrapper, delta_validation=True)
+        diff = ps.Diff(current_config, {})
+        move = ps.JsonMove.from_operation({"op": "add", "path": "/VLAN/Vlan1000/vlanid", "value": "1000"})
+
+        # Act
+        actual = validator.validate(move, diff)
+
+        # Assert
+        self.assertTrue(actual)
+        config_wrapper.validate_config_db_config.assert_called_with(
+            {"PORT": {"Ethernet0": {}}, "VLAN": {"Vlan1000": {"vlanid": "1000"}}})
+
 class TestCreateOnlyMoveValidator(unittest.TestCase):
     def setUp(self):
         self.validator = ps.CreateOnlyMoveValidator(ps.PathAddressing())
@@ -2955,6 +3111,22 @@ class TestUpperLevelMoveExtender(unittest.TestCase):
         self.extender = ps.UpperLevelMoveExtender()
         self.any_diff = ps.Diff(Files.ANY_CONFIG_DB, Files.ANY_CONFIG_DB)
 
+    def test_extend__moves_with_same_parent_same_diff__parent_move_created_once(self):
+        # Arrange
+        diff = ps.Diff(Files.CROPPED_CONFIG_DB_AS_JSON, Files.CONFIG_DB_NO_DEPENDENCIES)
+        move1 = ps.JsonMove(diff, OperationType.REMOVE, ["VLAN", "Vlan1000", "dhcp_servers", 1])
+        move2 = ps.JsonMove(diff, OperationType.REMOVE, ["VLAN", "Vlan1000", "dhcp_servers", 0])
+
+        # Act
+        moves1 = list(self.extender.extend(move1, diff))
+        moves2 = list(self.extender.extend(move2, diff))
+        moves3 = list(self.extender.extend(move2, ps.Diff(diff.current_config, diff.target_config)))
+
+        # Assert
+        self.assertEqual(1, len(moves1))
+        self.assertListEqual([], moves2)
+        self.assertListEqual(moves1, moves3)
+
     def test_extend__root_level_move__no_extended_moves(self):
         self.verify(OperationType.REMOVE, [])
         self.verify(OperationType.ADD, [], [])
@@ -3245,6 +3417,110 @@ class DeleteRefsMoveExtender(unittest.TestCase):
         moves_ops = [list(move.patch)[0] for move in moves]
         self.assertCountEqual(ex_ops, moves_ops)
 
+class TestAStarSorter(unittest.TestCase):
+    def setUp(self):
+        path_addressing = PathAddressing()
+        self.move_wrapper = ps.MoveWrapper(move_generators=[ps.LowLevelMoveGenerator(path_addressing)],
+                                           move_non_extendable_generators=[ps.KeyLevelMoveGenerator()],
+                                           move_extenders=[ps.UpperLevelMoveExtender(),
+                                                           ps.DeleteInsteadOfReplaceMoveExtender()],
+                                           move_validators=[ps.DeleteWholeConfigMoveValidator(),
+                                                            ps.NoEmptyTableMoveValidator(path_addressing)])
+
+    def test_sort__no_diff__returns_empty_moves(self):
+        # Arrange
+        sorter = ps.AStarSorter(self.move_wrapper)
+        diff = ps.Diff(Files.CROPPED_CONFIG_DB_AS_JSON, Files.CROPPED_CONFIG_DB_AS_JSON)
+
+        # Act
+        moves = sorter.sort(diff)
+
+        # Assert
+        self.assertListEqual([], moves)
+
+    def test_sort__keys_replaced__moves_reach_target_config(self):
+        # Arrange
+        sorter = ps.AStarSorter(self.move_wrapper)
+        current_config = {
+            "PORT": {
+                "Ethernet0": {"mtu": "9100", "speed": "100000"},
+                "Ethernet4": {"mtu": "9100", "speed": "100000"}
+            },
+            "VLAN": {"Vlan1000": {"vlanid": "1000"}}
+        }
+        target_config = {
+            "PORT": {
+                "Ethernet0": {"mtu": "1500", "speed": "100000"},
+                "Ethernet4": {"mtu": "1500", "speed": "100000"}
+            },
+            "VLAN": {"Vlan1000": {"vlanid": "1000"}, "Vlan1001": {"vlanid": "1001"}}
+        }
+        diff = ps.Diff(current_config, target_config)
+
+        dfs_moves = ps.DfsSorter(self.move_wrapper).sort(diff)
+
+        # Act
+        moves = sorter.sort(diff)
+
+        # Assert
+        self.assertLessEqual(len(moves), len(dfs_moves))
+        for move in moves:
+            diff = diff.apply_move(move)
+        self.assertTrue(diff.has_no_diff())
+
+    def test_sort__keys_replaced__moves_as_granular_as_dfs(self):
+        # Arrange
+        sorter = ps.AStarSorter(self.move_wrapper)
+        current_config = {
+            "PORT": {
+                "Ethernet0": {"mtu": "9100", "speed": "100000"},
+                "Ethernet4": {"mtu": "9100", "speed": "100000"}
+            },
+            "VLAN": {"Vlan1000": {"vlanid": "1000"}}
+        }
+        target_config = {
+            "PORT": {
+                "Ethernet0": {"mtu": "1500", "speed": "100000"},
+                "Ethernet4": {"mtu": "1500", "speed": "100000"}
+            },
+            "VLAN": {"Vlan1000": {"vlanid": "1000"}, "Vlan1001": {"vlanid": "1001"}}
+        }
+        diff = ps.Diff(current_config, target_config)
+        dfs_moves = ps.DfsSorter(self.move_wrapper).sort(diff)
+
+        # Act
+        moves = sorter.sort(diff)
+
+        # Assert
+        self.assertCountEqual([move.patch.patch for move in dfs_moves], [move.patch.patch for move in moves])
+        for move in moves:
+            self.assertNotIn(move.patch.patch[0]["path"], ["", "/PORT"])
+
+    def test_sort__search_budget_exhausted__returns_none(self):
+        # Arrange
+        sorter = ps.AStarSorter(self.move_wrapper, search_budget=0)
+        current_config = {"PORT": {"Ethernet0": {"mtu": "9100"}, "Ethernet4": {"mtu": "9100"}}}
+        target_config = {"PORT": {"Ethernet0": {"mtu": "1500"}, "Ethernet4": {"mtu": "1500"}}}
+
+        # Act
+        moves = sorter.sort(ps.Diff(current_config, target_config))
+
+        # Assert
+        self.assertIsNone(moves)
+        self.assertEqual(0, sorter.expanded_count)
+
+    def test_sort_algorithm_factory__search_budget__passed_to_sorter(self):
+        # Arrange
+        config_wrapper = ConfigWrapper()
+        factory = ps.SortAlgorithmFactory(OperationWrapper(), config_wrapper, PathAddressing(config_wrapper),
+                                          search_budget=5)
+
+        # Act
+        sorter = factory.create(ps.Algorithm.ASTAR)
+
+        # Assert
+        self.assertEqual(5, sorter.search_budget)
+
 class TestSortAlgorithmFactory(unittest.TestCase):
     def test_dfs_sorter(self):
         self.verify(ps.Algorithm.DFS, ps.DfsSorter)
@@ -3255,6 +3531,9 @@ class TestSortAlgorithmFactory(unittest.TestCase):
     def test_memoization_sorter(self):
         self.verify(ps.Algorithm.MEMOIZATION, ps.MemoizationSorter)
 
+    def test_astar_sorter(self):
+        self.verify(ps.Algorithm.ASTAR, ps.AStarSorter)
+
     def verify(self, algo, algo_class):
         # Arrange
         config_wrapper = ConfigWrapper()
@@ -194,6 +194,20 @@ class SwssSyncClient(mockredis.MockRedis):
         if self.decode_responses:
             return value.decode('utf-8')
 
+    # Patch mockredis/mockredis/client.py
+    # The official implementation does not support the mapping of the fields
+    # of redis-py 3.5+, used to set many fields of a hash at once
+    def hset(self, hashkey, attribute=None, value=None, mapping=None):
+        """Emulate hset."""
+        items = dict(mapping or {})
+        if attribute is not None:
+            items[attribute] = value
+        if not items:
+            raise redis.DataError("'hset' with no key value pairs")
+
+        return sum(super(SwssSyncClient, self).hset(hashkey, attribute, value)
+                   for attribute, value in items.items())
+
     # Patch mockredis/mockredis/client.py
     # The official implementation will filter out keys with a slash '/'
     # ref: https://github.com/locationlabs/mockredis/blob/master/mockredis/client.py
@@ -0,0 +1,61 @@
+import datetime
+from unittest import mock
+
+import pytest
+
+from utilities_common import netstat
+
+
+class TestWatchStats(object):
+    def test_watch_stats(self, capsys):
+        samples = iter([1, 3, 6])
+
+        def print_sample(new_sample, old_sample):
+            print("{} {}".format(new_sample, old_sample))
+
+        with mock.patch("utilities_common.netstat.time.sleep") as mock_sleep:
+            netstat.watch_stats(lambda: next(samples), print_sample, 2, count=3)
+
+        output = capsys.readouterr().out
+        assert output.count(netstat.WATCH_CLEAR_SCREEN) == 3
+        assert "Every 2s: " in output
+        assert "1 None\n" in output and "3 1\n" in output and "6 3\n" in output
+        # No wait after the last sample
+        assert mock_sleep.call_count == 2
+
+    def test_watch_stats_json(self, capsys):
+        samples = iter([{"Ethernet0": "1"}, {"Ethernet0": "2"}])
+        print_sample = mock.Mock()
+
+        def sample_as_json(new_sample, old_sample):
+            return {"new": new_sample["Ethernet0"], "old": old_sample and old_sample["Ethernet0"]}
+
+        with mock.patch("utilities_common.netstat.time.sleep"):
+            netstat.watch_stats(lambda: next(samples), print_sample, 1, count=2, sample_as_json=sample_as_json)
+
+        assert capsys.readouterr().out == '{"new":"1","old":null}\n{"new":"2","old":"1"}\n'
+        assert not print_sample.called
+
+    def test_watch_stats_interrupted(self, capsys):
+        with mock.patch("utilities_common.netstat.time.sleep", side_effect=KeyboardInterrupt):
+            netstat.watch_stats(lambda: 1, lambda new_sample, old_sample: print(new_sample), 1)
+
+        assert capsys.readouterr().out.count(netstat.WATCH_CLEAR_SCREEN) == 1
+
+    def test_json_line(self):
+        assert netstat.json_line({"b": [1, 2], "a": 1}) == '{"a":1,"b":[1,2]}'
+        assert netstat.json_line({"time": datetime.datetime(2024, 1, 2, 3, 4, 5)}) == '{"time":"2024-01-02T03:04:05"}'
+        with pytest.raises(TypeError):
+            netstat.json_line({"a": object()})
+
+    def test_table_as_dict(self):
+        table = [("Ethernet0", "U", "8"), ("Ethernet4", "D", "0")]
+        header = ("IFACE", "STATE", "RX_OK")
+        assert netstat.table_as_dict(table, header) == {"Ethernet0": {"STATE": "U", "RX_OK": "8"},
+                                                        "Ethernet4": {"STATE": "D", "RX_OK": "0"}}
+
+    def test_ns_rate(self):
+        assert netstat.ns_rate("30", "10", 2) == 10
+        assert netstat.ns_rate("10", "30", 2) == 0
+        assert netstat.ns_rate(netstat.STATUS_NA, "10", 2) == netstat.STATUS_NA
+        assert netstat.ns_rate("30", "10", 0) == netstat.STATUS_NA
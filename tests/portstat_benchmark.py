@@ -0,0 +1,169 @@
+"""
+Collection of the portstat counters on a mock COUNTERS_DB, the per field reads of the rates vs the bulk
+fetch of all the RATES tables.
+    python -m tests.portstat_benchmark
+
+A device pays a round trip per command or pipeline, which dominates the collection, so each of them is
+charged ROUND_TRIP_SECS on the mock.
+"""
+import time
+from collections import OrderedDict
+
+import mockredis
+from natsort import natsorted
+
+import utilities_common.portstat as portstat
+
+PORT_COUNTS = [128, 512, 1024]
+ROUND_TRIP_SECS = 0.0001
+
+
+class LatencyRedis(mockredis.MockRedis):
+    def __init__(self):
+        super(LatencyRedis, self).__init__(strict=True)
+        self.round_trips = 0
+        self.in_pipeline = False
+
+    def _encode(self, value):
+        # Return strings, as the SONiC redis clients do
+        return super(LatencyRedis, self)._encode(value).decode('utf-8')
+
+    def round_trip(self):
+        # The commands of a pipeline are sent in the round trip of its execution
+        if not self.in_pipeline:
+            self.round_trips += 1
+            time.sleep(ROUND_TRIP_SECS)
+
+    def hget(self, key, field):
+        self.round_trip()
+        return super(LatencyRedis, self).hget(key, field)
+
+    def hgetall(self, key):
+        self.round_trip()
+        return super(LatencyRedis, self).hgetall(key)
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        pipe = super(LatencyRedis, self).pipeline(transaction, shard_hint)
+        execute = pipe.execute
+
+        def execute_in_one_round_trip():
+            self.round_trip()
+            self.in_pipeline = True
+            try:
+                return execute()
+            finally:
+                self.in_pipeline = False
+        pipe.execute = execute_in_one_round_trip
+        return pipe
+
+
+class FakeDb(object):
+    COUNTERS_DB = "COUNTERS_DB"
+
+    def __init__(self, client):
+        self.client = client
+
+    def get(self, db_name, key, field):
+        return self.client.hget(key, field)
+
+    def get_all(self, db_name, key):
+        return self.client.hgetall(key)
+
+    def get_redis_client(self, db_name):
+        return self.client
+
+
+class FakeCounterTable(object):
+    def __init__(self, client):
+        self.client = client
+
+    def get(self, counter, port):
+        oid = self.client.hget(portstat.COUNTERS_PORT_NAME_MAP, port)
+        return True, tuple(self.client.hgetall(portstat.COUNTER_TABLE_PREFIX + oid).items())
+
+
+class FakeMultiAsic(object):
+    def skip_display(self, obj, name):
+        return False
+
+
+class LegacyPortstat(portstat.Portstat):
+    """
+    The collection before the bulk fetch of the rates: one read per rate field per port.
+    """
+    def get_cnstat(self):
+        def get_counters(port):
+            fields = ["0"] * portstat.BUCKET_NUM
+            _, fvs = counter_table.get(portstat.PortCounter(), port)
+            fvs = dict(fvs)
+            for pos, cntr_list in portstat.counter_bucket_dict.items():
+                for counter_name in cntr_list:
+                    if counter_name not in fvs:
+                        fields[pos] = portstat.STATUS_NA
+                    elif fields[pos] != portstat.STATUS_NA:
+                        fields[pos] = str(int(fields[pos]) + int(float(fvs[counter_name])))
+            return portstat.NStats._make(fields)._asdict()
+
+        def get_rates(table_id):
+            fields = ["0"] * len(portstat.rates_key_list)
+            for pos, name in enumerate(portstat.rates_key_list):
+                counter_data = self.db.get(self.db.COUNTERS_DB, portstat.RATES_TABLE_PREFIX + table_id, name)
+                if counter_data is None:
+                    fields[pos] = portstat.STATUS_NA
+                else:
+                    fields[pos] = float(counter_data)
+            return portstat.RateStats._make(fields)
+
+        counter_port_name_map = self.db.get_all(self.db.COUNTERS_DB, portstat.COUNTERS_PORT_NAME_MAP)
+        cnstat_dict = OrderedDict()
+        ratestat_dict = OrderedDict()
+        counter_table = portstat.CounterTable(self.db.get_redis_client(self.db.COUNTERS_DB))
+        for port in natsorted(counter_port_name_map):
+            cnstat_dict[port] = get_counters(port)
+            ratestat_dict[port] = get_rates(counter_port_name_map[port])
+        return cnstat_dict, ratestat_dict
+
+
+def create_counters_db(port_count):
+    client = LatencyRedis()
+    for i in range(port_count):
+        port = f"Ethernet{i * 4}"
+        oid = f"oid:0x1000000{i:06x}"
+        client.hset(portstat.COUNTERS_PORT_NAME_MAP, port, oid)
+        for counter_names in portstat.counter_bucket_dict.values():
+            for counter_name in counter_names:
+                client.hset(portstat.COUNTER_TABLE_PREFIX + oid, counter_name, str(i))
+        for name in portstat.rates_key_list:
+            client.hset(portstat.RATES_TABLE_PREFIX + oid, name, str(i))
+    return client
+
+
+def time_collect(portstat_type, client):
+    stat = portstat_type.__new__(portstat_type)
+    stat.db = FakeDb(client)
+    stat.multi_asic = FakeMultiAsic()
+    client.round_trips = 0
+    start = time.perf_counter()
+    cnstat_dict, ratestat_dict = stat.get_cnstat()
+    elapsed = time.perf_counter() - start
+    cnstat_dict.pop('time', None)
+    return elapsed, client.round_trips, (cnstat_dict, ratestat_dict)
+
+
+def main():
+    portstat.CounterTable = FakeCounterTable
+
+    print(f"Collecting the port counters and rates, {ROUND_TRIP_SECS * 1e6:.0f}us per round trip")
+    print(f"{'ports':>6} {'legacy (s)':>11} {'round trips':>12} {'bulk (s)':>9} {'round trips':>12} {'speedup':>8}")
+    for port_count in PORT_COUNTS:
+        client = create_counters_db(port_count)
+        legacy_time, legacy_trips, legacy_stats = time_collect(LegacyPortstat, client)
+        bulk_time, bulk_trips, bulk_stats = time_collect(portstat.Portstat, client)
+        assert legacy_stats == bulk_stats
+
+        print(f"{port_count:>6} {legacy_time:>11.3f} {legacy_trips:>12} {bulk_time:>9.3f} {bulk_trips:>12} "
+              f"{legacy_time / bulk_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
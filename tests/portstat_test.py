@@ -1,3 +1,4 @@
+import json
 import os
 import shutil
 
@@ -414,6 +415,25 @@ class TestPortStat(object):
         assert return_code == 0
         assert result == intf_counters_period
 
+    def test_show_intf_counters_watch(self):
+        return_code, result = get_result_and_return_code(['portstat', '-w', '--count', '2', '-j'])
+        print("return_code: {}".format(return_code))
+        print("result = {}".format(result))
+        assert return_code == 0
+        samples = [json.loads(line) for line in result.splitlines()]
+        assert len(samples) == 2
+        assert samples[0]["Ethernet0"]["RX_OK"] == "8"
+        # The counters do not change between the samples of the mock DB
+        assert samples[1]["Ethernet0"]["RX_OK"] == "0"
+        assert samples[1]["Ethernet0"]["RX_BPS"] == "0.00 B/s"
+
+    def test_show_intf_counters_watch_invalid_interval(self):
+        return_code, result = get_result_and_return_code(['portstat', '-w', '--interval', '0'])
+        print("return_code: {}".format(return_code))
+        print("result = {}".format(result))
+        assert return_code == 2
+        assert "--interval must be greater than 0" in result
+
     def test_show_intf_counters_detailed(self):
         runner = CliRunner()
         result = runner.invoke(
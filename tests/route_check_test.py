@@ -1,7 +1,9 @@
 import copy
+import fnmatch
 from io import StringIO
 import json
 import logging
+import os
 import syslog
 import sys
 import time
@@ -75,15 +77,34 @@ class Table:
         ret = copy.deepcopy(self.data.get(key, {}).get(field, {}))
         return True, ret
 
+class MockDBConnector(dict):
+    def __init__(self, namespace, name):
+        super().__init__(namespace=namespace, name=name)
+        self.scans_started = {}
+
+    def scan(self, cursor, pattern, count):
+        tbl_name, key_pattern = pattern.split(":", 1)
+        tbl = table_side_effect(self, tbl_name)
+        if cursor == 0:
+            # Updates are seen from the second scan of a table, like the
+            # subscriber sees them from the first select
+            if self.scans_started.get(tbl_name, 0) == 1:
+                tbl.update()
+            self.scans_started[tbl_name] = self.scans_started.get(tbl_name, 0) + 1
+
+        keys = sorted(k for k in tbl.getKeys() if fnmatch.fnmatchcase(k, key_pattern))
+        next_cursor = cursor + count if cursor + count < len(keys) else 0
+        return next_cursor, ["{}:{}".format(tbl_name, k) for k in keys[cursor:cursor + count]]
+
 def conn_side_effect(arg, _1, _2, namespace):
     return db_conns[namespace][arg]
 
 def init_db_conns(namespaces):
     for ns in namespaces:
         db_conns[ns] = {
-            "APPL_DB": {"namespace": ns, "name": APPL_DB},
-            "ASIC_DB": {"namespace": ns, "name": ASIC_DB},
-            "APPL_STATE_DB": {"namespace": ns, "name": APPL_STATE_DB},
+            "APPL_DB": MockDBConnector(ns, APPL_DB),
+            "ASIC_DB": MockDBConnector(ns, ASIC_DB),
+            "APPL_STATE_DB": MockDBConnector(ns, APPL_STATE_DB),
             "CONFIG_DB": ConfigDB(ns)
             }
 
@@ -239,6 +260,73 @@ class TestRouteCheck(object):
         set_test_case_data(ct_data)
         self.run_test(ct_data)
 
+    @pytest.mark.parametrize("test_num", TEST_DATA.keys())
+    def test_route_check_streaming(self, mock_dbs, test_num):
+        logger.debug("test_route_check_streaming: test_num={}".format(test_num))
+        self.init()
+        ct_data = copy.deepcopy(TEST_DATA[test_num])
+        ct_data[ARGS] += " --streaming"
+        set_test_case_data(ct_data)
+        with patch('route_check.SCAN_BATCH_SIZE', 2), patch('route_check.time.sleep'):
+            self.run_test(ct_data)
+
+    @pytest.mark.parametrize("test_num", TEST_DATA.keys())
+    def test_route_check_daemon(self, mock_dbs, test_num, tmp_path):
+        logger.debug("test_route_check_daemon: test_num={}".format(test_num))
+        self.init()
+        ct_data = copy.deepcopy(TEST_DATA[test_num])
+        ct_data[ARGS] += " --daemon"
+        set_test_case_data(ct_data)
+        status_file = str(tmp_path / "status.json")
+        with patch('route_check.SUBSCRIBE_WAIT_SECS', 0), patch('route_check.ROUTE_CHECK_STATUS_FILE', status_file):
+            self.run_test(ct_data)
+
+            # Nothing is reported when the check is skipped
+            if os.path.exists(status_file):
+                with patch('sys.argv', ["route_check.py", "--query"]):
+                    ret, res = route_check.main()
+                self.assert_results(ct_data, ret, res)
+
+    def test_route_check_state_updates(self, mock_dbs):
+        init_db_conns([DEFAULTNS])
+        state = route_check.RouteCheckState(DEFAULTNS)
+        state.appl_subs = MagicMock()
+        state.asic_subs = MagicMock()
+        asic_key = 'SAI_OBJECT_TYPE_ROUTE_ENTRY:{"dest":"10.1.0.0/24","switch_id":"oid:0x21000000000000","vr":"oid:0x3000000000023"}'
+        done = ("", "", None)
+
+        # Route added in APPL-DB only
+        state.appl_subs.pop.side_effect = [("10.1.0.0/24", "SET", None), done]
+        state.asic_subs.pop.side_effect = [done]
+        assert state.process_updates(now=10) == 1
+        assert state.rt_appl_miss == {route_check.pack_prefix("10.1.0.0/24"): 10}
+
+        # Route programmed in ASIC-DB
+        state.appl_subs.pop.side_effect = [done]
+        state.asic_subs.pop.side_effect = [(asic_key, "SET", None), done]
+        assert state.process_updates(now=11) == 1
+        assert not state.rt_appl_miss and not state.rt_asic_miss
+
+        # Route removed from APPL-DB only
+        state.appl_subs.pop.side_effect = [("10.1.0.0/24", "DEL", None), done]
+        state.asic_subs.pop.side_effect = [done]
+        state.process_updates(now=12)
+        assert state.rt_asic_miss == {route_check.pack_prefix("10.1.0.0/24"): 12}
+
+        # Only the mismatches older than SUBSCRIBE_WAIT_SECS are reported
+        with patch('route_check.check_frr_pending_routes', return_value=[]):
+            assert state.get_results(now=12) == {}
+            assert state.get_results(now=12 + route_check.SUBSCRIBE_WAIT_SECS) == \
+                {"Unaccounted_ROUTE_ENTRY_TABLE_entries": ["10.1.0.0/24"]}
+
+    def test_pack_prefix(self):
+        for prefix in ["10.10.196.12/31", "10.10.196.24/32", "0.0.0.0/0", "2603:10b0:503:df4::5d/128", "::/0"]:
+            packed = route_check.pack_prefix(prefix)
+            assert route_check.unpack_prefix(packed) == prefix
+        assert len(route_check.pack_prefix("10.10.196.12/31")) == 5
+        assert len(route_check.pack_prefix("2603:10b0:503:df4::5d/128")) == 17
+        assert route_check.pack_prefix("10.0.0.0/8") != route_check.pack_prefix("10.0.0.0/16")
+
     def run_test(self, ct_data):
         with patch('sys.argv', ct_data[ARGS].split()), \
             patch('sonic_py_common.multi_asic.get_namespace_list', return_value= ct_data[NAMESPACE]), \
@@ -8,6 +8,7 @@ import pytest
 import sonic_package_manager
 from sonic_package_manager.errors import *
 from sonic_package_manager.version import Version
+from utilities_common.download import DownloadError
 import json
 
 @pytest.fixture(autouse=True)
@@ -559,11 +560,16 @@ def test_list_package_manifest(package_manager):
 def test_download_file_http(package_manager):
     fake_remote_url = "http://www.example.com/index.html"
     fake_local_path = "local_path"
-    with patch("requests.get") as mock_requests_get:
-        with patch("builtins.open", mock_open()) as mock_file:
-            package_manager.download_file(fake_remote_url, fake_local_path)
-    mock_requests_get.assert_called_once_with(fake_remote_url, stream=True)
-    mock_file.assert_called_once_with("local_path", "wb")
+    with patch("sonic_package_manager.manager.download") as mock_download:
+        assert package_manager.download_file(fake_remote_url, fake_local_path)
+    mock_download.assert_called_once_with(fake_remote_url, fake_local_path)
+
+
+def test_download_file_http_error(package_manager):
+    fake_remote_url = "http://www.example.com/index.html"
+    fake_local_path = "local_path"
+    with patch("sonic_package_manager.manager.download", side_effect=DownloadError("failed")):
+        assert not package_manager.download_file(fake_remote_url, fake_local_path)
 
 
 def test_download_file_scp(package_manager):
@@ -600,3 +606,16 @@ def test_download_file_sftp(package_manager):
         username="admin",
         password="test_password"
     )
+
+
+def test_get_packages_available_versions(package_manager, mock_registry_resolver):
+    registry = mock_registry_resolver.get_registry_for.return_value
+    registry.tags.return_value = ['1.0.0', '1.1.0', 'latest']
+
+    results = package_manager.get_packages_available_versions(['test-package', 'test-package-2', 'non-existing'])
+
+    assert list(results) == ['test-package', 'test-package-2', 'non-existing']
+    assert [str(version) for version in results['test-package']] == ['1.0.0', '1.1.0']
+    assert [str(version) for version in results['test-package-2']] == ['1.0.0', '1.1.0']
+    assert isinstance(results['non-existing'], PackageNotFoundError)
+    assert registry.tags.call_count == 2
@@ -1,8 +1,11 @@
 #!/usr/bin/env python
 
+import hashlib
+import json
+
 import requests
 import responses
-from sonic_package_manager.registry import RegistryResolver
+from sonic_package_manager.registry import RegistryCache, RegistryResolver
 
 
 def test_get_registry_for():
@@ -34,3 +37,98 @@ def test_registry_auth():
                   json={'tags': ['a', 'b']},
                   status=requests.codes.ok)
     assert registry.tags('registry-server:5000/docker') == ['a', 'b']
+
+
+class FakeRegistry:
+    """ A stand-in registry serving a repository behind a token
+    authentication, which counts the requests it serves. """
+
+    def __init__(self, url, realm):
+        self.url = url
+        self.realm = realm
+        self.token = 'token'
+        self.config = json.dumps({'config': {'Labels': {'com.azure.sonic.manifest': '{}'}}}).encode()
+        self.config_digest = 'sha256:' + hashlib.sha256(self.config).hexdigest()
+        self.manifest = json.dumps({'config': {'digest': self.config_digest}}).encode()
+        self.manifest_digest = 'sha256:' + hashlib.sha256(self.manifest).hexdigest()
+        self.requests = []
+        base_url = f'{url}/v2/docker'
+        responses.add_callback(responses.GET, f'{base_url}/tags/list',
+                               callback=self.serve(lambda: json.dumps({'tags': ['1.0.0']})))
+        responses.add_callback(responses.GET, f'{base_url}/manifests/1.0.0',
+                               callback=self.serve(lambda: self.manifest))
+        responses.add_callback(responses.GET, f'{base_url}/blobs/{self.config_digest}',
+                               callback=self.serve(lambda: self.config))
+        responses.add_callback(responses.GET, realm, callback=self.serve_token)
+
+    def serve(self, content):
+        def callback(request):
+            self.requests.append(request.url)
+            if request.headers.get('Authorization') != f'Bearer {self.token}':
+                challenge = f'Bearer realm="{self.realm}",scope="repository:docker:pull"'
+                return requests.codes.unauthorized, {'www-authenticate': challenge}, ''
+            return requests.codes.ok, {}, content()
+        return callback
+
+    def serve_token(self, request):
+        self.requests.append(request.url)
+        return requests.codes.ok, {}, json.dumps({'token': self.token, 'expires_in': 300})
+
+
+@responses.activate
+def test_registry_cache(tmp_path):
+    fake_registry = FakeRegistry('https://registry-server:5000', 'https://registry-server:5000/token-cache')
+    cache = RegistryCache(str(tmp_path))
+
+    for _ in range(2):
+        registry = RegistryResolver(cache).get_registry_for('registry-server:5000/docker')
+        assert registry.tags('registry-server:5000/docker') == ['1.0.0']
+        manifest = registry.manifest('registry-server:5000/docker', '1.0.0')
+        assert manifest == {'config': {'digest': fake_registry.config_digest}}
+        blob = registry.blobs('registry-server:5000/docker', manifest['config']['digest'])
+        assert blob == {'config': {'Labels': {'com.azure.sonic.manifest': '{}'}}}
+        assert registry.manifest('registry-server:5000/docker', fake_registry.manifest_digest) == manifest
+
+    # Challenged once, then a request for the token and for each of the tags, manifest and blob
+    assert len(fake_registry.requests) == 5
+
+
+@responses.activate
+def test_registry_cache_expired(tmp_path):
+    fake_registry = FakeRegistry('https://registry-server:5000', 'https://registry-server:5000/token-expired')
+    registry = RegistryResolver(RegistryCache(str(tmp_path), ttl=-1)).get_registry_for('registry-server:5000/docker')
+
+    registry.tags('registry-server:5000/docker')
+    registry.tags('registry-server:5000/docker')
+
+    tags_requests = [url for url in fake_registry.requests if url.endswith('/tags/list')]
+    assert len(tags_requests) == 3
+
+
+@responses.activate
+def test_registry_cache_corrupted(tmp_path):
+    fake_registry = FakeRegistry('https://registry-server:5000', 'https://registry-server:5000/token-corrupted')
+    cache = RegistryCache(str(tmp_path))
+    cache.put_content(fake_registry.config_digest, fake_registry.config)
+    with open(cache._digest_path(fake_registry.config_digest), 'wb') as f:
+        f.write(b'{}')
+    registry = RegistryResolver(cache).get_registry_for('registry-server:5000/docker')
+
+    blob = registry.blobs('registry-server:5000/docker', fake_registry.config_digest)
+
+    assert blob == {'config': {'Labels': {'com.azure.sonic.manifest': '{}'}}}
+    assert cache.get_content(fake_registry.config_digest) == fake_registry.config
+
+
+@responses.activate
+def test_registry_token_reuse():
+    fake_registry = FakeRegistry('https://registry-server:5000', 'https://registry-server:5000/token-reuse')
+    resolver = RegistryResolver()
+
+    for _ in range(3):
+        registry = resolver.get_registry_for('registry-server:5000/docker')
+        assert registry.tags('registry-server:5000/docker') == ['1.0.0']
+
+    token_requests = [url for url in fake_registry.requests if '/token-reuse' in url]
+    assert len(token_requests) == 1
+    assert len(fake_registry.requests) == 5
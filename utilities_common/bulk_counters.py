@@ -0,0 +1,53 @@
+"""
+Bulk fetch of the counter hashes, shared by the counter CLIs.
+"""
+
+import redis
+
+from utilities_common.redis_pipeline import get_pipeline_client
+
+PIPELINE_BATCH_SIZE = 1000
+
+
+class BulkCounterFetcher(object):
+    """
+    Fetch many hashes of a database in a few round trips.
+
+    The hashes are read with a redis pipeline, on the client of the connector
+    when it supports them, else on a redis connection over the unix socket of
+    the database. When neither is available, or the pipeline fails, they are
+    read with one HGETALL per hash, which still replaces the per field reads of
+    the callers.
+    """
+    def __init__(self, db, db_name, namespace=None):
+        """
+        :param namespace: the namespace of the database, that of db when None
+        """
+        self.db = db
+        self.db_name = db_name
+        self.pipeline_client = get_pipeline_client(db, db_name, namespace)
+
+    def get_all(self, keys):
+        """
+        Get the fields of the given hashes.
+        :param keys: the full keys of the hashes, table prefix included
+        :return a list of dicts in the order of keys, empty for missing hashes
+        """
+        keys = list(keys)
+        if not keys:
+            return []
+
+        if self.pipeline_client is not None:
+            try:
+                results = []
+                for start in range(0, len(keys), PIPELINE_BATCH_SIZE):
+                    pipe = self.pipeline_client.pipeline(transaction=False)
+                    for key in keys[start:start + PIPELINE_BATCH_SIZE]:
+                        pipe.hgetall(key)
+                    results.extend(pipe.execute())
+                return [fvs or {} for fvs in results]
+            except redis.RedisError:
+                pass
+
+        client = self.db.get_redis_client(self.db_name)
+        return [dict(client.hgetall(key) or {}) for key in keys]
@@ -0,0 +1,71 @@
+"""
+Index of the name maps of COUNTERS_DB, shared by the queue and priority group
+counter CLIs.
+"""
+
+from utilities_common.bulk_counters import BulkCounterFetcher
+
+COUNTER_TABLE_PREFIX = "COUNTERS:"
+
+
+class CounterMapIndex(object):
+    """
+    The name maps of COUNTERS_DB, e.g. the port, the index and the type of each
+    queue, each read once with a single HGETALL, and a bulk reader of the
+    counters of the objects they name.
+
+    The maps of several databases, e.g. of the namespaces of a multi-ASIC
+    device, are merged.
+    """
+    def __init__(self, dbs):
+        self.dbs = dbs if isinstance(dbs, list) else [dbs]
+        self.maps = {}
+        self.fetchers = {}
+
+    def get_map(self, name):
+        """
+        Get a name map, read on its first use.
+        """
+        if name not in self.maps:
+            name_map = {}
+            for db in self.dbs:
+                name_map.update(db.get_all(db.COUNTERS_DB, name) or {})
+            self.maps[name] = name_map
+        return self.maps[name]
+
+    def get(self, name, oid):
+        """
+        Get the value of an object in a name map, None if it is not there.
+        """
+        return self.get_map(name).get(oid)
+
+    def get_fetcher(self, index):
+        """
+        Get the counter fetcher of a database, whose pipeline client is made
+        once and reused by the next reads, e.g. in watch mode.
+        """
+        if index not in self.fetchers:
+            db = self.dbs[index]
+            self.fetchers[index] = BulkCounterFetcher(db, db.COUNTERS_DB)
+        return self.fetchers[index]
+
+    def get_counters(self, oids, table_prefix=COUNTER_TABLE_PREFIX):
+        """
+        Get the counters of the objects, read with a pipeline per database.
+        :param table_prefix: the prefix of the tables of the counters
+        :return a dict of the counters of each object, empty if it has none
+        """
+        oids = list(oids)
+        counters = dict.fromkeys(oids)
+        missing = oids
+        for i, db in enumerate(self.dbs):
+            fetcher = self.get_fetcher(i)
+            for oid, fvs in zip(missing, fetcher.get_all(table_prefix + oid for oid in missing)):
+                if fvs:
+                    counters[oid] = fvs
+            missing = [oid for oid in missing if not counters[oid]]
+            if not missing:
+                break
+        for oid in missing:
+            counters[oid] = {}
+        return counters
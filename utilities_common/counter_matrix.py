@@ -0,0 +1,121 @@
+"""
+Counters of many objects, e.g. the ports, held as one column per counter, so
+that the deltas, rates and their formatting are computed a column at a time by
+the counter CLIs rather than a cell at a time.
+"""
+
+from itertools import repeat
+from operator import itemgetter, sub
+
+STATUS_NA = 'N/A'
+
+
+def _to_counter(value):
+    return None if value == STATUS_NA else int(value)
+
+
+def to_counters(values):
+    """
+    Convert a column of counter values to integers, None for N/A.
+    """
+    try:
+        return list(map(int, values))
+    except ValueError:
+        return list(map(_to_counter, values))
+
+
+def diff_counters(new, old):
+    """
+    The deltas of two columns of counters, never negative. A N/A new counter
+    gives a N/A delta, and a N/A old counter counts as 0, as for ns_diff.
+    """
+    if None in new or None in old:
+        return [None if n is None else max(0, n - (o or 0)) for n, o in zip(new, old)]
+    return [d if d > 0 else 0 for d in map(sub, new, old)]
+
+
+def rate_counters(new, old, interval):
+    """
+    The rates per second of two columns of counters sampled interval seconds
+    apart, N/A if either counter is, as for ns_rate.
+    """
+    if interval <= 0:
+        return [STATUS_NA] * len(new)
+    return [STATUS_NA if n is None or o is None else max(0, n - o) / interval for n, o in zip(new, old)]
+
+
+def format_counters(values):
+    """
+    Format a column of counters with commas, N/A for None.
+    """
+    if None in values:
+        return [STATUS_NA if value is None else format(value, ',') for value in values]
+    return list(map(format, values, repeat(',')))
+
+
+class CounterMatrix(object):
+    """
+    The counters of the given objects of a cnstat dict, in the order of keys.
+
+    The objects missing from the dict, e.g. the ports added since the counters
+    were cleared, have all their counters at 0. The columns are converted to
+    integers on their first use.
+    """
+    def __init__(self, cnstat_dict, keys, fields):
+        self.keys = list(keys)
+        self.fields = list(fields)
+        rows = [cnstat_dict.get(key) for key in self.keys]
+        self.present = [row is not None for row in rows]
+
+        zeros = ('0',) * len(self.fields)
+        getter = itemgetter(*self.fields)
+        if len(self.fields) == 1:
+            getter = lambda row, field=self.fields[0]: (row[field],)
+        try:
+            table = [getter(row) if row is not None else zeros for row in rows]
+        except KeyError:
+            # Counters saved by an older release may lack the newer fields
+            table = [tuple(row.get(field, STATUS_NA) for field in self.fields) if row is not None else zeros
+                     for row in rows]
+
+        if table:
+            self.raw = dict(zip(self.fields, map(list, zip(*table))))
+        else:
+            self.raw = {field: [] for field in self.fields}
+        self.columns = {}
+
+    def counters(self, field):
+        """
+        The column of a counter as integers, None for N/A.
+        """
+        if field not in self.columns:
+            self.columns[field] = to_counters(self.raw[field])
+        return self.columns[field]
+
+    def diff(self, old, field):
+        """
+        The deltas of a counter since the old matrix, of the same keys.
+        """
+        return diff_counters(self.counters(field), old.counters(field))
+
+    def rates(self, old, field, interval):
+        """
+        The rates per second of a counter since the old matrix, of the same keys.
+        """
+        return rate_counters(self.counters(field), old.counters(field), interval)
+
+    def format_diff(self, old, fields=None, raw=False):
+        """
+        Format the deltas of the counters since the old matrix, of the same
+        keys, as a dict of the columns of each field.
+        :param raw: show the values of the objects missing from the old matrix
+                    as they are, rather than as deltas from 0
+        """
+        formatted = {}
+        for field in fields or self.fields:
+            column = format_counters(self.diff(old, field))
+            if raw:
+                column = [value if present else raw_value
+                          for value, present, raw_value in zip(column, old.present, self.raw[field])]
+            formatted[field] = column
+        return formatted
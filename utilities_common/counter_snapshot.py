@@ -0,0 +1,215 @@
+"""
+Compact snapshot of the counters saved by the counter CLIs on "clear", and
+used as the baseline of their diffs.
+
+A snapshot file holds a header and a matrix of uint64 counters:
+    magic | version (uint32) | header length (uint32) | header (JSON) | counters
+
+The top-level entries of the saved dict holding a dict of counters, e.g. the
+ports, are the objects of the snapshot, stored as rows of the matrix in a
+stable order. Their fields are its columns. The other top-level entries, e.g.
+the time, are kept in the header. Fields which are not all integers are kept
+in the header as well.
+
+The matrix is memory-mapped on load, and the rows of the objects are decoded
+when they are accessed. Files not starting with the magic are the JSON files
+saved by the older releases, and are still loaded.
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Mapping
+
+SNAPSHOT_MAGIC = b'CNTSNAP\0'
+SNAPSHOT_VERSION = 1
+SNAPSHOT_PREAMBLE = struct.Struct('<8sII')
+
+STATUS_NA = 'N/A'
+
+# Reserved counter values
+VALUE_MISSING = 0xFFFFFFFFFFFFFFFF
+VALUE_NA = 0xFFFFFFFFFFFFFFFE
+VALUE_NONE = 0xFFFFFFFFFFFFFFFD
+VALUE_MAX = 0xFFFFFFFFFFFFFFFC
+
+# Type of the counters of a field
+FIELD_INT = 'int'
+FIELD_STR = 'str'
+FIELD_TEXT = 'text'
+
+# Placeholder of the fields an object does not have
+_MISSING = object()
+
+
+def _field_type(values):
+    """
+    The type of a field given its values, FIELD_TEXT if they cannot all be
+    stored as counters.
+    """
+    field_type = None
+    for value in values:
+        if value is _MISSING or value is None or value == STATUS_NA:
+            continue
+        if isinstance(value, bool):
+            return FIELD_TEXT
+        if isinstance(value, int):
+            value_type, number = FIELD_INT, value
+        elif isinstance(value, str) and value.isdigit() and str(int(value)) == value:
+            value_type, number = FIELD_STR, int(value)
+        else:
+            return FIELD_TEXT
+        if number > VALUE_MAX or (field_type is not None and field_type != value_type):
+            return FIELD_TEXT
+        field_type = value_type
+    return field_type or FIELD_STR
+
+
+def _encode(value):
+    if value is _MISSING:
+        return VALUE_MISSING
+    if value is None:
+        return VALUE_NONE
+    if value == STATUS_NA:
+        return VALUE_NA
+    return int(value)
+
+
+def save_counter_snapshot(path, data, default=None):
+    """
+    Save the counters to a snapshot file.
+    :param data: dict of the counters of each object, along with other entries
+    :param default: serializer of the values of the other entries, as for json.dump
+    """
+    objects = [key for key, value in data.items() if isinstance(value, dict)]
+    meta = {key: value for key, value in data.items() if not isinstance(value, dict)}
+
+    fields = []
+    seen_fields = set()
+    for obj in objects:
+        for field in data[obj]:
+            if field not in seen_fields:
+                seen_fields.add(field)
+                fields.append(field)
+
+    field_types = {}
+    text_fields = {}
+    counter_fields = []
+    for field in fields:
+        values = [data[obj].get(field, _MISSING) for obj in objects]
+        field_types[field] = _field_type(values)
+        if field_types[field] == FIELD_TEXT:
+            # The objects without the field are saved as an empty list
+            text_fields[field] = [[] if value is _MISSING else [value] for value in values]
+        else:
+            counter_fields.append(field)
+
+    counters = array('Q', [_encode(data[obj].get(field, _MISSING)) for obj in objects for field in counter_fields])
+
+    header = json.dumps({
+        'byteorder': sys.byteorder,
+        'objects': objects,
+        'fields': fields,
+        'field_types': field_types,
+        'counter_fields': counter_fields,
+        'text_fields': text_fields,
+        'meta': meta,
+    }, default=default).encode()
+    # Align the counters on 8 bytes for the memory mapping
+    header += b' ' * (-(SNAPSHOT_PREAMBLE.size + len(header)) % 8)
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(SNAPSHOT_PREAMBLE.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(header)))
+        f.write(header)
+        counters.tofile(f)
+    os.replace(tmp_path, path)
+
+
+def load_counter_snapshot(path):
+    """
+    Load the counters saved to a snapshot file.
+    :return a read-only mapping, as the dict that was saved
+    """
+    with open(path, 'rb') as f:
+        preamble = f.read(SNAPSHOT_PREAMBLE.size)
+        if len(preamble) < SNAPSHOT_PREAMBLE.size or not preamble.startswith(SNAPSHOT_MAGIC):
+            f.seek(0)
+            return json.load(f)
+
+        _, version, header_len = SNAPSHOT_PREAMBLE.unpack(preamble)
+        if version != SNAPSHOT_VERSION:
+            raise ValueError("Unsupported counter snapshot version {} in {}".format(version, path))
+
+        header = json.loads(f.read(header_len))
+        offset = SNAPSHOT_PREAMBLE.size + header_len
+        if os.fstat(f.fileno()).st_size > offset:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            buf = b''
+
+    return CounterSnapshot(header, buf, offset)
+
+
+class CounterSnapshot(Mapping):
+    """
+    Read-only view of a snapshot file, decoding the counters of an object on
+    its first access.
+    """
+    def __init__(self, header, buf, offset):
+        self.meta = header['meta']
+        self.objects = header['objects']
+        self.fields = header['fields']
+        self.field_types = header['field_types']
+        self.counter_fields = header['counter_fields']
+        self.text_fields = header['text_fields']
+        self.rows = {obj: row for row, obj in enumerate(self.objects)}
+        self.decoded = {}
+
+        if header['byteorder'] == sys.byteorder:
+            self.counters = memoryview(buf)[offset:].cast('Q')
+        else:
+            self.counters = array('Q', bytes(buf[offset:]))
+            self.counters.byteswap()
+
+    def __getitem__(self, key):
+        if key in self.meta:
+            return self.meta[key]
+        if key not in self.decoded:
+            self.decoded[key] = self._decode(self.rows[key])
+        return self.decoded[key]
+
+    def __iter__(self):
+        yield from self.meta
+        yield from self.objects
+
+    def __len__(self):
+        return len(self.meta) + len(self.objects)
+
+    def __contains__(self, key):
+        return key in self.meta or key in self.rows
+
+    def _decode(self, row):
+        counters = {}
+        start = row * len(self.counter_fields)
+        for field, value in zip(self.counter_fields, self.counters[start:start + len(self.counter_fields)]):
+            if value == VALUE_MISSING:
+                continue
+            if value == VALUE_NA:
+                counters[field] = STATUS_NA
+            elif value == VALUE_NONE:
+                counters[field] = None
+            elif self.field_types[field] == FIELD_INT:
+                counters[field] = value
+            else:
+                counters[field] = str(value)
+
+        for field, values in self.text_fields.items():
+            if values[row]:
+                counters[field] = values[row][0]
+
+        # Keep the order of the fields as saved
+        return {field: counters[field] for field in self.fields if field in counters}
@@ -0,0 +1,309 @@
+"""
+In-memory snapshot of a database of a ConfigDBConnector, on which a batch of
+changes, e.g. the migration steps of db_migrator, is made and then written back
+as a minimal diff in a single transaction.
+"""
+
+import fnmatch
+import hashlib
+import json
+
+PIPELINE_BATCH_SIZE = 1000
+GLOB_CHARS = "*?["
+
+
+class DBSnapshot(object):
+    """
+    The tables of a database, each read once on its first use with a single
+    KEYS and pipelined HGETALLs, on which the calls of ConfigDBConnector and
+    SonicV2Connector are made in memory.
+
+    Nothing is written to the database until commit, which writes the keys and
+    fields changed since the tables were read. The constants of the connector,
+    e.g. CONFIG_DB or KEY_SEPARATOR, are those of the wrapped connector, the
+    other calls of the connector are not supported.
+    """
+    def __init__(self, connector, db_name, client=None):
+        """
+        :param connector: a ConfigDBConnector connected to the database
+        :param client: a redis client of the database which supports pipelines,
+                       the connector is used when None
+        """
+        self.connector = connector
+        self.db_name = db_name
+        self.client = client
+        self.separator = connector.get_db_separator(db_name)
+        self.serialize_key = connector.serialize_key
+        self.deserialize_key = connector.deserialize_key
+        self.raw_to_typed = connector.raw_to_typed
+        self.typed_to_raw = connector.typed_to_raw
+        # The hashes of each table read so far, by key, and their original fields
+        self.tables = {}
+        self.original = {}
+        # The tables used by the calls made on the snapshot, and the digests of
+        # the tables computed since their last change
+        self.used_tables = set()
+        self.digests = {}
+
+    def __getattr__(self, name):
+        if name.isupper():
+            return getattr(self.connector, name)
+        raise AttributeError("{} is not supported on a snapshot of {}".format(name, self.db_name))
+
+    def get_db_separator(self, db_name):
+        return self.connector.get_db_separator(db_name)
+
+    def __table_of(self, key):
+        return key.split(self.separator, 1)[0]
+
+    def __keys(self, pattern):
+        if self.client is not None:
+            return self.client.keys(pattern)
+        return self.connector.keys(self.db_name, pattern) or []
+
+    def __get_all_many(self, keys):
+        if self.client is None:
+            return [self.connector.get_all(self.db_name, key) or {} for key in keys]
+
+        fvs_list = []
+        for i in range(0, len(keys), PIPELINE_BATCH_SIZE):
+            pipe = self.client.pipeline(transaction=False)
+            for key in keys[i:i + PIPELINE_BATCH_SIZE]:
+                pipe.hgetall(key)
+            fvs_list.extend(fvs or {} for fvs in pipe.execute())
+        return fvs_list
+
+    def __load(self, tables, all_keys=None):
+        """
+        Read the tables not read yet. A key without a separator is a table of
+        its own.
+        :param all_keys: all the keys of the database, when they were read
+        """
+        tables = [table for table in dict.fromkeys(tables) if table not in self.tables]
+        keys = []
+        if all_keys is not None:
+            new_tables = set(tables)
+            keys = [key for key in all_keys if self.__table_of(key) in new_tables]
+        for table in tables:
+            if all_keys is None:
+                prefix = table + self.separator
+                keys.extend(key for key in self.__keys(table + '*') if key == table or key.startswith(prefix))
+            self.tables[table] = {}
+        for key, fvs in zip(keys, self.__get_all_many(keys)):
+            if fvs:
+                self.tables[self.__table_of(key)][key] = dict(fvs)
+                self.original[key] = dict(fvs)
+
+    def __load_all(self):
+        all_keys = self.__keys('*')
+        self.__load([self.__table_of(key) for key in all_keys], all_keys)
+
+    def __get_table(self, table):
+        if table not in self.tables:
+            self.__load([table])
+        self.used_tables.add(table)
+        return self.tables[table]
+
+    def __get_hash(self, key):
+        return self.__get_table(self.__table_of(key)).get(key)
+
+    def __set_hash(self, key, fvs):
+        self.digests.pop(self.__table_of(key), None)
+        table = self.__get_table(self.__table_of(key))
+        if fvs:
+            table[key] = fvs
+        else:
+            table.pop(key, None)
+
+    def __table_keys(self, table):
+        prefix = table + self.separator
+        return [key for key in self.__get_table(table) if key.startswith(prefix)]
+
+    def __check_db(self, db_name):
+        if db_name != self.db_name:
+            raise ValueError("The snapshot of {} can't access {}".format(self.db_name, db_name))
+
+    # The calls of SonicV2Connector
+
+    def keys(self, db_name, pattern='*'):
+        self.__check_db(db_name)
+        # The tables whose keys may match, read first if they weren't
+        prefix = pattern.split(self.separator, 1)[0]
+        if self.separator in pattern and not any(c in prefix for c in GLOB_CHARS):
+            tables = [prefix]
+        else:
+            tables = [self.__table_of(key) for key in self.__keys(pattern)]
+            self.__load(tables)
+            tables = list(self.tables)
+        return [key for table in tables for key in self.__get_table(table) if fnmatch.fnmatchcase(key, pattern)]
+
+    def exists(self, db_name, key):
+        self.__check_db(db_name)
+        return self.__get_hash(key) is not None
+
+    def hexists(self, db_name, key, field):
+        self.__check_db(db_name)
+        return field in (self.__get_hash(key) or {})
+
+    def get(self, db_name, key, field):
+        self.__check_db(db_name)
+        return (self.__get_hash(key) or {}).get(field)
+
+    def get_all(self, db_name, key):
+        self.__check_db(db_name)
+        return dict(self.__get_hash(key) or {})
+
+    def set(self, db_name, key, field, value, blocking=False):
+        self.__check_db(db_name)
+        fvs = dict(self.__get_hash(key) or {})
+        fvs[field] = str(value)
+        self.__set_hash(key, fvs)
+
+    def hmset(self, db_name, key, fvs):
+        self.__check_db(db_name)
+        new_fvs = dict(self.__get_hash(key) or {})
+        new_fvs.update((field, str(value)) for field, value in fvs.items())
+        self.__set_hash(key, new_fvs)
+
+    def delete(self, db_name, key, blocking=False):
+        self.__check_db(db_name)
+        self.__set_hash(key, None)
+
+    # The calls of ConfigDBConnector
+
+    def __key_of(self, table, key):
+        return '{}{}{}'.format(table.upper(), self.separator, self.serialize_key(key))
+
+    def get_entry(self, table, key):
+        return self.raw_to_typed(dict(self.__get_hash(self.__key_of(table, key)) or {}))
+
+    def set_entry(self, table, key, data):
+        _hash = self.__key_of(table, key)
+        if data is None:
+            self.__set_hash(_hash, None)
+            return
+
+        # As ConfigDBConnector, the fields of the original entry missing from
+        # data are removed, the fields the typed entry doesn't have are kept
+        original = self.get_entry(table, key)
+        fvs = dict(self.__get_hash(_hash) or {})
+        fvs.update(self.typed_to_raw(data))
+        for k in [k for k in original if k not in data]:
+            fvs.pop(k + '@' if type(original[k]) == list else k, None)
+        self.__set_hash(_hash, fvs)
+
+    def mod_entry(self, table, key, data):
+        _hash = self.__key_of(table, key)
+        if data is None:
+            self.__set_hash(_hash, None)
+        else:
+            fvs = dict(self.__get_hash(_hash) or {})
+            fvs.update(self.typed_to_raw(data))
+            self.__set_hash(_hash, fvs)
+
+    def get_keys(self, table, split=True):
+        keys = self.__table_keys(table.upper())
+        if not split:
+            return keys
+        return [self.deserialize_key(key.split(self.separator, 1)[1]) for key in keys]
+
+    def get_table(self, table):
+        data = {}
+        hashes = self.__get_table(table.upper())
+        for key in self.__table_keys(table.upper()):
+            data[self.deserialize_key(key.split(self.separator, 1)[1])] = self.raw_to_typed(dict(hashes[key]))
+        return data
+
+    def delete_table(self, table):
+        for key in self.__table_keys(table.upper()):
+            self.__set_hash(key, None)
+
+    def get_config(self):
+        self.__load_all()
+        data = {}
+        for table_name, hashes in self.tables.items():
+            for key, fvs in hashes.items():
+                if self.separator in key:
+                    row = key.split(self.separator, 1)[1]
+                    data.setdefault(table_name, {})[self.deserialize_key(row)] = self.raw_to_typed(dict(fvs))
+        return data
+
+    def get_digest(self):
+        """
+        Get a digest of the content of the database as the snapshot holds it,
+        the tables not read yet read first.
+        """
+        self.__load_all()
+        content = {key: fvs for hashes in self.tables.values() for key, fvs in hashes.items()}
+        return hashlib.sha256(json.dumps(content, sort_keys=True).encode()).hexdigest()
+
+    def get_table_digests(self, tables):
+        """
+        Get a digest of the content of each of the tables as the snapshot holds
+        it, the tables not read yet read first. The digest of a table is only
+        computed again once the table changed.
+        :return a dict of the digest of each table
+        """
+        self.__load(tables)
+        for table in tables:
+            if table not in self.digests:
+                content = json.dumps(self.tables[table], sort_keys=True)
+                self.digests[table] = hashlib.sha256(content.encode()).hexdigest()
+        return {table: self.digests[table] for table in tables}
+
+    def get_used_tables(self):
+        """
+        Get the tables read or written by the calls made on the snapshot.
+        """
+        return sorted(self.used_tables)
+
+    # The changes
+
+    def get_diff(self):
+        """
+        Get the changes made to the snapshot.
+        :return the list of the removed keys, and a dict of the fields removed
+                from and the fields set to each changed key
+        """
+        current = {key: fvs for hashes in self.tables.values() for key, fvs in hashes.items()}
+        removed = [key for key in self.original if key not in current]
+        changed = {}
+        for key, fvs in current.items():
+            original = self.original.get(key, {})
+            removed_fields = [field for field in original if field not in fvs]
+            set_fvs = {field: value for field, value in fvs.items() if original.get(field) != value}
+            if removed_fields or set_fvs:
+                changed[key] = (removed_fields, set_fvs)
+        return removed, changed
+
+    def commit(self):
+        """
+        Write the changes made to the snapshot, in a single transaction when
+        there is a client which supports pipelines.
+        :return the number of the keys written
+        """
+        removed, changed = self.get_diff()
+        if not removed and not changed:
+            return 0
+
+        if self.client is not None:
+            pipe = self.client.pipeline(transaction=True)
+            for key in removed:
+                pipe.delete(key)
+            for key, (removed_fields, set_fvs) in changed.items():
+                if removed_fields:
+                    pipe.hdel(key, *removed_fields)
+                if set_fvs:
+                    pipe.hset(key, mapping=set_fvs)
+            pipe.execute()
+        else:
+            for key in removed:
+                self.connector.delete(self.db_name, key)
+            for key, (removed_fields, set_fvs) in changed.items():
+                if removed_fields:
+                    self.connector.delete(self.db_name, key)
+                    set_fvs = self.__get_hash(key)
+                self.connector.hmset(self.db_name, key, set_fvs)
+
+        self.original = {key: dict(fvs) for hashes in self.tables.values() for key, fvs in hashes.items()}
+        return len(removed) + len(changed)
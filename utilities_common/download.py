@@ -0,0 +1,402 @@
+"""
+Download of a file over HTTP(S) in segments fetched in parallel with range
+requests, shared by sonic-installer and sonic-package-manager.
+
+The file is written to a partial file next to the destination, with a state
+file recording the segments done, so that a download which failed, e.g. on a
+dropped connection, resumes from the segments missing when it is retried. A
+segment interrupted while downloading is retried from the byte it stopped at.
+The checksum of the file is computed while it is downloaded, over the
+segments done in order, and the file is moved to its destination only when it
+matches.
+
+As the destination may be in a directory other users can write to, such as
+/tmp, a download only resumes from partial and state files which are owned by
+the user and which only the user can write to, in a directory where other
+users can't replace them. The files are opened without following symlinks.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import re
+import stat
+import tempfile
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPException, IncompleteRead
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+
+DEFAULT_WORKERS = 4
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+DEFAULT_RETRIES = 5
+RETRY_DELAY = 1
+TIMEOUT = 30
+BLOCK_SIZE = 64 * 1024
+PARTIAL_SUFFIX = '.part'
+STATE_SUFFIX = '.part.json'
+
+CONTENT_RANGE_RE = re.compile(r'bytes (\d+)-(\d+)/(\d+)')
+# The client errors worth a retry
+RETRIED_HTTP_ERRORS = [408, 429]
+# The files of a download are only opened when they aren't symlinks
+OPEN_FLAGS = getattr(os, 'O_NOFOLLOW', 0)
+
+
+class DownloadError(Exception):
+    """ The download failed, it resumes when it is retried unless the
+    file it got was corrupted. """
+    pass
+
+
+class _SegmentError(Exception):
+    """ A segment failed, and is retried from the byte it stopped at. """
+    def __init__(self, message, offset=None):
+        super().__init__(message)
+        self.offset = offset
+
+
+def parse_checksum(checksum):
+    """
+    Parse a checksum in the format <algorithm>:<hex digest>, e.g.
+    sha256:9f86d0...
+    :return the algorithm and the lowercase digest
+    """
+    algorithm, _, digest = checksum.partition(':')
+    algorithm = algorithm.lower()
+    if algorithm not in hashlib.algorithms_available or not digest:
+        raise ValueError("Invalid checksum '{}', expected <algorithm>:<hex digest>".format(checksum))
+    return algorithm, digest.lower()
+
+
+def split_credentials(url):
+    """
+    Remove the credentials from a URL.
+    :return the URL without credentials, and the username and the password,
+            None when the URL doesn't have them
+    """
+    parsed_url = urllib.parse.urlsplit(url)
+    if parsed_url.username is None and parsed_url.password is None:
+        return url, None, None
+    netloc = parsed_url.hostname or ''
+    if ':' in netloc:
+        netloc = '[{}]'.format(netloc)
+    if parsed_url.port is not None:
+        netloc += ':{}'.format(parsed_url.port)
+    return urllib.parse.urlunsplit(parsed_url._replace(netloc=netloc)), parsed_url.username, parsed_url.password
+
+
+def download(url, path, checksum=None, auth=None, workers=DEFAULT_WORKERS, chunk_size=DEFAULT_CHUNK_SIZE,
+             retries=DEFAULT_RETRIES, retry_delay=RETRY_DELAY, progress=None):
+    """
+    Download a file, resuming a previous download of it which failed.
+
+    :param url: the http or https URL of the file, credentials in the URL are
+                sent as basic authentication
+    :param path: the path the file is written to once it is complete
+    :param checksum: the checksum of the file, <algorithm>:<hex digest>
+    :param auth: the username and the password of a basic authentication
+    :param workers: the number of segments downloaded in parallel
+    :param chunk_size: the size in bytes of the segments
+    :param retries: the number of retries of a segment which failed
+    :param retry_delay: the delay in seconds before the first retry, doubled
+                        on each retry
+    :param progress: called with the bytes done and the size of the file, -1
+                     when the server doesn't send it
+    :raise DownloadError: the download failed
+    """
+    if workers < 1 or chunk_size < 1:
+        raise ValueError("The number of workers and the chunk size must be positive")
+    url, username, password = split_credentials(url)
+    if auth is None and username is not None:
+        auth = (username, password or '')
+    _Download(url, path, checksum, auth, workers, chunk_size, retries, retry_delay, progress).run()
+
+
+class _Download(object):
+    def __init__(self, url, path, checksum, auth, workers, chunk_size, retries, retry_delay, progress):
+        self.url = url
+        self.path = path
+        self.part_path = path + PARTIAL_SUFFIX
+        self.state_path = path + STATE_SUFFIX
+        self.checksum = parse_checksum(checksum) if checksum else None
+        self.headers = {}
+        if auth is not None:
+            credentials = '{}:{}'.format(*auth).encode()
+            self.headers['Authorization'] = 'Basic ' + base64.b64encode(credentials).decode()
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.progress = progress
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.hasher = hashlib.new(self.checksum[0]) if self.checksum else None
+        self.size = -1
+        self.validator = None
+        self.done = set()
+        self.hashed = 0
+        self.bytes_done = 0
+
+    def run(self):
+        self.update_progress(0)
+        response = self.probe()
+        content_range = CONTENT_RANGE_RE.match(response.headers.get('Content-Range', ''))
+        if response.status != 206 or content_range is None:
+            # The server doesn't support range requests, the file is
+            # downloaded from the response in a single stream
+            self.download_stream(response)
+        else:
+            response.close()
+            self.size = int(content_range.group(3))
+            # A weak ETag can't validate a range request
+            etag = response.headers.get('ETag')
+            if etag is not None and not etag.startswith('W/'):
+                self.validator = etag
+            else:
+                self.validator = response.headers.get('Last-Modified')
+            self.download_segments()
+        self.verify()
+        os.replace(self.part_path, self.path)
+        self.remove(self.state_path)
+
+    def probe(self):
+        """ Request the first byte, to get the size of the file and whether
+        the server supports range requests """
+        attempt = 0
+        while True:
+            try:
+                return self.open(headers={'Range': 'bytes=0-0'})
+            except HTTPError as e:
+                # An empty file has no range
+                if e.code != 416:
+                    raise
+                return self.open(headers={})
+            except _SegmentError as e:
+                if attempt >= self.retries:
+                    raise DownloadError(str(e))
+                time.sleep(self.retry_delay * 2 ** attempt)
+                attempt += 1
+
+    def open(self, headers, start=None):
+        """ Send a GET request, the range is checked against start when set """
+        request = Request(self.url, headers=dict(self.headers, **headers))
+        try:
+            response = urlopen(request, timeout=TIMEOUT)
+        except HTTPError as e:
+            if e.code < 500 and e.code not in RETRIED_HTTP_ERRORS:
+                if e.code == 416 and start is None:
+                    raise
+                raise DownloadError("Request to {} failed: {}".format(self.url, e))
+            raise _SegmentError("Request to {} failed: {}".format(self.url, e))
+        except (URLError, HTTPException, OSError) as e:
+            raise _SegmentError("Request to {} failed: {}".format(self.url, e))
+        if start is not None:
+            content_range = CONTENT_RANGE_RE.match(response.headers.get('Content-Range', ''))
+            if response.status != 206 or content_range is None or int(content_range.group(1)) != start:
+                response.close()
+                raise DownloadError("{} changed on the server while it was downloaded".format(self.url))
+        return response
+
+    def update_progress(self, count):
+        with self.lock:
+            self.bytes_done += count
+            if self.progress is not None:
+                self.progress(self.bytes_done, self.size)
+
+    # A server without range requests
+
+    def download_stream(self, response):
+        self.remove(self.state_path)
+        with response, self.create_partial() as f:
+            length = response.headers.get('Content-Length')
+            self.size = int(length) if length is not None else -1
+            try:
+                while True:
+                    block = response.read(BLOCK_SIZE)
+                    if not block:
+                        break
+                    f.write(block)
+                    if self.hasher is not None:
+                        self.hasher.update(block)
+                    self.update_progress(len(block))
+            except (HTTPException, OSError) as e:
+                raise DownloadError("Download of {} failed: {}".format(self.url, e))
+        if self.size != -1 and self.bytes_done != self.size:
+            raise DownloadError("Download of {} got {} of {} bytes".format(self.url, self.bytes_done, self.size))
+        self.hashed = self.bytes_done
+
+    # A server with range requests
+
+    def segments(self):
+        return [(start, min(start + self.chunk_size, self.size))
+                for start in range(0, self.size, self.chunk_size)]
+
+    # The partial and state files
+
+    def open_file(self, path, flags, mode):
+        """ Open a file of the download, without following symlinks """
+        return os.fdopen(os.open(path, flags | OPEN_FLAGS, 0o600), mode)
+
+    def create_partial(self):
+        """ Create a new partial file, only the user can access """
+        self.remove(self.part_path)
+        try:
+            return self.open_file(self.part_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 'wb')
+        except OSError as e:
+            raise DownloadError("Failed to create {}: {}".format(self.part_path, e))
+
+    def is_resumable(self, f):
+        """ Whether an existing file of the download can be resumed from: a
+        regular file of the user, which other users can't write to or replace """
+        st = os.fstat(f.fileno())
+        if not stat.S_ISREG(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+            return False
+        dir_st = os.stat(os.path.dirname(os.path.abspath(self.part_path)))
+        if dir_st.st_uid not in (0, os.getuid()):
+            return False
+        # In a directory other users can write to, only the sticky bit keeps
+        # them from replacing the file
+        return not dir_st.st_mode & (stat.S_IWGRP | stat.S_IWOTH) or bool(dir_st.st_mode & stat.S_ISVTX)
+
+    def load_state(self):
+        """ Resume the segments done of the same file, else start over """
+        try:
+            with self.open_file(self.state_path, os.O_RDONLY, 'r') as f:
+                state = json.load(f) if self.is_resumable(f) else None
+            with self.open_file(self.part_path, os.O_RDONLY, 'rb') as f:
+                resumable = self.is_resumable(f) and os.fstat(f.fileno()).st_size == self.size
+            if state is not None and resumable and \
+                    state['url'] == self.url and state['size'] == self.size and \
+                    state['validator'] == self.validator and state['chunk_size'] == self.chunk_size:
+                self.done = set(state['done'])
+                return
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        self.done = set()
+        with self.create_partial() as f:
+            f.truncate(self.size)
+        self.save_state()
+
+    def save_state(self):
+        state = {'url': self.url, 'size': self.size, 'validator': self.validator,
+                 'chunk_size': self.chunk_size, 'done': sorted(self.done)}
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.state_path)),
+                                        prefix=os.path.basename(self.state_path) + '.')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.state_path)
+        except Exception:
+            self.remove(tmp_path)
+            raise
+
+    def download_segments(self):
+        self.load_state()
+        segments = self.segments()
+        self.update_progress(sum(end - start for i, (start, end) in enumerate(segments) if i in self.done))
+        self.hash_segments(segments)
+
+        pending = [i for i in range(len(segments)) if i not in self.done]
+        with ThreadPoolExecutor(max_workers=min(self.workers, max(len(pending), 1))) as executor:
+            futures = [executor.submit(self.download_segment, segments, i) for i in pending]
+            try:
+                for future in futures:
+                    future.result()
+            finally:
+                # The other segments stop on the first one which failed
+                self.stopped.set()
+
+    def download_segment(self, segments, index):
+        start, end = segments[index]
+        offset = start
+        attempt = 0
+        with self.open_file(self.part_path, os.O_RDWR, 'r+b') as f:
+            while offset < end:
+                if self.stopped.is_set():
+                    return
+                try:
+                    offset = self.fetch_range(f, offset, end)
+                except _SegmentError as e:
+                    if e.offset is not None:
+                        offset = e.offset
+                    if attempt >= self.retries:
+                        raise DownloadError("Download of {} failed: {}".format(self.url, e))
+                    time.sleep(self.retry_delay * 2 ** attempt)
+                    attempt += 1
+        if offset == end:
+            with self.lock:
+                self.done.add(index)
+                self.save_state()
+                self.hash_segments(segments)
+
+    def fetch_range(self, f, offset, end):
+        """ Write the bytes from offset to end, return the offset reached """
+        headers = {'Range': 'bytes={}-{}'.format(offset, end - 1)}
+        if self.validator is not None:
+            headers['If-Range'] = self.validator
+        response = self.open(headers, start=offset)
+        with response:
+            f.seek(offset)
+            try:
+                while offset < end and not self.stopped.is_set():
+                    try:
+                        block = response.read(min(BLOCK_SIZE, end - offset))
+                    except IncompleteRead as e:
+                        # The bytes read before the connection was closed are kept
+                        block = e.partial[:end - offset]
+                        if not block:
+                            raise
+                    if not block:
+                        raise _SegmentError("Connection closed at byte {}".format(offset), offset)
+                    f.write(block)
+                    offset += len(block)
+                    self.update_progress(len(block))
+            except (HTTPException, OSError) as e:
+                raise _SegmentError("Connection failed at byte {}: {}".format(offset, e), offset)
+            finally:
+                f.flush()
+        return offset
+
+    def hash_segments(self, segments):
+        """ Hash the segments done which follow those hashed so far """
+        if self.hasher is None:
+            return
+        with self.open_file(self.part_path, os.O_RDONLY, 'rb') as f:
+            index = self.hashed // self.chunk_size
+            while index < len(segments) and index in self.done:
+                start, end = segments[index]
+                f.seek(start)
+                while start < end:
+                    block = f.read(min(BLOCK_SIZE, end - start))
+                    if not block:
+                        raise DownloadError("{} is truncated".format(self.part_path))
+                    self.hasher.update(block)
+                    start += len(block)
+                self.hashed = end
+                index += 1
+
+    def verify(self):
+        if self.hasher is None:
+            return
+        if self.size != -1 and self.hashed != self.size:
+            raise DownloadError("Download of {} is incomplete".format(self.url))
+        algorithm, expected = self.checksum
+        digest = self.hasher.hexdigest()
+        if digest != expected:
+            # The content is corrupted, the next download starts over
+            self.remove(self.part_path)
+            self.remove(self.state_path)
+            raise DownloadError("Checksum mismatch for {}: expected {}:{}, got {}:{}".format(
+                                self.url, algorithm, expected, algorithm, digest))
+
+    @staticmethod
+    def remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
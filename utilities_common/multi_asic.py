@@ -9,6 +9,15 @@ from utilities_common import constants
 from utilities_common.general import load_db_config
 
 
+class MultiAsicConnections(object):
+    '''
+    The DB connections of each namespace kept by MultiAsic.keep_connections
+    '''
+    def __init__(self):
+        self.cfgdb_clients = {}
+        self.db_clients = {}
+
+
 class MultiAsic(object):
 
     def __init__(
@@ -26,6 +35,32 @@ class MultiAsic(object):
     def get_display_option(self):
         return self.display_option
 
+    def keep_connections(self):
+        '''
+        Keep the DB connections made for each namespace, so that they are
+        reused by the next runs, e.g. when sampling counters periodically.
+        '''
+        if self.db is None:
+            self.db = MultiAsicConnections()
+
+    def connect_config_db_for_ns(self, ns):
+        if self.db and self.db.cfgdb_clients.get(ns):
+            return self.db.cfgdb_clients[ns]
+
+        config_db = multi_asic.connect_config_db_for_ns(ns)
+        if isinstance(self.db, MultiAsicConnections):
+            self.db.cfgdb_clients[ns] = config_db
+        return config_db
+
+    def connect_to_all_dbs_for_ns(self, ns):
+        if self.db and self.db.db_clients.get(ns):
+            return self.db.db_clients[ns]
+
+        db = multi_asic.connect_to_all_dbs_for_ns(ns)
+        if isinstance(self.db, MultiAsicConnections):
+            self.db.db_clients[ns] = db
+        return db
+
     def is_object_internal(self, object_type, cli_object):
         '''
         The function checks if a CLI object is internal and returns true or false.
@@ -143,15 +178,8 @@ def run_on_multi_asic(func):
         for ns in ns_list:
             self.multi_asic.current_namespace = ns
             # if object instance already has db connections, use them
-            if self.multi_asic.db and self.multi_asic.db.cfgdb_clients.get(ns):
-                self.config_db = self.multi_asic.db.cfgdb_clients[ns]
-            else:
-                self.config_db = multi_asic.connect_config_db_for_ns(ns)
-
-            if self.multi_asic.db and self.multi_asic.db.db_clients.get(ns):
-                self.db = self.multi_asic.db.db_clients[ns]
-            else:
-                self.db = multi_asic.connect_to_all_dbs_for_ns(ns)
+            self.config_db = self.multi_asic.connect_config_db_for_ns(ns)
+            self.db = self.multi_asic.connect_to_all_dbs_for_ns(ns)
 
             func(self,  *args, **kwargs)
     return wrapped_run_on_all_asics
@@ -1,6 +1,8 @@
 # network statistics utility functions #
 
+import datetime
 import json
+import time
 
 STATUS_NA = 'N/A'
 PORT_RATE = 40
@@ -56,9 +58,17 @@ def ns_util(newstr, oldstr, delta, port_rate=PORT_RATE):
         util = rate/(port_rate*1000*1000*1000/8.0)*100
         return "{:.2f}%".format(util)
 
-def table_as_json(table, header):
+def ns_rate(newstr, oldstr, delta):
     """
-        Print table as json format.
+        Calculate the rate per second of a counter between two samples.
+    """
+    if newstr == STATUS_NA or oldstr == STATUS_NA or delta <= 0:
+        return STATUS_NA
+    return max(0, int(newstr) - int(oldstr))/delta
+
+def table_as_dict(table, header):
+    """
+        Get table as a dictionary.
     """
     output = {}
 
@@ -67,8 +77,15 @@ def table_as_json(table, header):
     for line in table:
         if_name = line[0]
         output[if_name] = {header[i]: line[i] for i in range(1, len(header))}
-    
-    return json.dumps(output, indent=4, sort_keys=True)
+
+    return output
+
+
+def table_as_json(table, header):
+    """
+        Print table as json format.
+    """
+    return json.dumps(table_as_dict(table, header), indent=4, sort_keys=True)
 
 
 def format_number_with_comma(number_in_str):
@@ -137,3 +154,48 @@ def format_util_directly(util):
         return STATUS_NA
     else:
         return "{:.2f}%".format(float(util))
+
+
+WATCH_CLEAR_SCREEN = "\033[2J\033[H"
+
+
+def watch_stats(get_sample, print_sample, interval, count=0, sample_as_json=None):
+    """
+        Print the stats every interval seconds, until interrupted or count samples were printed.
+
+        The callers keep their DB connections and name maps between the samples, and print each
+        sample against the previous one, None for the first sample. The screen is repainted for
+        each sample, or in JSON mode, when sample_as_json is given, the JSON object it returns for
+        the sample against the previous one is printed as a single line.
+    """
+    old_sample = None
+    printed = 0
+    try:
+        while not count or printed < count:
+            started = time.time()
+            new_sample = get_sample()
+            if sample_as_json is not None:
+                print(json_line(sample_as_json(new_sample, old_sample)), flush=True)
+            else:
+                print(WATCH_CLEAR_SCREEN, end='')
+                print("Every {}s: {}\n".format(interval, datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+                print_sample(new_sample, old_sample)
+                print('', end='', flush=True)
+            old_sample = new_sample
+            printed += 1
+            if not count or printed < count:
+                time.sleep(max(0, interval - (time.time() - started)))
+    except KeyboardInterrupt:
+        pass
+
+
+def json_line(document):
+    """
+        Dump a JSON document on a single line, the times in ISO format.
+    """
+    def serial(obj):
+        if isinstance(obj, (datetime.datetime, datetime.date)):
+            return obj.isoformat()
+        raise TypeError("Type %s not serializable" % type(obj))
+
+    return json.dumps(document, sort_keys=True, separators=(',', ':'), default=serial)
@@ -9,8 +9,10 @@ from sonic_py_common import device_info
 from swsscommon.swsscommon import SonicV2Connector, CounterTable, PortCounter
 
 from utilities_common import constants
+from utilities_common.bulk_counters import BulkCounterFetcher
+from utilities_common.counter_matrix import CounterMatrix
 import utilities_common.multi_asic as multi_asic_util
-from utilities_common.netstat import ns_diff, table_as_json, format_brate, format_prate, \
+from utilities_common.netstat import table_as_json, format_brate, format_prate, \
                                      format_util, format_number_with_comma, format_util_directly, \
                                      format_fec_ber
 
@@ -40,6 +42,9 @@ rates_key_list = ['RX_BPS', 'RX_PPS', 'RX_UTIL', 'TX_BPS', 'TX_PPS', 'TX_UTIL',
 ratestat_fields = ("rx_bps",  "rx_pps", "rx_util", "tx_bps", "tx_pps", "tx_util", "fec_pre_ber", "fec_post_ber")
 RateStats = namedtuple("RateStats", ratestat_fields)
 
+# The counters published by the linecards, in the order of the first NStats fields
+linecard_cnstat_fields = ("rx_ok", "rx_err", "rx_drop", "rx_ovr", "tx_ok", "tx_err", "tx_drop", "tx_ovr")
+
 """
 The order and count of statistics mentioned below needs to be in sync with the values in portstat script
 So, any fields added/deleted in here should be reflected in portstat script also
@@ -95,6 +100,54 @@ counter_bucket_dict = {
         44: ['SAI_PORT_STAT_IF_IN_FEC_SYMBOL_ERRORS']
 }
 
+# The counters shown in the columns of the tables
+diff_header_fields = {'RX_OK': 'rx_ok', 'RX_ERR': 'rx_err', 'RX_DRP': 'rx_drop', 'RX_OVR': 'rx_ovr',
+                      'TX_OK': 'tx_ok', 'TX_ERR': 'tx_err', 'TX_DRP': 'tx_drop', 'TX_OVR': 'tx_ovr',
+                      'FEC_CORR': 'fec_corr', 'FEC_UNCORR': 'fec_uncorr', 'FEC_SYMBOL_ERR': 'fec_symbol_err'}
+
+# The counters of the rates computed between two samples
+sample_rate_fields = ("rx_byt", "rx_ok", "tx_byt", "tx_ok")
+
+# The lines of the detailed counters of an interface, None for a blank line
+intf_detail_lines = [
+    ("Packets Received 64 Octets.....................", 'rx_64'),
+    ("Packets Received 65-127 Octets.................", 'rx_65_127'),
+    ("Packets Received 128-255 Octets................", 'rx_128_255'),
+    ("Packets Received 256-511 Octets................", 'rx_256_511'),
+    ("Packets Received 512-1023 Octets...............", 'rx_512_1023'),
+    ("Packets Received 1024-1518 Octets..............", 'rx_1024_1518'),
+    ("Packets Received 1519-2047 Octets..............", 'rx_1519_2047'),
+    ("Packets Received 2048-4095 Octets..............", 'rx_2048_4095'),
+    ("Packets Received 4096-9216 Octets..............", 'rx_4096_9216'),
+    ("Packets Received 9217-16383 Octets.............", 'rx_9217_16383'),
+    (None, None),
+    ("Total Packets Received Without Errors..........", 'rx_all'),
+    ("Unicast Packets Received.......................", 'rx_uca'),
+    ("Multicast Packets Received.....................", 'rx_mca'),
+    ("Broadcast Packets Received.....................", 'rx_bca'),
+    (None, None),
+    ("Jabbers Received...............................", 'rx_jbr'),
+    ("Fragments Received.............................", 'rx_frag'),
+    ("Undersize Received.............................", 'rx_usize'),
+    ("Overruns Received..............................", 'rx_ovrrun'),
+    (None, None),
+    ("Packets Transmitted 64 Octets..................", 'tx_64'),
+    ("Packets Transmitted 65-127 Octets..............", 'tx_65_127'),
+    ("Packets Transmitted 128-255 Octets.............", 'tx_128_255'),
+    ("Packets Transmitted 256-511 Octets.............", 'tx_256_511'),
+    ("Packets Transmitted 512-1023 Octets............", 'tx_512_1023'),
+    ("Packets Transmitted 1024-1518 Octets...........", 'tx_1024_1518'),
+    ("Packets Transmitted 1519-2047 Octets...........", 'tx_1519_2047'),
+    ("Packets Transmitted 2048-4095 Octets...........", 'tx_2048_4095'),
+    ("Packets Transmitted 4096-9216 Octets...........", 'tx_4096_9216'),
+    ("Packets Transmitted 9217-16383 Octets..........", 'tx_9217_16383'),
+    (None, None),
+    ("Total Packets Transmitted Successfully.........", 'tx_all'),
+    ("Unicast Packets Transmitted....................", 'tx_uca'),
+    ("Multicast Packets Transmitted..................", 'tx_mca'),
+    ("Broadcast Packets Transmitted..................", 'tx_bca'),
+]
+
 STATUS_NA = 'N/A'
 
 RATES_TABLE_PREFIX = "RATES:"
@@ -179,29 +232,13 @@ class Portstat(object):
         cnstat_dict['time'] = datetime.datetime.now()
         ratestat_dict = OrderedDict()
 
-        # Get the counter values from CHASSIS_STATE_DB
-        for key in linecard_port_aliases:
-            rx_ok = self.db.get(self.db.CHASSIS_STATE_DB, key, "rx_ok")
-            rx_bps = self.db.get(self.db.CHASSIS_STATE_DB, key, "rx_bps")
-            rx_pps = self.db.get(self.db.CHASSIS_STATE_DB, key, "rx_pps")
-            rx_util = self.db.get(self.db.CHASSIS_STATE_DB, key, "rx_util")
-            rx_err = self.db.get(self.db.CHASSIS_STATE_DB, key, "rx_err")
-            rx_drop = self.db.get(self.db.CHASSIS_STATE_DB, key, "rx_drop")
-            rx_ovr = self.db.get(self.db.CHASSIS_STATE_DB, key, "rx_ovr")
-            tx_ok = self.db.get(self.db.CHASSIS_STATE_DB, key, "tx_ok")
-            tx_bps = self.db.get(self.db.CHASSIS_STATE_DB, key, "tx_bps")
-            tx_pps = self.db.get(self.db.CHASSIS_STATE_DB, key, "tx_pps")
-            tx_util = self.db.get(self.db.CHASSIS_STATE_DB, key, "tx_util")
-            tx_err = self.db.get(self.db.CHASSIS_STATE_DB, key, "tx_err")
-            tx_drop = self.db.get(self.db.CHASSIS_STATE_DB, key, "tx_drop")
-            tx_ovr = self.db.get(self.db.CHASSIS_STATE_DB, key, "tx_ovr")
-            fec_pre_ber = self.db.get(self.db.CHASSIS_STATE_DB, key, "fec_pre_ber")
-            fec_post_ber = self.db.get(self.db.CHASSIS_STATE_DB, key, "fec_post_ber")
+        # Get the counter values from CHASSIS_STATE_DB, the aliases read with a pipeline
+        fetcher = BulkCounterFetcher(self.db, self.db.CHASSIS_STATE_DB)
+        for key, fvs in zip(linecard_port_aliases, fetcher.get_all(linecard_port_aliases)):
             port_alias = key.split("|")[-1]
-            cnstat_dict[port_alias] = NStats._make([rx_ok, rx_err, rx_drop, rx_ovr, tx_ok, tx_err, tx_drop, tx_ovr] +
+            cnstat_dict[port_alias] = NStats._make([fvs.get(name) for name in linecard_cnstat_fields] +
                                                    [STATUS_NA] * (len(NStats._fields) - 8))._asdict()
-            ratestat_dict[port_alias] = RateStats._make([rx_bps, rx_pps, rx_util, tx_bps,
-                                                        tx_pps, tx_util, fec_pre_ber, fec_post_ber])
+            ratestat_dict[port_alias] = RateStats._make([fvs.get(name) for name in ratestat_fields])
         self.cnstat_dict.update(cnstat_dict)
         self.ratestat_dict.update(ratestat_dict)
 
@@ -238,14 +275,13 @@ class Portstat(object):
             cntr = NStats._make(fields)._asdict()
             return cntr
 
-        def get_rates(table_id):
+        def get_rates(fvs):
             """
-                Get the rates from specific table.
+                Get the rates from the fields of a RATES table.
             """
             fields = ["0", "0", "0", "0", "0", "0", "0", "0"]
             for pos, name in enumerate(rates_key_list):
-                full_table_id = RATES_TABLE_PREFIX + table_id
-                counter_data = self.db.get(self.db.COUNTERS_DB, full_table_id, name)
+                counter_data = fvs.get(name)
                 if counter_data is None:
                     fields[pos] = STATUS_NA
                 elif fields[pos] != STATUS_NA:
@@ -262,14 +298,42 @@ class Portstat(object):
         counter_table = CounterTable(self.db.get_redis_client(self.db.COUNTERS_DB))
         if counter_port_name_map is None:
             return cnstat_dict, ratestat_dict
-        for port in natsorted(counter_port_name_map):
-            port_name = port.split(":")[0]
-            if self.multi_asic.skip_display(constants.PORT_OBJ, port_name):
-                continue
+        ports = [port for port in natsorted(counter_port_name_map)
+                 if not self.multi_asic.skip_display(constants.PORT_OBJ, port.split(":")[0])]
+        # The rates of all the ports are read with a pipeline. The counters are still read
+        # through CounterTable, which merges the gearbox counters of the port if any.
+        rates = BulkCounterFetcher(self.db, self.db.COUNTERS_DB).get_all(
+            RATES_TABLE_PREFIX + counter_port_name_map[port] for port in ports)
+        for port, fvs in zip(ports, rates):
             cnstat_dict[port] = get_counters(port)
-            ratestat_dict[port] = get_rates(counter_port_name_map[port])
+            ratestat_dict[port] = get_rates(fvs)
         return cnstat_dict, ratestat_dict
 
+    def get_sample_rates(self, cnstat_new_dict, cnstat_old_dict, ratestat_dict):
+        """
+            Compute the rates of the ports between two samples. The rates of the
+            ports without byte counters, and the FEC BER, are taken from the database.
+        """
+        delta = (cnstat_new_dict['time'] - cnstat_old_dict['time']).total_seconds()
+        keys = [key for key in cnstat_new_dict if key != 'time' and key in cnstat_old_dict]
+        new = CounterMatrix(cnstat_new_dict, keys, sample_rate_fields)
+        old = CounterMatrix(cnstat_old_dict, keys, sample_rate_fields)
+        sample_rates = {field: new.rates(old, field, delta) for field in sample_rate_fields}
+        sample_ratestat_dict = OrderedDict()
+        for i, key in enumerate(keys):
+            rates = ratestat_dict.get(key, RateStats._make([STATUS_NA] * len(ratestat_fields)))
+            if new.raw['rx_byt'][i] == STATUS_NA:
+                sample_ratestat_dict[key] = rates
+                continue
+            sample_ratestat_dict[key] = rates._replace(
+                rx_bps=sample_rates['rx_byt'][i],
+                rx_pps=sample_rates['rx_ok'][i],
+                rx_util=STATUS_NA,
+                tx_bps=sample_rates['tx_byt'][i],
+                tx_pps=sample_rates['tx_ok'][i],
+                tx_util=STATUS_NA)
+        return sample_ratestat_dict
+
     def get_port_speed(self, port_name):
         """
             Get the port speed
@@ -278,7 +342,7 @@ class Portstat(object):
         state_db_table_id = PORT_STATE_TABLE_PREFIX + port_name
         app_db_table_id = PORT_STATUS_TABLE_PREFIX + port_name
         for ns in self.multi_asic.get_ns_list_based_on_options():
-            self.db = multi_asic.connect_to_all_dbs_for_ns(ns)
+            self.db = self.multi_asic.connect_to_all_dbs_for_ns(ns)
             speed = self.db.get(self.db.STATE_DB, state_db_table_id, PORT_SPEED_FIELD)
             oper_status = self.db.get(self.db.APPL_DB, app_db_table_id, PORT_OPER_STATUS_FIELD)
             if speed is None or speed == STATUS_NA or oper_status != "up":
@@ -297,7 +361,7 @@ class Portstat(object):
 
         full_table_id = PORT_STATUS_TABLE_PREFIX + port_name
         for ns in self.multi_asic.get_ns_list_based_on_options():
-            self.db = multi_asic.connect_to_all_dbs_for_ns(ns)
+            self.db = self.multi_asic.connect_to_all_dbs_for_ns(ns)
             admin_state = self.db.get(self.db.APPL_DB, full_table_id, PORT_ADMIN_STATUS_FIELD)
             oper_state = self.db.get(self.db.APPL_DB, full_table_id, PORT_OPER_STATUS_FIELD)
 
@@ -323,6 +387,27 @@ class Portstat(object):
             self.cnstat_intf_diff_print(cnstat_dict, {}, intf_list)
             return None
 
+        table, header = self.cnstat_table(cnstat_dict, ratestat_dict, intf_list, print_all,
+                                          errors_only, fec_stats_only, rates_only)
+        self.table_print(table, header, use_json)
+
+    def table_print(self, table, header, use_json):
+        """
+            Print the table of the counters.
+        """
+        if table:
+            if use_json:
+                print(table_as_json(table, header))
+            else:
+                print(tabulate(table, header, tablefmt='simple', stralign='right'))
+        if (multi_asic.is_multi_asic() or device_info.is_chassis()) and not use_json:
+            print("\nReminder: Please execute 'show interface counters -d all' to include internal links\n")
+
+    def cnstat_table(self, cnstat_dict, ratestat_dict, intf_list, print_all,
+                     errors_only, fec_stats_only, rates_only):
+        """
+            Get the table of the cnstat, and its header.
+        """
         table = []
         header = None
 
@@ -400,104 +485,25 @@ class Portstat(object):
                               format_number_with_comma(data["tx_err"]),
                               format_number_with_comma(data["tx_drop"]),
                               format_number_with_comma(data["tx_ovr"])))
-        if table:
-            if use_json:
-                print(table_as_json(table, header))
-            else:
-                print(tabulate(table, header, tablefmt='simple', stralign='right'))
-        if (multi_asic.is_multi_asic() or device_info.is_chassis()) and not use_json:
-            print("\nReminder: Please execute 'show interface counters -d all' to include internal links\n")
+        return table, header
 
     def cnstat_intf_diff_print(self, cnstat_new_dict, cnstat_old_dict, intf_list):
         """
             Print the difference between two cnstat results for interface.
         """
-
-        for key in natsorted(cnstat_new_dict.keys()):
-            cntr = cnstat_new_dict.get(key)
-            if key == 'time':
-                continue
-
-            if key in cnstat_old_dict:
-                old_cntr = cnstat_old_dict.get(key)
-            else:
-                old_cntr = NStats._make([0] * BUCKET_NUM)._asdict()
-
-            if intf_list and key not in intf_list:
-                continue
-
-            print("Packets Received 64 Octets..................... {}".format(ns_diff(cntr['rx_64'],
-                                                                                      old_cntr['rx_64'])))
-            print("Packets Received 65-127 Octets................. {}".format(ns_diff(cntr['rx_65_127'],
-                                                                                      old_cntr['rx_65_127'])))
-            print("Packets Received 128-255 Octets................ {}".format(ns_diff(cntr['rx_128_255'],
-                                                                                      old_cntr['rx_128_255'])))
-            print("Packets Received 256-511 Octets................ {}".format(ns_diff(cntr['rx_256_511'],
-                                                                                      old_cntr['rx_256_511'])))
-            print("Packets Received 512-1023 Octets............... {}".format(ns_diff(cntr['rx_512_1023'],
-                                                                                      old_cntr['rx_512_1023'])))
-            print("Packets Received 1024-1518 Octets.............. {}".format(ns_diff(cntr['rx_1024_1518'],
-                                                                                      old_cntr['rx_1024_1518'])))
-            print("Packets Received 1519-2047 Octets.............. {}".format(ns_diff(cntr['rx_1519_2047'],
-                                                                                      old_cntr['rx_1519_2047'])))
-            print("Packets Received 2048-4095 Octets.............. {}".format(ns_diff(cntr['rx_2048_4095'],
-                                                                                      old_cntr['rx_2048_4095'])))
-            print("Packets Received 4096-9216 Octets.............. {}".format(ns_diff(cntr['rx_4096_9216'],
-                                                                                      old_cntr['rx_4096_9216'])))
-            print("Packets Received 9217-16383 Octets............. {}".format(ns_diff(cntr['rx_9217_16383'],
-                                                                                      old_cntr['rx_9217_16383'])))
-
-            print("")
-            print("Total Packets Received Without Errors.......... {}".format(ns_diff(cntr['rx_all'],
-                                                                                      old_cntr['rx_all'])))
-            print("Unicast Packets Received....................... {}".format(ns_diff(cntr['rx_uca'],
-                                                                                      old_cntr['rx_uca'])))
-            print("Multicast Packets Received..................... {}".format(ns_diff(cntr['rx_mca'],
-                                                                                      old_cntr['rx_mca'])))
-            print("Broadcast Packets Received..................... {}".format(ns_diff(cntr['rx_bca'],
-                                                                                      old_cntr['rx_bca'])))
-
-            print("")
-            print("Jabbers Received............................... {}".format(ns_diff(cntr['rx_jbr'],
-                                                                                      old_cntr['rx_jbr'])))
-            print("Fragments Received............................. {}".format(ns_diff(cntr['rx_frag'],
-                                                                                      old_cntr['rx_frag'])))
-            print("Undersize Received............................. {}".format(ns_diff(cntr['rx_usize'],
-                                                                                      old_cntr['rx_usize'])))
-            print("Overruns Received.............................. {}".format(ns_diff(cntr["rx_ovrrun"],
-                                                                                      old_cntr["rx_ovrrun"])))
-
-            print("")
-            print("Packets Transmitted 64 Octets.................. {}".format(ns_diff(cntr['tx_64'],
-                                                                                      old_cntr['tx_64'])))
-            print("Packets Transmitted 65-127 Octets.............. {}".format(ns_diff(cntr['tx_65_127'],
-                                                                                      old_cntr['tx_65_127'])))
-            print("Packets Transmitted 128-255 Octets............. {}".format(ns_diff(cntr['tx_128_255'],
-                                                                                      old_cntr['tx_128_255'])))
-            print("Packets Transmitted 256-511 Octets............. {}".format(ns_diff(cntr['tx_256_511'],
-                                                                                      old_cntr['tx_256_511'])))
-            print("Packets Transmitted 512-1023 Octets............ {}".format(ns_diff(cntr['tx_512_1023'],
-                                                                                      old_cntr['tx_512_1023'])))
-            print("Packets Transmitted 1024-1518 Octets........... {}".format(ns_diff(cntr['tx_1024_1518'],
-                                                                                      old_cntr['tx_1024_1518'])))
-            print("Packets Transmitted 1519-2047 Octets........... {}".format(ns_diff(cntr['tx_1519_2047'],
-                                                                                      old_cntr['tx_1519_2047'])))
-            print("Packets Transmitted 2048-4095 Octets........... {}".format(ns_diff(cntr['tx_2048_4095'],
-                                                                                      old_cntr['tx_2048_4095'])))
-            print("Packets Transmitted 4096-9216 Octets........... {}".format(ns_diff(cntr['tx_4096_9216'],
-                                                                                      old_cntr['tx_4096_9216'])))
-            print("Packets Transmitted 9217-16383 Octets.......... {}".format(ns_diff(cntr['tx_9217_16383'],
-                                                                                      old_cntr['tx_9217_16383'])))
-
-            print("")
-            print("Total Packets Transmitted Successfully......... {}".format(ns_diff(cntr['tx_all'],
-                                                                                      old_cntr['tx_all'])))
-            print("Unicast Packets Transmitted.................... {}".format(ns_diff(cntr['tx_uca'],
-                                                                                      old_cntr['tx_uca'])))
-            print("Multicast Packets Transmitted.................. {}".format(ns_diff(cntr['tx_mca'],
-                                                                                      old_cntr['tx_mca'])))
-            print("Broadcast Packets Transmitted.................. {}".format(ns_diff(cntr['tx_bca'],
-                                                                                      old_cntr['tx_bca'])))
+        keys = [key for key in natsorted(cnstat_new_dict.keys())
+                if key != 'time' and (not intf_list or key in intf_list)]
+        fields = [field for _, field in intf_detail_lines if field is not None]
+        new = CounterMatrix(cnstat_new_dict, keys, fields)
+        old = CounterMatrix(cnstat_old_dict, keys, fields)
+        columns = new.format_diff(old)
+
+        for i in range(len(keys)):
+            for label, field in intf_detail_lines:
+                if field is None:
+                    print("")
+                else:
+                    print("{} {}".format(label, columns[field][i]))
 
             print("Time Since Counters Last Cleared............... " + str(cnstat_old_dict.get('time')))
 
@@ -513,160 +519,53 @@ class Portstat(object):
             self.cnstat_intf_diff_print(cnstat_new_dict, cnstat_old_dict, intf_list)
             return None
 
-        table = []
-        header = None
+        table, header = self.cnstat_diff_table(cnstat_new_dict, cnstat_old_dict, ratestat_dict, intf_list,
+                                               print_all, errors_only, fec_stats_only, rates_only)
+        self.table_print(table, header, use_json)
 
-        for key in natsorted(cnstat_new_dict.keys()):
-            cntr = cnstat_new_dict.get(key)
-            if key == 'time':
-                continue
-            old_cntr = None
-            if key in cnstat_old_dict:
-                old_cntr = cnstat_old_dict.get(key)
+    def cnstat_diff_table(self, cnstat_new_dict, cnstat_old_dict, ratestat_dict, intf_list,
+                          print_all, errors_only, fec_stats_only, rates_only):
+        """
+            Get the table of the difference between two cnstat results, and its header.
+        """
+        if print_all:
+            header = header_all
+        elif errors_only:
+            header = header_errors_only
+        elif fec_stats_only:
+            header = header_fec_only
+        elif rates_only:
+            header = header_rates_only
+        else:
+            header = header_std
 
-            rates = ratestat_dict.get(key, RateStats._make([STATUS_NA] * len(ratestat_fields)))
+        # The deltas of all the ports are computed and formatted a column at a time
+        keys = [key for key in natsorted(cnstat_new_dict.keys())
+                if key != 'time' and (not intf_list or key in intf_list)]
+        fields = [diff_header_fields[column] for column in header if column in diff_header_fields]
+        columns = CounterMatrix(cnstat_new_dict, keys, fields).format_diff(
+            CounterMatrix(cnstat_old_dict, keys, fields))
 
-            if intf_list and key not in intf_list:
-                continue
-            port_speed = self.get_port_speed(key)
-
-            if print_all:
-                header = header_all
-                if old_cntr is not None:
-                    table.append((key, self.get_port_state(key),
-                                  ns_diff(cntr["rx_ok"], old_cntr["rx_ok"]),
-                                  format_brate(rates.rx_bps),
-                                  format_prate(rates.rx_pps),
-                                  format_util(rates.rx_bps, port_speed)
-                                  if rates.rx_util == STATUS_NA else format_util_directly(rates.rx_util),
-                                  ns_diff(cntr["rx_err"], old_cntr["rx_err"]),
-                                  ns_diff(cntr["rx_drop"], old_cntr["rx_drop"]),
-                                  ns_diff(cntr["rx_ovr"], old_cntr["rx_ovr"]),
-                                  ns_diff(cntr["tx_ok"], old_cntr["tx_ok"]),
-                                  format_brate(rates.tx_bps),
-                                  format_prate(rates.tx_pps),
-                                  format_util(rates.tx_bps, port_speed)
-                                  if rates.tx_util == STATUS_NA else format_util_directly(rates.tx_util),
-                                  ns_diff(cntr["tx_err"], old_cntr["tx_err"]),
-                                  ns_diff(cntr["tx_drop"], old_cntr["tx_drop"]),
-                                  ns_diff(cntr["tx_ovr"], old_cntr["tx_ovr"])))
-                else:
-                    table.append((key, self.get_port_state(key),
-                                  format_number_with_comma(cntr["rx_ok"]),
-                                  format_brate(rates.rx_bps),
-                                  format_prate(rates.rx_pps),
-                                  format_util(rates.rx_bps, port_speed)
-                                  if rates.rx_util == STATUS_NA else format_util_directly(rates.rx_util),
-                                  format_number_with_comma(cntr["rx_err"]),
-                                  format_number_with_comma(cntr["rx_drop"]),
-                                  format_number_with_comma(cntr["rx_ovr"]),
-                                  format_number_with_comma(cntr["tx_ok"]),
-                                  format_brate(rates.tx_bps),
-                                  format_prate(rates.tx_pps),
-                                  format_util(rates.tx_bps, port_speed)
-                                  if rates.tx_util == STATUS_NA else format_util_directly(rates.tx_util),
-                                  format_number_with_comma(cntr["tx_err"]),
-                                  format_number_with_comma(cntr["tx_drop"]),
-                                  format_number_with_comma(cntr["tx_ovr"])))
-            elif errors_only:
-                header = header_errors_only
-                if old_cntr is not None:
-                    table.append((key, self.get_port_state(key),
-                                  ns_diff(cntr["rx_err"], old_cntr["rx_err"]),
-                                  ns_diff(cntr["rx_drop"], old_cntr["rx_drop"]),
-                                  ns_diff(cntr["rx_ovr"], old_cntr["rx_ovr"]),
-                                  ns_diff(cntr["tx_err"], old_cntr["tx_err"]),
-                                  ns_diff(cntr["tx_drop"], old_cntr["tx_drop"]),
-                                  ns_diff(cntr["tx_ovr"], old_cntr["tx_ovr"])))
-                else:
-                    table.append((key, self.get_port_state(key),
-                                  format_number_with_comma(cntr["rx_err"]),
-                                  format_number_with_comma(cntr["rx_drop"]),
-                                  format_number_with_comma(cntr["rx_ovr"]),
-                                  format_number_with_comma(cntr["tx_err"]),
-                                  format_number_with_comma(cntr["tx_drop"]),
-                                  format_number_with_comma(cntr["tx_ovr"])))
-            elif fec_stats_only:
-                header = header_fec_only
-                if old_cntr is not None:
-                    table.append((key, self.get_port_state(key),
-                                  ns_diff(cntr['fec_corr'], old_cntr['fec_corr']),
-                                  ns_diff(cntr['fec_uncorr'], old_cntr['fec_uncorr']),
-                                  ns_diff(cntr['fec_symbol_err'], old_cntr['fec_symbol_err'])))
-                else:
-                    table.append((key, self.get_port_state(key),
-                                  format_number_with_comma(cntr['fec_corr']),
-                                  format_number_with_comma(cntr['fec_uncorr']),
-                                  format_number_with_comma(cntr['fec_symbol_err'])))
-
-            elif rates_only:
-                header = header_rates_only
-                if old_cntr is not None:
-                    table.append((key,
-                                  self.get_port_state(key),
-                                  ns_diff(cntr["rx_ok"], old_cntr["rx_ok"]),
-                                  format_brate(rates.rx_bps),
-                                  format_prate(rates.rx_pps),
-                                  format_util(rates.rx_bps, port_speed)
-                                  if rates.rx_util == STATUS_NA else format_util_directly(rates.rx_util),
-                                  ns_diff(cntr["tx_ok"], old_cntr["tx_ok"]),
-                                  format_brate(rates.tx_bps),
-                                  format_prate(rates.tx_pps),
-                                  format_util(rates.tx_bps, port_speed)
-                                  if rates.tx_util == STATUS_NA else format_util_directly(rates.tx_util)))
-                else:
-                    table.append((key,
-                                  self.get_port_state(key),
-                                  format_number_with_comma(cntr["rx_ok"]),
-                                  format_brate(rates.rx_bps),
-                                  format_prate(rates.rx_pps),
-                                  format_util(rates.rx_bps, port_speed)
-                                  if rates.rx_util == STATUS_NA else format_util_directly(rates.rx_util),
-                                  format_number_with_comma(cntr["tx_ok"]),
-                                  format_brate(rates.tx_bps),
-                                  format_prate(rates.tx_pps),
-                                  format_util(rates.tx_bps, port_speed)
-                                  if rates.tx_util == STATUS_NA else format_util_directly(rates.tx_util)))
-            else:
-                header = header_std
-                if old_cntr is not None:
-                    table.append((key,
-                                  self.get_port_state(key),
-                                  ns_diff(cntr["rx_ok"], old_cntr["rx_ok"]),
-                                  format_brate(rates.rx_bps),
-                                  format_util(rates.rx_bps, port_speed)
-                                  if rates.rx_util == STATUS_NA else format_util_directly(rates.rx_util),
-                                  ns_diff(cntr["rx_err"], old_cntr["rx_err"]),
-                                  ns_diff(cntr["rx_drop"], old_cntr["rx_drop"]),
-                                  ns_diff(cntr["rx_ovr"], old_cntr["rx_ovr"]),
-                                  ns_diff(cntr["tx_ok"], old_cntr["tx_ok"]),
-                                  format_brate(rates.tx_bps),
-                                  format_util(rates.tx_bps, port_speed)
-                                  if rates.tx_util == STATUS_NA else format_util_directly(rates.tx_util),
-                                  ns_diff(cntr["tx_err"], old_cntr["tx_err"]),
-                                  ns_diff(cntr["tx_drop"], old_cntr["tx_drop"]),
-                                  ns_diff(cntr["tx_ovr"], old_cntr["tx_ovr"])))
-                else:
-                    table.append((key,
-                                  self.get_port_state(key),
-                                  format_number_with_comma(cntr["rx_ok"]),
-                                  format_brate(rates.rx_bps),
-                                  format_util(rates.rx_bps, port_speed)
-                                  if rates.rx_util == STATUS_NA else format_util_directly(rates.rx_util),
-                                  format_number_with_comma(cntr["rx_err"]),
-                                  format_number_with_comma(cntr["rx_drop"]),
-                                  format_number_with_comma(cntr["rx_ovr"]),
-                                  format_number_with_comma(cntr["tx_ok"]),
-                                  format_brate(rates.tx_bps),
-                                  format_util(rates.tx_bps, port_speed)
-                                  if rates.tx_util == STATUS_NA else format_util_directly(rates.tx_util),
-                                  format_number_with_comma(cntr["tx_err"]),
-                                  format_number_with_comma(cntr["tx_drop"]),
-                                  format_number_with_comma(cntr["tx_ovr"])))
-        if table:
-            if use_json:
-                print(table_as_json(table, header))
-            else:
-                print(tabulate(table, header, tablefmt='simple', stralign='right'))
-        if (multi_asic.is_multi_asic() or device_info.is_chassis()) and not use_json:
-            print("\nReminder: Please execute 'show interface counters -d all' to include internal links\n")
+        table = []
+        for i, key in enumerate(keys):
+            rates = ratestat_dict.get(key, RateStats._make([STATUS_NA] * len(ratestat_fields)))
+            port_speed = None
+            row = [key, self.get_port_state(key)]
+            for column in header[2:]:
+                if column in diff_header_fields:
+                    row.append(columns[diff_header_fields[column]][i])
+                elif column in ('RX_BPS', 'TX_BPS'):
+                    row.append(format_brate(getattr(rates, column.lower())))
+                elif column in ('RX_PPS', 'TX_PPS'):
+                    row.append(format_prate(getattr(rates, column.lower())))
+                elif column in ('RX_UTIL', 'TX_UTIL'):
+                    # Computed from the byte rate if not in the database
+                    util = getattr(rates, column.lower())
+                    if util == STATUS_NA:
+                        if port_speed is None:
+                            port_speed = self.get_port_speed(key)
+                        row.append(format_util(getattr(rates, column[:2].lower() + '_bps'), port_speed))
+                    else:
+                        row.append(format_util_directly(util))
+            table.append(tuple(row))
+        return table, header
@@ -0,0 +1,47 @@
+"""
+Redis clients which support pipelines, shared by the CLIs and the tools which
+read or write many keys of a database in a few round trips.
+
+The clients of the swsscommon connectors don't support pipelines, a redis-py
+connection is then made over the unix socket of the database.
+"""
+
+import redis
+from swsscommon.swsscommon import SonicDBConfig
+
+
+def get_namespace(connector):
+    """
+    Get the namespace of a connector, the default namespace when it has none.
+    """
+    namespace = getattr(connector, 'namespace', None)
+    if namespace is None and hasattr(connector, 'getNamespace'):
+        namespace = connector.getNamespace()
+    return namespace if isinstance(namespace, str) else ''
+
+
+def get_pipeline_client(connector, db_name, namespace=None, socket=None):
+    """
+    Get a redis client of a database which supports pipelines: the client of
+    the connector when it does, else a redis connection over the unix socket of
+    the database.
+    :param connector: a SonicV2Connector or a ConfigDBConnector connected to
+                      the database
+    :param namespace: the namespace of the database, that of the connector when
+                      None
+    :param socket: the unix socket of the database, from the database config
+                   when None
+    :return the client, None when neither is available
+    """
+    client = connector.get_redis_client(db_name)
+    if hasattr(client, 'pipeline'):
+        return client
+    try:
+        if namespace is None:
+            namespace = get_namespace(connector)
+        client = redis.Redis(unix_socket_path=socket or SonicDBConfig.getDbSock(db_name, namespace),
+                             db=SonicDBConfig.getDbId(db_name, namespace), decode_responses=True)
+        client.ping()
+    except Exception:
+        return None
+    return client